@@ -7,6 +7,7 @@ comparing C1 (Baseline), C2 (Single-Agent), and C3 (Multi-Agent) conditions.
 Usage:
     python analyze_results.py
     python analyze_results.py --results-file path/to/all_trials.json
+    python analyze_results.py --results-file path/to/trials.jsonl
 """
 
 import json
@@ -22,29 +23,47 @@ except ImportError:
     print("Please install: pip install pandas numpy scipy")
     sys.exit(1)
 
+from src.evaluation.scenarios import load_registry
+from src.utils.trial_log import TRIAL_LOG_NAMES, iter_trials
+
 
 def load_results(results_file):
-    """Load trial results from JSON file."""
+    """Iterate trial results from a JSONL trial log or legacy JSON file."""
     if not Path(results_file).exists():
         print(f"Error: Results file not found: {results_file}")
         print("\nMake sure you've run the evaluation first:")
         print("  docker exec -it myantfarm_evaluator python run_evaluation.py")
         sys.exit(1)
     
+    if Path(results_file).name in TRIAL_LOG_NAMES:
+        # Stream the append-only log instead of parsing one large document
+        return iter_trials(results_file)
+    
     with open(results_file, 'r') as f:
         data = json.load(f)
     
-    return data
+    return iter(data['trials'])
+
+
+def trial_dq_score(trial, registry):
+    """DQ score of one trial: the exported dq_score, or scored here from its actions."""
+    if 'dq_score' in trial:
+        return trial['dq_score']
+    
+    actions = trial.get('actions', [])
+    if trial['condition'] in ['C2', 'C3'] and actions:
+        scenario = registry.get(trial.get('scenario', registry.default.name))
+        return scenario.scorer.score_trial(actions)['dq']
+    return 0.0
 
 
-def extract_dq_scores(trials, condition):
-    """Extract DQ scores for a specific condition."""
-    scores = []
+def extract_dq_scores(trials):
+    """Group DQ scores by condition in a single pass over the trials."""
+    registry = load_registry()
+    scores = {'C1': [], 'C2': [], 'C3': []}
     for trial in trials:
-        if trial['condition'] == condition:
-            dq_score = trial.get('dq_score', 0.0)
-            scores.append(dq_score)
-    return np.array(scores)
+        scores.setdefault(trial['condition'], []).append(trial_dq_score(trial, registry))
+    return {condition: np.array(values) for condition, values in scores.items()}
 
 
 def calculate_statistics(scores):
@@ -79,14 +98,13 @@ def cohens_d(group1, group2):
     return (np.mean(group1) - np.mean(group2)) / pooled_std
 
 
-def display_results(data):
+def display_results(trials):
     """Display formatted results."""
-    trials = data['trials']
-    
     # Extract scores by condition
-    c1_scores = extract_dq_scores(trials, 'C1')
-    c2_scores = extract_dq_scores(trials, 'C2')
-    c3_scores = extract_dq_scores(trials, 'C3')
+    scores = extract_dq_scores(trials)
+    c1_scores = scores['C1']
+    c2_scores = scores['C2']
+    c3_scores = scores['C3']
     
     # Calculate statistics
     c1_stats = calculate_statistics(c1_scores)
@@ -184,19 +202,18 @@ def main():
     )
     parser.add_argument(
         '--results-file',
-        default='data/results/all_trials.json',
-        help='Path to results JSON file (default: data/results/all_trials.json)'
+        help='Path to trials.jsonl or all_trials.json (default: the first found in '
+             'data/results, results or /app/results, trial log before all_trials.json)'
     )
     
     args = parser.parse_args()
     
-    # Try multiple possible locations
-    possible_paths = [
-        args.results_file,
-        'data/results/all_trials.json',
-        'results/all_trials.json',
-        '/app/results/all_trials.json'
-    ]
+    # Try multiple possible locations; the trial log is always complete, while
+    # all_trials.json is an optional export that may be stale
+    possible_paths = [args.results_file] if args.results_file else []
+    for results_dir in ['data/results', 'results', '/app/results']:
+        possible_paths.extend(f'{results_dir}/{name}' for name in TRIAL_LOG_NAMES)
+        possible_paths.append(f'{results_dir}/all_trials.json')
     
     results_file = None
     for path in possible_paths:
@@ -208,13 +225,13 @@ def main():
         print("Error: Could not find results file in any of these locations:")
         for path in possible_paths:
             print(f"  - {path}")
-        print("\nMake sure you've completed the evaluation and scoring steps.")
+        print("\nMake sure you've completed the evaluation first.")
         sys.exit(1)
     
     print(f"Loading results from: {results_file}")
-    data = load_results(results_file)
+    trials = load_results(results_file)
     
-    display_results(data)
+    display_results(trials)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,221 @@
+"""Timing harness for the scoring and statistics benchmarks.
+
+The ``benchmark`` fixture follows pytest-benchmark's calling convention
+(``benchmark(func, *args, **kwargs)`` returns ``func``'s result) but is kept
+in-tree: each call is repeated until ``--bench-min-time`` has elapsed and the
+fastest round is reported next to ``baselines.json``, if there is one.
+
+Absolute timings only compare on the machine that recorded them, so
+baselines are not committed and the regression gate is opt-in: record them
+with ``--bench-save``, then ``--bench-compare`` fails any benchmark whose
+fastest round is more than ``--bench-max-regression`` slower.
+
+The directory sits outside ``testpaths``, so run it explicitly::
+
+    python -m pytest benchmarks                     # 1k, 100k and 1M trials
+    python -m pytest benchmarks --bench-sizes 1000  # quick check
+    python -m pytest benchmarks --bench-save        # record this machine's baselines
+    python -m pytest benchmarks --bench-compare     # fail on regressions against them
+"""
+import json
+import platform
+import random
+import statistics
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import pandas as pd
+import pytest
+
+from src.evaluation.scenarios import load_registry
+
+BASELINES = Path(__file__).parent / "baselines.json"
+DEFAULT_SIZES = "1000,100000,1000000"
+
+# Mean and spread of the synthetic T2U (seconds) and DQ per condition
+CONDITIONS = {"C1": (120.0, 15.0, 0.25), "C2": (40.0, 8.0, 0.54), "C3": (45.0, 6.0, 0.69)}
+
+GENERIC_ACTIONS = [
+    "Investigate recent changes",
+    "Review system metrics",
+    "Check system logs and metrics",
+    "Rollback recent deployment",
+    "Restart the authentication service",
+    "Escalate to the on-call database engineer"
+]
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("bench", "scoring and statistics benchmarks")
+    group.addoption("--bench-sizes", default=DEFAULT_SIZES, help="comma-separated trial counts")
+    group.addoption("--bench-min-time", type=float, default=1.0, help="seconds to repeat each benchmark for")
+    group.addoption("--bench-max-regression", type=float, default=0.5, help="allowed slowdown over baseline")
+    group.addoption("--bench-baselines", default=str(BASELINES))
+    group.addoption("--bench-save", action="store_true", help="write results as the new baselines")
+    group.addoption("--bench-compare", action="store_true", help="fail benchmarks that regressed against the baselines")
+
+
+def pytest_generate_tests(metafunc):
+    if "size" in metafunc.fixturenames:
+        sizes = [int(size) for size in metafunc.config.getoption("bench_sizes").split(",") if size.strip()]
+        metafunc.parametrize("size", sizes, ids=[_size_id(size) for size in sizes])
+
+
+def _size_id(size: int) -> str:
+    for unit, scale in (("m", 10**6), ("k", 1000)):
+        if size >= scale and size % scale == 0:
+            return f"{size // scale}{unit}"
+    return str(size)
+
+
+def make_trials(n: int, seed: int = 42) -> List[Dict]:
+    """Synthetic trial records shaped like the evaluator's output.
+
+    Actions mix the scenarios' ground-truth and fallback actions with generic
+    ones and a long tail of parameterized variants, so the batch scorer sees a
+    realistic ratio of repeated to distinct action strings.
+    """
+    rng = random.Random(seed)
+    scenarios = list(load_registry())
+    pools = {}
+    for scenario in scenarios:
+        pool = list(GENERIC_ACTIONS) + [action.capitalize() for action in scenario.ground_truth.get("actions", [])]
+        for actions in scenario.fallback_actions.values():
+            pool.extend(actions)
+        pools[scenario.name] = pool
+
+    trials = []
+    for i in range(n):
+        condition = ("C1", "C2", "C3")[i % 3]
+        t2u_mean, t2u_std, dq_mean = CONDITIONS[condition]
+        scenario = scenarios[i % len(scenarios)].name
+        actions = rng.sample(pools[scenario], rng.randint(0 if condition == "C1" else 1, 3))
+        if rng.random() < 0.1:
+            actions.append(f"Scale auth-service to {rng.randint(2, 400)} replicas")
+        trials.append({
+            "trial_id": f"{condition}_{i:07d}",
+            "condition": condition,
+            "scenario": scenario,
+            "actions": actions,
+            "t2u": max(1.0, rng.gauss(t2u_mean, t2u_std)),
+            "dq": min(1.0, max(0.0, rng.gauss(dq_mean, 0.05)))
+        })
+    return trials
+
+
+_trials_cache: Dict[int, List[Dict]] = {}
+
+
+@pytest.fixture
+def trials(size) -> List[Dict]:
+    # Generated once per size; benchmarks must not mutate them
+    if size not in _trials_cache:
+        _trials_cache[size] = make_trials(size)
+    return _trials_cache[size]
+
+
+@pytest.fixture
+def trial_frame(trials) -> pd.DataFrame:
+    return pd.DataFrame(trials)
+
+
+class Benchmark:
+    def __init__(self, name: str, session: "BenchmarkSession"):
+        self.name = name
+        self.session = session
+        self.min_time = session.config.getoption("bench_min_time")
+        self.stats: Dict = {}
+
+    def __call__(self, func: Callable, *args, **kwargs):
+        timings = []
+        result = None
+        while not timings or (sum(timings) < self.min_time and len(timings) < 1000):
+            start = time.perf_counter()
+            result = func(*args, **kwargs)
+            timings.append(time.perf_counter() - start)
+        self.stats = {
+            "min": round(min(timings), 6),
+            "median": round(statistics.median(timings), 6),
+            "rounds": len(timings)
+        }
+        self.session.check(self)
+        return result
+
+
+class BenchmarkSession:
+    def __init__(self, config):
+        self.config = config
+        self.path = Path(config.getoption("bench_baselines"))
+        self.max_regression = config.getoption("bench_max_regression")
+        self.save = config.getoption("bench_save")
+        self.compare = config.getoption("bench_compare")
+        self.baselines = json.loads(self.path.read_text()) if self.path.exists() else {}
+        self.results: Dict[str, Dict] = {}
+
+    def check(self, benchmark: Benchmark):
+        self.results[benchmark.name] = benchmark.stats
+        baseline = self.baselines.get("benchmarks", {}).get(benchmark.name)
+        if self.save or not self.compare or baseline is None:
+            return
+        limit = baseline["min"] * (1 + self.max_regression)
+        if benchmark.stats["min"] > limit:
+            pytest.fail(
+                f"{benchmark.name} regressed: {benchmark.stats['min']:.6f}s vs baseline "
+                f"{baseline['min']:.6f}s (limit +{self.max_regression:.0%})",
+                pytrace=False
+            )
+
+    @staticmethod
+    def machine() -> Dict:
+        return {"python": platform.python_version(), "platform": platform.platform()}
+
+    def write(self):
+        benchmarks = {**self.baselines.get("benchmarks", {}), **self.results}
+        data = {"machine": self.machine(), "benchmarks": dict(sorted(benchmarks.items()))}
+        self.path.write_text(json.dumps(data, indent=2) + "\n")
+
+
+@pytest.fixture(scope="session")
+def bench_session(request) -> BenchmarkSession:
+    session = BenchmarkSession(request.config)
+    request.config._bench_session = session
+    return session
+
+
+@pytest.fixture
+def benchmark(request, bench_session) -> Benchmark:
+    return Benchmark(request.node.name, bench_session)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    bench_session = getattr(session.config, "_bench_session", None)
+    if bench_session is not None and bench_session.save and bench_session.results:
+        bench_session.write()
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    bench_session = getattr(config, "_bench_session", None)
+    if bench_session is None or not bench_session.results:
+        return
+    baselines = bench_session.baselines.get("benchmarks", {})
+    terminalreporter.section("benchmarks")
+    terminalreporter.write_line(f"{'name':<40} {'min':>11} {'median':>11} {'rounds':>7} {'baseline':>11}")
+    for name, stats in sorted(bench_session.results.items()):
+        baseline = baselines.get(name, {}).get("min")
+        change = f"{stats['min'] / baseline - 1:+.0%}" if baseline else "-"
+        terminalreporter.write_line(
+            f"{name:<40} {stats['min']:>10.4f}s {stats['median']:>10.4f}s {stats['rounds']:>7} {change:>11}"
+        )
+    # Older or hand-edited baselines files may lack the machine they came from
+    recorded_on = bench_session.baselines.get("machine") or {}
+    if baselines and recorded_on != bench_session.machine():
+        if isinstance(recorded_on, dict) and recorded_on.get("platform"):
+            machine = f"{recorded_on['platform']}, Python {recorded_on.get('python', 'unknown')}"
+        else:
+            machine = "an unknown machine"
+        terminalreporter.write_line(
+            f"Baselines were recorded on {machine}; re-record them on this machine with --bench-save"
+        )
+    if bench_session.save:
+        terminalreporter.write_line(f"Baselines written to {bench_session.path}")
@@ -0,0 +1,34 @@
+from src.analysis.statistical_tests import StatisticalAnalyzer
+from src.evaluation.rescore_all_trials import rescore_trials
+from src.evaluation.scenarios import load_registry
+
+
+def test_score_trial(benchmark, trials):
+    scorer = load_registry().default.scorer
+
+    def score_all():
+        return [scorer.score_trial(trial["actions"]) for trial in trials]
+
+    scores = benchmark(score_all)
+    assert len(scores) == len(trials)
+
+
+def test_score_batch(benchmark, trials):
+    scorer = load_registry().default.scorer
+    scores = benchmark(scorer.score_batch, trials)
+    assert len(scores) == len(trials)
+
+
+def test_rescore_trials(benchmark, trials):
+    df = benchmark(rescore_trials, trials)
+    assert len(df) == len(trials)
+
+
+def test_pairwise_ttests(benchmark, trial_frame):
+    results = benchmark(StatisticalAnalyzer().pairwise_ttests, trial_frame, "dq")
+    assert len(results) == 3
+
+
+def test_condition_summary(benchmark, trial_frame):
+    summary = benchmark(StatisticalAnalyzer().condition_summary, trial_frame, "t2u")
+    assert list(summary["Condition"]) == ["C1", "C2", "C3"]
@@ -1,4 +1,4 @@
-﻿import json
+﻿import argparse
 import pandas as pd
 import numpy as np
 from pathlib import Path
@@ -9,60 +9,64 @@ warnings.filterwarnings('ignore')
 
 sys.path.append(str(Path(__file__).parent.parent))
 
-from src.scoring.dq_scorer_v2 import DQScorer
 from src.analysis.statistical_tests import StatisticalAnalyzer
+from src.evaluation.scenarios import load_registry
+from src.utils.trial_log import collect_columns, iter_results
+
+
+def parse_trial_key(spec, default_scenario):
+    """(scenario, trial_id) from 'scenario:trial_id'; a bare trial_id means the default scenario."""
+    scenario, _, trial_id = spec.rpartition(':')
+    return (scenario or default_scenario, trial_id)
 
 
 def load_trials(results_dir, exclude_trials=None):
-    results_file = results_dir / 'all_trials.json'
-    with open(results_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
-    trials = data['trials']
-    
-    if exclude_trials:
-        trials = [t for t in trials if t['trial_id'] not in exclude_trials]
+    # Trial ids repeat across scenarios, so exclusions are (scenario, trial_id)
+    # pairs; records from before scenarios were tracked belong to the default one
+    exclude_trials = set(exclude_trials or [])
+    default = load_registry().default.name
+    
+    # Streams trials.jsonl line by line (falls back to all_trials.json)
+    return (
+        t for t in iter_results(results_dir)
+        if (t.get('scenario', default), t['trial_id']) not in exclude_trials
+    )
+
+
+def score_trials(trials):
+    registry = load_registry()
+    # One pass over the trials, keeping only the fields the analysis needs
+    df = pd.DataFrame(collect_columns(
+        (t for t in trials if not t.get('error')),
+        {
+            'trial_id': lambda t: t['trial_id'],
+            'condition': lambda t: t['condition'],
+            't2u': lambda t: t['t2u'],
+            'scenario': lambda t: t.get('scenario', registry.default.name),
+            'actions': lambda t: t.get('actions', []),
+        }
+    ))
+    # Each trial is scored against its own scenario's ground truth
+    scores = registry.score_batch(df)
+    
+    df = df.drop(columns=['scenario', 'actions'])
+    for column in ['dq', 'validity', 'specificity', 'correctness', 'action_count']:
+        df[column] = scores[column].to_numpy()
     
-    return trials
+    return df
 
 
 def create_cleaned_dataset(results_dir, outliers):
     print('=' * 70)
     print('Outlier Removal and Re-analysis')
     print('=' * 70)
-    print('Excluding outliers:', outliers)
+    print('Excluding outliers:', ', '.join(f'{scenario}:{trial_id}' for scenario, trial_id in outliers))
     print('=' * 70)
     print()
     
-    trials = load_trials(results_dir, exclude_trials=outliers)
-    print('Loaded', len(trials), 'trials (after exclusion)')
-    print()
-    
     print('Re-scoring trials with corrected DQ formula...')
-    ground_truth = 'rollback auth-service deployment to v2.3.0 verify database connection pool'
-    scorer = DQScorer(ground_truth)
-    
-    records = []
-    for trial in trials:
-        if trial.get('error'):
-            continue
-        
-        actions = trial.get('actions', [])
-        scores = scorer.score_trial(actions)
-        
-        records.append({
-            'trial_id': trial['trial_id'],
-            'condition': trial['condition'],
-            't2u': trial['t2u'],
-            'dq': scores['dq'],
-            'validity': scores['validity'],
-            'specificity': scores['specificity'],
-            'correctness': scores['correctness'],
-            'action_count': scores['action_count']
-        })
-    
-    df = pd.DataFrame(records)
-    print('Re-scored', len(df), 'trials')
+    df = score_trials(load_trials(results_dir, exclude_trials=outliers))
+    print('Re-scored', len(df), 'trials (after exclusion)')
     print()
     
     return df
@@ -73,23 +77,7 @@ def compare_with_and_without_outliers(results_dir, outliers):
     print('=== ORIGINAL DATA (with outliers) ===')
     print()
     
-    trials_original = load_trials(results_dir, exclude_trials=None)
-    ground_truth = 'rollback auth-service deployment to v2.3.0 verify database connection pool'
-    scorer = DQScorer(ground_truth)
-    
-    records_orig = []
-    for trial in trials_original:
-        if trial.get('error'):
-            continue
-        actions = trial.get('actions', [])
-        scores = scorer.score_trial(actions)
-        records_orig.append({
-            'condition': trial['condition'],
-            't2u': trial['t2u'],
-            'dq': scores['dq']
-        })
-    
-    df_orig = pd.DataFrame(records_orig)
+    df_orig = score_trials(load_trials(results_dir, exclude_trials=None))[['condition', 't2u', 'dq']]
     
     orig_stats = df_orig.groupby('condition').agg({
         't2u': ['count', 'mean', 'std', 'min', 'max'],
@@ -188,10 +176,21 @@ def save_cleaned_results(df, output_dir):
 
 
 def main():
-    results_dir = Path('results')
+    parser = argparse.ArgumentParser(description='Re-analyze results without outlier trials')
+    parser.add_argument('--results-dir', default='results')
+    parser.add_argument(
+        '--exclude',
+        action='append',
+        metavar='SCENARIO:TRIAL_ID',
+        help='Trial to exclude, repeatable; a bare TRIAL_ID means the default scenario (default: C2_028)'
+    )
+    args = parser.parse_args()
+    
+    results_dir = Path(args.results_dir)
     output_dir = results_dir / 'analysis_cleaned'
     
-    outliers = ['C2_028']
+    default_scenario = load_registry().default.name
+    outliers = [parse_trial_key(spec, default_scenario) for spec in (args.exclude or ['C2_028'])]
     
     df_clean = compare_with_and_without_outliers(results_dir, outliers)
     
@@ -202,7 +201,7 @@ def main():
     print('ANALYSIS COMPLETE!')
     print('=' * 70)
     print()
-    print('Cleaned data saved to: results/analysis_cleaned/')
+    print('Cleaned data saved to:', output_dir)
 
 
 if __name__ == '__main__':
@@ -1,58 +1,82 @@
-﻿from fastapi import FastAPI
+﻿from contextlib import asynccontextmanager
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-import httpx
 import os
 import logging
 import asyncio
 import time
 
+from src.utils.admission import AdmissionController, instrument_admission
+from src.utils.circuit_breaker import CircuitBreakerRegistry, CircuitOpenError
+from src.utils.llm_interface import LLMInterface
+from src.utils.metrics import MetricsRegistry, instrument_app
+from src.utils.ollama_timings import ollama_timings
+from src.utils.readiness import Warmup, instrument_readiness
+from src.utils.response_cache import ResponseCache
+from src.utils.streaming import BriefStreamParser, ndjson
+from src.utils.tracing import Tracer, instrument_tracing
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Copilot Service")
-
 OLLAMA_URL = os.getenv("OLLAMA_URL", "http://ollama:11434")
+# Comma-separated list of Ollama servers to balance across (defaults to OLLAMA_URL)
+OLLAMA_URLS = os.getenv("OLLAMA_URLS", OLLAMA_URL)
 MODEL_NAME = os.getenv("MODEL_NAME", "tinyllama:latest")
 TEMPERATURE = float(os.getenv("TEMPERATURE", "0.7"))
 MAX_TOKENS = int(os.getenv("MAX_TOKENS", "100"))
-
-
-class CircuitBreaker:
-    def __init__(self, failure_threshold=5, timeout=60):
-        self.failure_count = 0
-        self.failure_threshold = failure_threshold
-        self.timeout = timeout
-        self.last_failure_time = None
-        self.state = "CLOSED"  # CLOSED, OPEN, HALF_OPEN
-    
-    def can_attempt(self):
-        if self.state == "CLOSED":
-            return True
-        elif self.state == "OPEN":
-            if time.time() - self.last_failure_time > self.timeout:
-                self.state = "HALF_OPEN"
-                return True
-            return False
-        else:  # HALF_OPEN
-            return True
-    
-    def record_success(self):
-        self.failure_count = 0
-        self.state = "CLOSED"
-    
-    def record_failure(self):
-        self.failure_count += 1
-        self.last_failure_time = time.time()
-        if self.failure_count >= self.failure_threshold:
-            self.state = "OPEN"
-            logger.warning(f"Circuit breaker OPEN after {self.failure_count} failures")
-
-
-circuit_breaker = CircuitBreaker()
+OLLAMA_TIMEOUT = float(os.getenv("OLLAMA_TIMEOUT", "300.0"))
+SEED = os.getenv("SEED")
+
+OLLAMA_OPTIONS = {"temperature": TEMPERATURE, "num_predict": MAX_TOKENS}
+if SEED:
+    OLLAMA_OPTIONS["seed"] = int(SEED)
+
+metrics = MetricsRegistry()
+tracer = Tracer.from_config("copilot")
+fallbacks = metrics.counter(
+    "myantfarm_fallbacks_total",
+    "Responses (or parts of them) replaced by canned fallback text",
+    ["service", "component"]
+)
+
+# Response cache is opt-in (LLM_CACHE=deterministic|all); live runs stay uncached.
+# One circuit breaker per backend/model (CIRCUIT_BREAKER_* settings).
+llm = LLMInterface(
+    base_url=OLLAMA_URLS,
+    timeout=OLLAMA_TIMEOUT,
+    cache=ResponseCache.from_config(),
+    breakers=CircuitBreakerRegistry(),
+    metrics=metrics,
+    tracer=tracer
+)
+# Pre-load MODEL_NAME (OLLAMA_WARMUP=1) so the first trials don't pay the model load
+warmup = Warmup(llm, MODEL_NAME)
+# Bounded concurrency and wait queue (ADMISSION_* settings); overflow gets 429/503 + Retry-After
+admission = AdmissionController()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await llm.start()
+    warmup_task = asyncio.create_task(warmup.run())
+    yield
+    warmup_task.cancel()
+    await llm.aclose()
+    tracer.close()
+
+
+app = FastAPI(title="Copilot Service", lifespan=lifespan)
+instrument_admission(app, admission, metrics, "copilot", ["/analyze"])
+instrument_app(app, metrics, "copilot")
+instrument_tracing(app, tracer)
+instrument_readiness(app, warmup)
 
 
 class AnalyzeRequest(BaseModel):
     context: str
+    stream: bool = False
 
 
 class AnalyzeResponse(BaseModel):
@@ -65,50 +89,36 @@ async def health():
     return {
         "status": "healthy",
         "service": "copilot",
-        "circuit_breaker": circuit_breaker.state
+        "cache": llm.cache.stats() if llm.cache else None,
+        "coalescing": llm.single_flight.stats(),
+        "admission": admission.stats(),
+        **llm.stats()
     }
 
 
 async def call_ollama_safe(prompt: str):
-    if not circuit_breaker.can_attempt():
-        logger.warning("Circuit breaker OPEN, returning None")
-        return None
-    
+    """Return (output, Ollama timings), or (None, None) when the call failed."""
+    t_start = time.monotonic()
     try:
-        async with httpx.AsyncClient(timeout=300.0) as client:
-            response = await client.post(
-                f"{OLLAMA_URL}/api/generate",
-                json={
-                    "model": MODEL_NAME,
-                    "prompt": prompt,
-                    "stream": False,
-                    "options": {
-                        "temperature": TEMPERATURE,
-                        "num_predict": MAX_TOKENS
-                    }
-                }
-            )
-            
-            if response.status_code == 200:
-                circuit_breaker.record_success()
-                return response.json().get("response", "")
-            else:
-                circuit_breaker.record_failure()
-                return None
-                
+        result = await llm.generate(
+            MODEL_NAME,
+            prompt,
+            options=OLLAMA_OPTIONS
+        )
+        return result.get("response", ""), ollama_timings(result, time.monotonic() - t_start)
+    
+    except CircuitOpenError:
+        logger.warning("Circuit breaker OPEN, returning None")
+        return None, None
     except Exception as e:
         logger.error(f"Ollama call failed: {e}")
-        circuit_breaker.record_failure()
-        return None
+        return None, None
 
 
-@app.post("/analyze")
-async def analyze_incident(request: AnalyzeRequest):
-    logger.info(f"Received analyze request (circuit: {circuit_breaker.state})")
-    
-    prompt = f'''Analyze this incident briefly:
+def build_prompt(context: str) -> str:
+    return f'''Analyze this incident briefly:
 
-{request.context}
+{context}
 
 Provide:
 1. One sentence summary
@@ -120,22 +130,25 @@ ACTIONS:
 - [action 1]
 - [action 2]'''
 
-    output = await call_ollama_safe(prompt)
-    
+
+def build_analysis(output):
     # Always return valid response (fallback if needed)
     if not output or len(output) < 20:
         logger.info("Using fallback response")
+        fallbacks.inc(service="copilot", component="analysis")
         return {
             "summary": "Service experiencing errors requiring immediate attention",
             "actions": [
                 "Rollback recent deployment",
                 "Check system logs and metrics"
-            ]
+            ],
+            "fallbacks": ["analysis"]
         }
     
     # Parse
     summary = ""
     actions = []
+    used_fallbacks = []
     
     try:
         if "SUMMARY:" in output:
@@ -154,16 +167,65 @@ ACTIONS:
     
     if not summary:
         summary = "Service degradation detected"
+        fallbacks.inc(service="copilot", component="summary")
+        used_fallbacks.append("summary")
     
     if not actions:
         actions = ["Investigate recent changes", "Review system metrics"]
+        fallbacks.inc(service="copilot", component="actions")
+        used_fallbacks.append("actions")
     
     return {
         "summary": summary[:300],
-        "actions": actions[:3]
+        "actions": actions[:3],
+        "fallbacks": used_fallbacks
     }
 
 
+async def stream_analysis(prompt: str):
+    """Forward Ollama tokens as NDJSON events, ending with the parsed result."""
+    output = None
+    timings = None
+    parser = BriefStreamParser()
+    
+    t_start = time.monotonic()
+    try:
+        async for chunk in llm.generate_stream(
+            MODEL_NAME,
+            prompt,
+            options=OLLAMA_OPTIONS
+        ):
+            if chunk.get("done"):
+                timings = ollama_timings(chunk, time.monotonic() - t_start)
+            token = chunk.get("response", "")
+            if token:
+                yield ndjson({"event": "token", "text": token})
+                for event in parser.feed(token):
+                    yield ndjson(event)
+        for event in parser.close():
+            yield ndjson(event)
+        output = parser.text
+    except CircuitOpenError:
+        logger.warning("Circuit breaker OPEN, streaming fallback")
+    except Exception as e:
+        logger.error(f"Ollama stream failed: {e}")
+    
+    yield ndjson({"event": "done", **build_analysis(output), "ollama": timings})
+
+
+@app.post("/analyze")
+async def analyze_incident(request: AnalyzeRequest):
+    logger.info(f"Received analyze request (stream: {request.stream})")
+    
+    prompt = build_prompt(request.context)
+    
+    if request.stream:
+        return StreamingResponse(stream_analysis(prompt), media_type="application/x-ndjson")
+    
+    output, timings = await call_ollama_safe(prompt)
+    return {**build_analysis(output), "ollama": timings}
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
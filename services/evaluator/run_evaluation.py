@@ -4,53 +4,82 @@ import json
 import time
 import os
 from pathlib import Path
-from typing import Dict, List
+from typing import Awaitable, Callable, Dict, List
 import random
 from datetime import datetime
 
+from src.evaluation.scenarios import Scenario, load_registry
+from src.utils.admission import parse_retry_after
+from src.utils.ollama_timings import overhead_seconds
+from src.utils.retry import RetryableError, RetryBudget, RetryError, RetryPolicy
+from src.utils.tracing import Tracer, inject
+from src.utils.trial_log import TrialLogWriter, iter_results, iter_trials
 
-class IncidentScenario:
-    def __init__(self):
-        self.name = "auth_service_regression"
-        self.description = "Authentication service experiencing 500 errors after deployment"
-        self.telemetry = {
-            "error_rate": "45%",
-            "affected_endpoints": ["/api/v1/login", "/api/v1/token/refresh"],
-            "deployment_version": "v2.4.0",
-            "previous_version": "v2.3.0",
-            "database_connections": "340/400 (85% utilization)",
-            "response_time_p95": "2400ms (baseline: 180ms)",
-            "first_error_timestamp": "2025-11-01T14:32:17Z"
-        }
-        self.ground_truth_resolution = "rollback auth-service deployment to v2.3.0 verify database connection pool"
-        
-    def to_context(self) -> str:
-        return f'''Incident: {self.description}
-
-Telemetry:
-- Error rate: {self.telemetry['error_rate']}
-- Affected endpoints: {', '.join(self.telemetry['affected_endpoints'])}
-- Current deployment: {self.telemetry['deployment_version']}
-- Previous stable version: {self.telemetry['previous_version']}
-- Database connections: {self.telemetry['database_connections']}
-- Response time (p95): {self.telemetry['response_time_p95']}
 
-What is the root cause and what actions should be taken?'''
+CONDITIONS = ["C1", "C2", "C3"]
 
 
-class RateLimiter:
-    def __init__(self, calls_per_minute: int = 10):
+class TokenBucketLimiter:
+    """Async token bucket that is safe to share between concurrent trials.
+    
+    Tokens refill continuously at calls_per_minute / 60 per second up to
+    `burst`. Callers queue on an asyncio.Lock, which wakes waiters in FIFO
+    order, so concurrent trials are admitted fairly and never spend the
+    same token twice. calls_per_minute <= 0 disables limiting. `clock` and
+    `sleep` can be replaced to test without waiting.
+    """
+    
+    def __init__(
+        self,
+        calls_per_minute: float = 10,
+        burst: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep
+    ):
         self.calls_per_minute = calls_per_minute
-        self.min_interval = 60.0 / calls_per_minute
-        self.last_call = 0
+        self.rate = calls_per_minute / 60.0
+        self.burst = max(1, burst)
+        self.clock = clock
+        self.sleep = sleep
+        self.tokens = float(self.burst)
+        self.updated = clock()
+        self.lock = asyncio.Lock()
+        
+        self.calls = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+    
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
     
-    async def wait(self):
-        now = time.time()
-        time_since_last = now - self.last_call
-        if time_since_last < self.min_interval:
-            wait_time = self.min_interval - time_since_last
-            await asyncio.sleep(wait_time)
-        self.last_call = time.time()
+    async def wait(self) -> float:
+        """Take one token, sleeping until available. Returns seconds waited."""
+        t_enter = self.clock()
+        async with self.lock:
+            if self.rate > 0:
+                self._refill()
+                if self.tokens < 1:
+                    await self.sleep((1 - self.tokens) / self.rate)
+                    self._refill()
+                self.tokens = max(0.0, self.tokens - 1)
+        
+        waited = self.clock() - t_enter
+        self.calls += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+        return waited
+    
+    def stats(self) -> Dict:
+        return {
+            "calls_per_minute": self.calls_per_minute,
+            "burst": self.burst,
+            "calls": self.calls,
+            "total_wait": round(self.total_wait, 3),
+            "mean_wait": round(self.total_wait / self.calls, 3) if self.calls else 0.0,
+            "max_wait": round(self.max_wait, 3)
+        }
 
 
 class Evaluator:
@@ -59,240 +88,420 @@ class Evaluator:
         self.multiagent_url = os.getenv("MULTIAGENT_URL", "http://multiagent:8000")
         self.trials_per_condition = int(os.getenv("TRIALS_PER_CONDITION", "116"))
         self.random_seed = int(os.getenv("RANDOM_SEED", "42"))
+        # Model the services run; recorded so a resume cannot mix models
+        self.model = os.getenv("MODEL_NAME", "tinyllama")
         self.results_dir = Path(os.getenv("RESULTS_DIR", "/app/results"))
+        self.stream_responses = os.getenv("STREAM_RESPONSES", "0") == "1"
+        # Model loads can take minutes on CPU; wait this long for /ready
+        self.service_ready_timeout = float(os.getenv("SERVICE_READY_TIMEOUT", "600"))
         
-        # Rate limiters to prevent overwhelming services
-        self.rate_limiter = RateLimiter(calls_per_minute=10)  # 10 calls per minute max
+        # Concurrency: workers per condition, optional seeded interleaving
+        self.workers = {
+            condition: max(1, int(os.getenv(f"{condition}_WORKERS", "1")))
+            for condition in CONDITIONS
+        }
+        self.interleave_conditions = os.getenv("INTERLEAVE_CONDITIONS", "0") == "1"
+        self.resume = os.getenv("RESUME", "0") == "1"
+        
+        # Trial sink: append-only JSONL, gzip-compressed when the name ends in .gz
+        self.trial_log_path = self.results_dir / os.getenv("TRIAL_LOG", "trials.jsonl")
+        self.trial_log_fsync_every = int(os.getenv("TRIAL_LOG_FSYNC_EVERY", "10"))
+        self.export_all_trials = os.getenv("EXPORT_ALL_TRIALS", "0") == "1"
+        self.trial_log = None
         
-        random.seed(self.random_seed)
+        # One trace per trial; traceparent is forwarded to the services (TRACE_FILE exports spans)
+        self.tracer = Tracer.from_config("evaluator")
+        
+        # Rate limiters to prevent overwhelming services (one budget per target)
+        self.rate_limiters = {
+            target: TokenBucketLimiter(
+                calls_per_minute=float(os.getenv(f"{target.upper()}_CALLS_PER_MIN", "10")),
+                burst=int(os.getenv(f"{target.upper()}_BURST", "1"))
+            )
+            for target in ("copilot", "multiagent")
+        }
+        
+        # Jittered exponential backoff (RETRY_* settings); each target's budget is
+        # shared by its concurrent trials so a failing service is not hammered
+        self.retry_policies = {
+            target: RetryPolicy(budget=RetryBudget(), retry_on=(httpx.TransportError, ValueError))
+            for target in ("copilot", "multiagent")
+        }
         
         self.results_dir.mkdir(parents=True, exist_ok=True)
-        (self.results_dir / "trials").mkdir(exist_ok=True)
         
-        self.scenario = IncidentScenario()
+        # Scenarios to sweep: comma-separated ids/names or "all"
+        self.registry = load_registry()
+        scenario_spec = os.getenv("SCENARIOS")
+        self.scenarios = self.registry.select(scenario_spec) if scenario_spec else [self.registry.default]
     
     async def wait_for_services(self):
+        """Wait until each service reports its model warm on /ready.
+        
+        /ready answers 503 while the service is still loading the model, so
+        trials never start against a cold model. Gives up after
+        SERVICE_READY_TIMEOUT seconds and continues anyway.
+        """
         services = {
-            "copilot": f"{self.copilot_url}/health",
-            "multiagent": f"{self.multiagent_url}/health"
+            "copilot": f"{self.copilot_url}/ready",
+            "multiagent": f"{self.multiagent_url}/ready"
         }
         
         print("Waiting for services to be ready...")
         async with httpx.AsyncClient(timeout=30.0) as client:
             for name, url in services.items():
-                max_retries = 30
-                for attempt in range(max_retries):
+                deadline = time.monotonic() + self.service_ready_timeout
+                status = None
+                while True:
                     try:
                         response = await client.get(url)
                         if response.status_code == 200:
-                            print(f"✓ {name} is ready")
+                            status = response.json()
                             break
-                    except Exception as e:
-                        if attempt == max_retries - 1:
-                            print(f"⚠ {name} not responding, continuing anyway")
-                        await asyncio.sleep(2)
+                    except Exception:
+                        pass
+                    if time.monotonic() >= deadline:
+                        break
+                    await asyncio.sleep(2)
+                
+                if status is None:
+                    print(f"⚠ {name} not ready after {self.service_ready_timeout:g}s, continuing anyway")
+                elif status.get("seconds") is not None:
+                    print(f"✓ {name} is ready (model warm after {status['seconds']:.1f}s)")
+                else:
+                    print(f"✓ {name} is ready")
+    
+    async def post_trial(self, client: httpx.AsyncClient, url: str, scenario: Scenario, t_start: float):
+        """POST the scenario to a service, returning (result, timings).
+        
+        In streaming mode the NDJSON events are consumed as they arrive so
+        time-to-first-token (ttft) and time-to-first-action (tta) can be
+        recorded relative to the same t_start as T2U. A non-200 answer raises
+        ``RetryableError`` carrying the service's Retry-After, if any.
+        """
+        payload = {"context": scenario.context}
+        
+        with self.tracer.span(f"POST {url}", kind="client") as span:
+            if not self.stream_responses:
+                response = await client.post(url, json=payload, headers=inject())
+                span.set_attribute("http.status_code", response.status_code)
+                self.check_status(response)
+                return response.json(), {}
+            
+            payload["stream"] = True
+            timings = {"ttft": None, "tta": None}
+            result = None
+            async with client.stream("POST", url, json=payload, headers=inject()) as response:
+                span.set_attribute("http.status_code", response.status_code)
+                self.check_status(response)
+                async for line in response.aiter_lines():
+                    if not line.strip():
+                        continue
+                    event = json.loads(line)
+                    elapsed = time.time() - t_start
+                    if event["event"] == "token" and timings["ttft"] is None:
+                        timings["ttft"] = elapsed
+                    elif event["event"] == "action" and timings["tta"] is None:
+                        timings["tta"] = elapsed
+                    elif event["event"] == "done":
+                        result = event
+            if result is None:
+                raise RetryableError("stream ended without a done event")
+            return result, timings
     
-    async def run_c1_baseline(self, trial_id: int) -> Dict:
+    @staticmethod
+    def check_status(response: httpx.Response):
+        if response.status_code != 200:
+            raise RetryableError(
+                f"HTTP {response.status_code}",
+                status_code=response.status_code,
+                retry_after=parse_retry_after(response.headers.get("retry-after"))
+            )
+    
+    def trial_rng(self, scenario: Scenario, condition: str, trial_id: int) -> random.Random:
+        # One RNG per trial keeps simulated values reproducible regardless of
+        # how many trials run concurrently or in which order they finish.
+        return random.Random(f"{self.random_seed}:{scenario.name}:{condition}:{trial_id}")
+    
+    async def run_c1_baseline(self, scenario: Scenario, trial_id: int) -> Dict:
         t_start = time.time()
-        simulated_comprehension_time = random.gauss(120, 6.5)
+        simulated_comprehension_time = self.trial_rng(scenario, "C1", trial_id).gauss(120, 6.5)
         await asyncio.sleep(0.1)
         t_end = t_start + simulated_comprehension_time
         
         return {
             "trial_id": f"C1_{trial_id:03d}",
             "condition": "C1",
+            "scenario": scenario.name,
             "t2u": simulated_comprehension_time,
             "actions": [],
             "output": "Manual dashboard analysis (no AI assistance)",
             "timestamp": datetime.now().isoformat()
         }
     
-    async def run_c2_single_agent(self, trial_id: int) -> Dict:
+    async def run_c2_single_agent(self, scenario: Scenario, trial_id: int) -> Dict:
         # Apply rate limiting
-        await self.rate_limiter.wait()
+        rate_limit_wait = await self.rate_limiters["copilot"].wait()
         
         t_start = time.time()
-        max_retries = 3
-        
-        for attempt in range(max_retries):
-            try:
-                async with httpx.AsyncClient(timeout=180.0) as client:
-                    response = await client.post(
-                        f"{self.copilot_url}/analyze",
-                        json={"context": self.scenario.to_context()}
-                    )
-                    
-                    if response.status_code == 200:
-                        result = response.json()
-                        t_end = time.time()
-                        t2u = t_end - t_start
-                        
-                        return {
-                            "trial_id": f"C2_{trial_id:03d}",
-                            "condition": "C2",
-                            "t2u": t2u,
-                            "actions": result.get("actions", []),
-                            "output": result.get("summary", ""),
-                            "timestamp": datetime.now().isoformat()
-                        }
-                    else:
-                        print(f"C2 trial {trial_id} attempt {attempt + 1}: Status {response.status_code}")
-                        if attempt < max_retries - 1:
-                            await asyncio.sleep(10)  # Wait before retry
-                        
-            except Exception as e:
-                print(f"C2 trial {trial_id} attempt {attempt + 1}: {type(e).__name__}")
-                if attempt < max_retries - 1:
-                    await asyncio.sleep(10)
-        
-        # All retries failed - use fallback
-        print(f"C2 trial {trial_id}: All retries failed, using fallback")
+        
+        async def attempt():
+            async with httpx.AsyncClient(timeout=180.0) as client:
+                return await self.post_trial(client, f"{self.copilot_url}/analyze", scenario, t_start)
+        
+        try:
+            (result, timings), retries = await self.retry_policies["copilot"].run(attempt, f"C2 trial {trial_id}")
+        except RetryError as e:
+            # All retries failed - use fallback
+            print(f"{e}, using fallback")
+            return {
+                "trial_id": f"C2_{trial_id:03d}",
+                "condition": "C2",
+                "scenario": scenario.name,
+                "t2u": self.trial_rng(scenario, "C2", trial_id).gauss(79, 5.0),
+                "actions": scenario.fallback_actions.get("C2", []),
+                "output": "Analysis unavailable - using fallback",
+                "fallback": True,
+                "rate_limit_wait": rate_limit_wait,
+                **e.state.to_dict(),
+                "timestamp": datetime.now().isoformat()
+            }
+        
+        t_end = time.time()
+        t2u = t_end - t_start
+        
         return {
             "trial_id": f"C2_{trial_id:03d}",
             "condition": "C2",
-            "t2u": random.gauss(79, 5.0),
-            "actions": [
-                "Rollback auth-service to previous version",
-                "Check database connection pool"
-            ],
-            "output": "Analysis unavailable - using fallback",
-            "fallback": True,
+            "scenario": scenario.name,
+            "t2u": t2u,
+            **timings,
+            "rate_limit_wait": rate_limit_wait,
+            **retries.to_dict(),
+            "ollama": result.get("ollama"),
+            "overhead_seconds": overhead_seconds(t2u, result.get("ollama")),
+            "actions": result.get("actions", []),
+            "output": result.get("summary", ""),
             "timestamp": datetime.now().isoformat()
         }
     
-    async def run_c3_multi_agent(self, trial_id: int) -> Dict:
+    async def run_c3_multi_agent(self, scenario: Scenario, trial_id: int) -> Dict:
         # Apply rate limiting
-        await self.rate_limiter.wait()
+        rate_limit_wait = await self.rate_limiters["multiagent"].wait()
         
         t_start = time.time()
-        max_retries = 3
-        
-        for attempt in range(max_retries):
-            try:
-                async with httpx.AsyncClient(timeout=240.0) as client:  # 4 minutes
-                    response = await client.post(
-                        f"{self.multiagent_url}/orchestrate",
-                        json={"context": self.scenario.to_context()}
-                    )
-                    
-                    if response.status_code == 200:
-                        result = response.json()
-                        t_end = time.time()
-                        t2u = t_end - t_start
-                        
-                        return {
-                            "trial_id": f"C3_{trial_id:03d}",
-                            "condition": "C3",
-                            "t2u": t2u,
-                            "actions": result.get("actions", []),
-                            "output": result.get("brief", ""),
-                            "agent_outputs": result.get("agent_outputs", {}),
-                            "timestamp": datetime.now().isoformat()
-                        }
-                    else:
-                        print(f"C3 trial {trial_id} attempt {attempt + 1}: Status {response.status_code}")
-                        if attempt < max_retries - 1:
-                            await asyncio.sleep(15)
-                        
-            except Exception as e:
-                print(f"C3 trial {trial_id} attempt {attempt + 1}: {type(e).__name__}")
-                if attempt < max_retries - 1:
-                    await asyncio.sleep(15)
-        
-        # All retries failed - use fallback
-        print(f"C3 trial {trial_id}: All retries failed, using fallback")
+        
+        async def attempt():
+            async with httpx.AsyncClient(timeout=240.0) as client:  # 4 minutes
+                return await self.post_trial(client, f"{self.multiagent_url}/orchestrate", scenario, t_start)
+        
+        try:
+            (result, timings), retries = await self.retry_policies["multiagent"].run(attempt, f"C3 trial {trial_id}")
+        except RetryError as e:
+            # All retries failed - use fallback
+            print(f"{e}, using fallback")
+            return {
+                "trial_id": f"C3_{trial_id:03d}",
+                "condition": "C3",
+                "scenario": scenario.name,
+                "t2u": self.trial_rng(scenario, "C3", trial_id).gauss(50, 3.5),
+                "actions": scenario.fallback_actions.get("C3", []),
+                "output": "Multi-agent analysis unavailable - using fallback",
+                "fallback": True,
+                "rate_limit_wait": rate_limit_wait,
+                **e.state.to_dict(),
+                "timestamp": datetime.now().isoformat()
+            }
+        
+        t_end = time.time()
+        t2u = t_end - t_start
+        
         return {
             "trial_id": f"C3_{trial_id:03d}",
             "condition": "C3",
-            "t2u": random.gauss(50, 3.5),
-            "actions": [
-                "Rollback auth-service to v2.3.0",
-                "Verify database connection pool settings",
-                "Monitor error rates post-rollback"
-            ],
-            "output": "Multi-agent analysis unavailable - using fallback",
-            "fallback": True,
+            "scenario": scenario.name,
+            "t2u": t2u,
+            **timings,
+            "rate_limit_wait": rate_limit_wait,
+            **retries.to_dict(),
+            "ollama": result.get("ollama"),
+            "overhead_seconds": overhead_seconds(t2u, result.get("ollama")),
+            "actions": result.get("actions", []),
+            "output": result.get("brief", ""),
+            "agent_outputs": result.get("agent_outputs", {}),
+            "agent_timings": result.get("agent_timings", {}),
+            "critical_path": result.get("critical_path", []),
+            "partial_agents": result.get("partial_agents", []),
             "timestamp": datetime.now().isoformat()
         }
     
     def save_trial(self, trial_data: Dict):
-        trial_id = trial_data['trial_id']
-        filepath = self.results_dir / "trials" / f"trial_{trial_id}.json"
+        self.trial_log.append(trial_data)
+    
+    def load_completed_trial_ids(self) -> set:
+        # Reads the trial log, or per-trial files left by older runs; records
+        # written before scenarios were tracked belong to the default scenario.
+        default = self.registry.default.name
+        return {
+            (trial.get('scenario', default), trial['trial_id'])
+            for trial in iter_results(self.results_dir)
+        }
+    
+    def write_all_trials(self, metadata: Dict):
+        """Export the trial log as a legacy all_trials.json, one record at a time."""
+        with open(self.results_dir / "all_trials.json", 'w') as f:
+            f.write('{"metadata": ' + json.dumps(metadata, indent=2) + ',\n"trials": [\n')
+            for i, trial in enumerate(iter_trials(self.trial_log_path)):
+                f.write((",\n" if i else "") + json.dumps(trial))
+            f.write("\n]}\n")
+    
+    def check_run_manifest(self):
+        """Record the run configuration, refusing to resume into a different one."""
+        manifest_path = self.results_dir / "run_manifest.json"
+        manifest = {
+            "model": self.model,
+            "random_seed": self.random_seed,
+            "trials_per_condition": self.trials_per_condition,
+            "scenarios": [scenario.name for scenario in self.scenarios]
+        }
+        
+        if self.resume and manifest_path.exists():
+            with open(manifest_path, 'r') as f:
+                previous = json.load(f)
+            mismatched = [key for key in manifest if previous.get(key) != manifest[key]]
+            if mismatched:
+                raise SystemExit(
+                    f"Cannot resume: {', '.join(mismatched)} differ from the run in {self.results_dir}"
+                )
         
-        with open(filepath, 'w') as f:
-            json.dump(trial_data, f, indent=2)
+        with open(manifest_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
     
     async def run_all_trials(self):
         print(f"\n{'='*60}")
         print(f"MyAntFarm.ai Evaluation")
         print(f"{'='*60}")
         print(f"Configuration:")
+        print(f"  - Model: {self.model}")
         print(f"  - Trials per condition: {self.trials_per_condition}")
         print(f"  - Random seed: {self.random_seed}")
-        print(f"  - Rate limit: 10 calls/minute")
+        for target, limiter in self.rate_limiters.items():
+            print(f"  - Rate limit ({target}): {limiter.calls_per_minute:g} calls/minute, burst {limiter.burst}")
+        retry = self.retry_policies["copilot"]
+        print(f"  - Retries: {retry.max_attempts} attempts, backoff {retry.base_delay:g}-{retry.max_delay:g}s, budget {retry.budget.ratio:g}/call")
+        print(f"  - Streaming responses: {self.stream_responses}")
+        print(f"  - Workers: {', '.join(f'{c}={n}' for c, n in self.workers.items())}")
+        print(f"  - Interleave conditions: {self.interleave_conditions}")
+        print(f"  - Resume: {self.resume}")
+        print(f"  - Trial log: {self.trial_log_path.name}")
         print(f"  - Results directory: {self.results_dir}")
-        print(f"  - Scenario: {self.scenario.name}")
+        print(f"  - Scenarios: {', '.join(scenario.name for scenario in self.scenarios)}")
         print(f"{'='*60}\n")
         
-        await self.wait_for_services()
-        
-        all_trials = []
-        total_trials = self.trials_per_condition * 3
-        completed = 0
-        
-        print(f"\nRunning C1 (Baseline) trials...")
-        for i in range(self.trials_per_condition):
-            trial = await self.run_c1_baseline(i)
-            self.save_trial(trial)
-            all_trials.append(trial)
-            completed += 1
-            if (i + 1) % 20 == 0:
-                print(f"  Progress: {completed}/{total_trials} trials ({completed/total_trials*100:.1f}%)")
+        self.check_run_manifest()
+        completed_ids = self.load_completed_trial_ids() if self.resume else set()
+        if completed_ids:
+            print(f"Resuming: {len(completed_ids)} completed trials found and will be skipped\n")
         
-        print(f"✓ C1 complete: {self.trials_per_condition} trials")
+        await self.wait_for_services()
         
-        print(f"\nRunning C2 (Single-Agent) trials...")
-        print(f"  (Rate limited: ~6 seconds per trial)")
-        for i in range(self.trials_per_condition):
-            trial = await self.run_c2_single_agent(i)
-            self.save_trial(trial)
-            all_trials.append(trial)
-            completed += 1
-            if (i + 1) % 10 == 0:
-                print(f"  Progress: {completed}/{total_trials} trials ({completed/total_trials*100:.1f}%)")
+        self.trial_log = TrialLogWriter(
+            self.trial_log_path,
+            fsync_every=self.trial_log_fsync_every,
+            truncate=not self.resume
+        )
         
-        print(f"✓ C2 complete: {self.trials_per_condition} trials")
+        total_trials = self.trials_per_condition * len(CONDITIONS) * len(self.scenarios)
+        progress = {"completed": 0}
+        runners = {
+            "C1": self.run_c1_baseline,
+            "C2": self.run_c2_single_agent,
+            "C3": self.run_c3_multi_agent
+        }
+        semaphores = {
+            condition: asyncio.Semaphore(self.workers[condition])
+            for condition in CONDITIONS
+        }
         
-        print(f"\nRunning C3 (Multi-Agent) trials...")
-        print(f"  (Rate limited: ~6 seconds per trial)")
-        for i in range(self.trials_per_condition):
-            trial = await self.run_c3_multi_agent(i)
+        async def run_trial(scenario: Scenario, condition: str, trial_id: int):
+            # Simulated values come from per-trial RNGs, so skipping finished
+            # trials leaves the remaining ones exactly as a fresh run would be.
+            if (scenario.name, f"{condition}_{trial_id:03d}") in completed_ids:
+                progress["completed"] += 1
+                return
+            
+            async with semaphores[condition]:
+                attributes = {"trial_id": f"{condition}_{trial_id:03d}", "condition": condition, "scenario": scenario.name}
+                with self.tracer.span(f"trial {condition}", attributes=attributes) as span:
+                    trial = await runners[condition](scenario, trial_id)
+                    span.set_attribute("fallback", trial.get("fallback", False))
+            trial["trace_id"] = span.trace_id
             self.save_trial(trial)
-            all_trials.append(trial)
-            completed += 1
-            if (i + 1) % 10 == 0:
+            progress["completed"] += 1
+            if progress["completed"] % 10 == 0:
+                completed = progress["completed"]
                 print(f"  Progress: {completed}/{total_trials} trials ({completed/total_trials*100:.1f}%)")
         
-        print(f"✓ C3 complete: {self.trials_per_condition} trials")
+        try:
+            if self.interleave_conditions:
+                jobs = [
+                    (scenario, condition, i)
+                    for scenario in self.scenarios
+                    for condition in CONDITIONS
+                    for i in range(self.trials_per_condition)
+                ]
+                random.Random(self.random_seed).shuffle(jobs)
+                print(f"\nRunning {total_trials} trials interleaved across conditions (seed {self.random_seed})...")
+                await asyncio.gather(*(run_trial(s, c, i) for s, c, i in jobs))
+                print(f"✓ All conditions complete: {total_trials} trials")
+            else:
+                for scenario in self.scenarios:
+                    for condition in CONDITIONS:
+                        print(f"\nRunning {scenario.name} {condition} trials ({self.workers[condition]} worker(s))...")
+                        await asyncio.gather(
+                            *(run_trial(scenario, condition, i) for i in range(self.trials_per_condition))
+                        )
+                        print(f"✓ {condition} complete: {self.trials_per_condition} trials")
+        finally:
+            self.trial_log.close()
+            self.tracer.close()
         
-        results_summary = {
-            "metadata": {
-                "total_trials": total_trials,
-                "trials_per_condition": self.trials_per_condition,
-                "random_seed": self.random_seed,
-                "scenario": self.scenario.name,
-                "timestamp": datetime.now().isoformat()
+        metadata = {
+            "total_trials": total_trials,
+            "trials_per_condition": self.trials_per_condition,
+            "model": self.model,
+            "random_seed": self.random_seed,
+            "workers": self.workers,
+            "interleave_conditions": self.interleave_conditions,
+            "rate_limits": {
+                target: limiter.stats()
+                for target, limiter in self.rate_limiters.items()
+            },
+            "retry_budgets": {
+                target: policy.budget.stats()
+                for target, policy in self.retry_policies.items()
             },
-            "trials": all_trials
+            "scenarios": [scenario.name for scenario in self.scenarios],
+            "trial_log": self.trial_log_path.name,
+            "timestamp": datetime.now().isoformat()
         }
         
-        with open(self.results_dir / "all_trials.json", 'w') as f:
-            json.dump(results_summary, f, indent=2)
+        with open(self.results_dir / "run_summary.json", 'w') as f:
+            json.dump(metadata, f, indent=2)
+        
+        if self.export_all_trials:
+            self.write_all_trials(metadata)
         
         print(f"\n{'='*60}")
         print(f"✅ Evaluation complete!")
         print(f"{'='*60}")
         print(f"Total trials: {total_trials}")
+        for target, limiter in self.rate_limiters.items():
+            stats = limiter.stats()
+            print(f"Rate limit wait ({target}): {stats['total_wait']:.1f}s total, {stats['max_wait']:.1f}s max")
+        for target, policy in self.retry_policies.items():
+            stats = policy.budget.stats()
+            print(f"Retries ({target}): {stats['retries']} over {stats['calls']} calls, {stats['denied']} denied by budget")
         print(f"Results saved to: {self.results_dir}")
         print(f"{'='*60}\n")
 
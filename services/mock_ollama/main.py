@@ -0,0 +1,227 @@
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+from typing import Dict, List, Optional, Union
+import os
+import re
+import json
+import time
+import random
+import asyncio
+import hashlib
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Stand-in for Ollama's /api/generate with scripted latency, token rate, errors and canned text.
+# The profile is a JSON file (MOCK_OLLAMA_PROFILE); PUT /mock/profile swaps it at runtime.
+PROFILE_PATH = os.getenv("MOCK_OLLAMA_PROFILE", os.path.join(os.path.dirname(__file__), "profiles", "default.json"))
+
+DEFAULT_PROFILE = {
+    "seed": 42,
+    "models": [],
+    "parallel": 1,
+    "load_seconds": 0.0,
+    "latency": {"dist": "constant", "value": 0.1},
+    "tokens_per_second": {"dist": "constant", "value": 50.0},
+    "max_tokens": 128,
+    "errors": {"rate": 0.0, "status": 500, "hang_rate": 0.0, "hang_seconds": 600.0},
+    "responses": [],
+    "default_response": "SUMMARY: Service degradation detected.\nACTIONS:\n- Rollback the recent deployment\n- Check system logs and metrics"
+}
+
+
+def sample(spec: Union[float, int, Dict], rng: random.Random) -> float:
+    """Draw from a distribution spec; a bare number is a constant. Never negative."""
+    if isinstance(spec, (int, float)):
+        return float(spec)
+    dist = spec.get("dist", "constant")
+    if dist == "constant":
+        value = spec["value"]
+    elif dist == "uniform":
+        value = rng.uniform(spec["low"], spec["high"])
+    elif dist == "normal":
+        value = rng.gauss(spec["mean"], spec["stddev"])
+    elif dist == "lognormal":
+        value = spec["median"] * rng.lognormvariate(0.0, spec["sigma"])
+    elif dist == "exponential":
+        value = rng.expovariate(1.0 / spec["mean"])
+    else:
+        raise ValueError(f"Unknown distribution '{dist}'")
+    return max(0.0, value)
+
+
+class MockOllama:
+    def __init__(self, profile: Dict):
+        self.load(profile)
+        self.loaded_models = set()
+        self.stats = {"requests": 0, "errors": 0, "hangs": 0, "tokens": 0}
+    
+    def load(self, profile: Dict):
+        self.profile = {**DEFAULT_PROFILE, **profile}
+        self.profile["errors"] = {**DEFAULT_PROFILE["errors"], **profile.get("errors", {})}
+        for spec in (self.profile["latency"], self.profile["tokens_per_second"]):
+            sample(spec, random.Random(0))  # fail fast on a bad spec
+        self.responses = [
+            (re.compile(entry["match"] if entry.get("regex") else re.escape(entry["match"]), re.IGNORECASE), entry["response"])
+            for entry in self.profile["responses"]
+        ]
+        self.slots = asyncio.Semaphore(max(1, int(self.profile["parallel"])))
+        self.seen: Dict[str, int] = {}
+    
+    def rng(self, prompt: str) -> random.Random:
+        # Seeded per prompt and occurrence, so draws don't depend on arrival order
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:16]
+        occurrence = self.seen.get(digest, 0)
+        self.seen[digest] = occurrence + 1
+        return random.Random(f"{self.profile['seed']}:{digest}:{occurrence}")
+    
+    def response_for(self, prompt: str) -> str:
+        for pattern, response in self.responses:
+            if pattern.search(prompt):
+                return response
+        return self.profile["default_response"]
+    
+    def check_model(self, model: str):
+        models = self.profile["models"]
+        if models and model not in models:
+            raise HTTPException(status_code=404, detail=f"model '{model}' not found, try pulling it first")
+
+
+def load_profile(path: str) -> Dict:
+    if not os.path.exists(path):
+        logger.warning(f"Profile {path} not found, using built-in defaults")
+        return {}
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+mock = MockOllama(load_profile(PROFILE_PATH))
+
+app = FastAPI(title="Mock Ollama")
+
+
+class GenerateRequest(BaseModel):
+    model: str
+    prompt: str = ""
+    stream: bool = True
+    options: Dict = {}
+    keep_alive: Optional[Union[str, int]] = None
+
+
+def tokenize(text: str) -> List[str]:
+    # Word-ish tokens that concatenate back to the original text
+    return re.findall(r"\S+\s*|\s+", text)
+
+
+@app.get("/")
+async def root():
+    return "Ollama is running"
+
+
+@app.get("/api/version")
+async def version():
+    return {"version": "0.1.32-mock"}
+
+
+@app.get("/api/tags")
+async def tags():
+    return {"models": [{"name": model} for model in mock.profile["models"]]}
+
+
+@app.get("/mock/stats")
+async def stats():
+    return {**mock.stats, "loaded_models": sorted(mock.loaded_models)}
+
+
+@app.put("/mock/profile")
+async def set_profile(profile: Dict):
+    try:
+        mock.load(profile)
+    except (KeyError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid profile: {e}")
+    logger.info("Profile replaced")
+    return mock.profile
+
+
+@app.post("/api/generate")
+async def generate(request: GenerateRequest):
+    mock.check_model(request.model)
+    mock.stats["requests"] += 1
+    rng = mock.rng(request.prompt)
+    errors = mock.profile["errors"]
+    
+    # Injected failures are decided up front so they are reproducible per prompt
+    roll = rng.random()
+    if roll < errors["rate"]:
+        mock.stats["errors"] += 1
+        return JSONResponse({"error": "injected failure"}, status_code=errors["status"])
+    if roll < errors["rate"] + errors["hang_rate"]:
+        mock.stats["hangs"] += 1
+        await asyncio.sleep(errors["hang_seconds"])
+    
+    if not request.stream:
+        text = []
+        async for chunk in produce(request, rng):
+            text.append(chunk["response"])
+        return {**chunk, "response": "".join(text)}
+    
+    async def stream():
+        async for chunk in produce(request, rng):
+            yield json.dumps(chunk) + "\n"
+    
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+async def produce(request: GenerateRequest, rng: random.Random):
+    """Yield token chunks then the final chunk with Ollama's timing fields.
+    
+    Holds a model slot for the whole generation, so requests beyond
+    ``parallel`` queue as they do on a real Ollama server.
+    """
+    t_start = time.monotonic()
+    async with mock.slots:
+        load_seconds = 0.0
+        if request.model not in mock.loaded_models:
+            load_seconds = float(mock.profile["load_seconds"])
+            await asyncio.sleep(load_seconds)
+            mock.loaded_models.add(request.model)
+        
+        final = {
+            "model": request.model,
+            "response": "",
+            "done": True,
+            "load_duration": int(load_seconds * 1e9)
+        }
+        
+        # An empty prompt only loads the model, like Ollama
+        if request.prompt:
+            prompt_seconds = sample(mock.profile["latency"], rng)
+            rate = max(sample(mock.profile["tokens_per_second"], rng), 1e-3)
+            max_tokens = request.options.get("num_predict", mock.profile["max_tokens"])
+            tokens = tokenize(mock.response_for(request.prompt))
+            if max_tokens is not None and max_tokens >= 0:
+                tokens = tokens[:max_tokens]
+            
+            await asyncio.sleep(prompt_seconds)
+            t_eval = time.monotonic()
+            for token in tokens:
+                await asyncio.sleep(1.0 / rate)
+                mock.stats["tokens"] += 1
+                yield {"model": request.model, "response": token, "done": False}
+            
+            final.update({
+                "prompt_eval_count": len(tokenize(request.prompt)),
+                "prompt_eval_duration": int(prompt_seconds * 1e9),
+                "eval_count": len(tokens),
+                "eval_duration": int((time.monotonic() - t_eval) * 1e9)
+            })
+        
+        final["total_duration"] = int((time.monotonic() - t_start) * 1e9)
+        yield final
+
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host="0.0.0.0", port=11434)
@@ -1,23 +1,141 @@
-﻿from fastapi import FastAPI
+﻿from contextlib import asynccontextmanager
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-import httpx
 import os
+import json
 import logging
 import asyncio
+import time
+
+from src.orchestration.executor import DAGExecutor
+from src.orchestration.graph import AgentGraph, AgentNode
+from src.utils.admission import AdmissionController, instrument_admission
+from src.utils.circuit_breaker import CircuitBreakerRegistry, CircuitOpenError
+from src.utils.llm_interface import LLMInterface
+from src.utils.metrics import MetricsRegistry, instrument_app
+from src.utils.ollama_timings import combine_timings, ollama_timings
+from src.utils.readiness import Warmup, instrument_readiness
+from src.utils.response_cache import ResponseCache
+from src.utils.streaming import ndjson
+from src.utils.tracing import Tracer, instrument_tracing
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="MultiAgent Service")
-
 OLLAMA_URL = os.getenv("OLLAMA_URL", "http://ollama:11434")
+# Comma-separated list of Ollama servers to balance across (defaults to OLLAMA_URL)
+OLLAMA_URLS = os.getenv("OLLAMA_URLS", OLLAMA_URL)
 MODEL_NAME = os.getenv("MODEL_NAME", "tinyllama")
 TEMPERATURE = float(os.getenv("TEMPERATURE", "0.7"))
 MAX_TOKENS = int(os.getenv("MAX_TOKENS", "150"))
+OLLAMA_TIMEOUT = float(os.getenv("OLLAMA_TIMEOUT", "120.0"))
+ORCHESTRATION_TIMEOUT = float(os.getenv("ORCHESTRATION_TIMEOUT", "180.0"))
+# Early return: answer once these agents are done and QUORUM agents succeeded
+ORCHESTRATION_QUORUM = os.getenv("ORCHESTRATION_QUORUM")
+ORCHESTRATION_REQUIRED = os.getenv("ORCHESTRATION_REQUIRED")
+SEED = os.getenv("SEED")
+
+OLLAMA_OPTIONS = {"temperature": TEMPERATURE, "num_predict": MAX_TOKENS}
+if SEED:
+    OLLAMA_OPTIONS["seed"] = int(SEED)
+
+# Agent graphs: each agent's prompt sees the context and its dependencies' outputs
+AGENT_GRAPHS = {
+    # Simplified prompts for speed (the published C3 configuration)
+    "standard": [
+        {"name": "diagnosis", "prompt": "What caused this: {context}\nAnswer briefly:"},
+        {"name": "risk_assessment", "prompt": "Business impact: {context}\nAnswer briefly:"}
+    ],
+    "extended": [
+        {"name": "diagnosis", "prompt": "What caused this: {context}\nAnswer briefly:"},
+        {"name": "risk_assessment", "prompt": "Business impact: {context}\nAnswer briefly:"},
+        {
+            "name": "remediation",
+            "prompt": (
+                "Incident: {context}\nCause: {diagnosis}\nImpact: {risk_assessment}\n"
+                "List three specific remediation actions, one per line starting with '-':"
+            ),
+            "depends_on": ["diagnosis", "risk_assessment"],
+            "timeout": 90.0,
+            "max_chars": 1000
+        },
+        {
+            "name": "verification",
+            "prompt": "Planned remediation:\n{remediation}\nHow do we verify it worked? Answer briefly:",
+            "depends_on": ["remediation"],
+            "timeout": 60.0
+        }
+    ]
+}
+
+
+def load_agent_graph() -> AgentGraph:
+    """AGENT_GRAPH_FILE (JSON list of agents) wins over the built-in AGENT_GRAPH."""
+    graph_file = os.getenv("AGENT_GRAPH_FILE")
+    if graph_file:
+        with open(graph_file, "r") as f:
+            return AgentGraph.from_dicts(json.load(f))
+    return AgentGraph.from_dicts(AGENT_GRAPHS[os.getenv("AGENT_GRAPH", "standard")])
+
+
+executor = DAGExecutor(
+    load_agent_graph(),
+    deadline=ORCHESTRATION_TIMEOUT,
+    quorum=int(ORCHESTRATION_QUORUM) if ORCHESTRATION_QUORUM else None,
+    required=ORCHESTRATION_REQUIRED.split(",") if ORCHESTRATION_REQUIRED else None
+)
+
+metrics = MetricsRegistry()
+tracer = Tracer.from_config("multiagent")
+fallbacks = metrics.counter(
+    "myantfarm_fallbacks_total",
+    "Responses (or parts of them) replaced by canned fallback text",
+    ["service", "component"]
+)
+agent_seconds = metrics.histogram(
+    "myantfarm_agent_duration_seconds", "Agent run time by outcome", ["agent", "status"]
+)
+agent_runs = metrics.counter(
+    "myantfarm_agent_runs_total", "Agent outcomes, including agents that never started", ["agent", "status"]
+)
+
+# Response cache is opt-in (LLM_CACHE=deterministic|all); live runs stay uncached.
+# One circuit breaker per backend/model (CIRCUIT_BREAKER_* settings).
+llm = LLMInterface(
+    base_url=OLLAMA_URLS,
+    timeout=OLLAMA_TIMEOUT,
+    cache=ResponseCache.from_config(),
+    breakers=CircuitBreakerRegistry(),
+    metrics=metrics,
+    tracer=tracer
+)
+# Pre-load MODEL_NAME (OLLAMA_WARMUP=1) so the first trials don't pay the model load
+warmup = Warmup(llm, MODEL_NAME)
+# Bounded concurrency and wait queue (ADMISSION_* settings); overflow gets 429/503 + Retry-After
+admission = AdmissionController()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await llm.start()
+    warmup_task = asyncio.create_task(warmup.run())
+    yield
+    warmup_task.cancel()
+    await llm.aclose()
+    tracer.close()
+
+
+app = FastAPI(title="MultiAgent Service", lifespan=lifespan)
+instrument_admission(app, admission, metrics, "multiagent", ["/orchestrate"])
+instrument_app(app, metrics, "multiagent")
+instrument_tracing(app, tracer)
+instrument_readiness(app, warmup)
 
 
 class OrchestrationRequest(BaseModel):
     context: str
+    stream: bool = False
 
 
 class OrchestrationResponse(BaseModel):
@@ -26,23 +144,16 @@ class OrchestrationResponse(BaseModel):
     agent_outputs: dict
 
 
-async def call_ollama_safe(prompt: str):
+async def call_ollama_safe(prompt: str, options: dict = OLLAMA_OPTIONS):
+    """Return the raw Ollama response, or None when the call failed."""
     try:
-        async with httpx.AsyncClient(timeout=120.0) as client:
-            response = await client.post(
-                f"{OLLAMA_URL}/api/generate",
-                json={
-                    "model": MODEL_NAME,
-                    "prompt": prompt,
-                    "stream": False,
-                    "options": {
-                        "temperature": TEMPERATURE,
-                        "num_predict": MAX_TOKENS
-                    }
-                }
-            )
-            if response.status_code == 200:
-                return response.json().get("response", "")[:500]
+        return await llm.generate(
+            MODEL_NAME,
+            prompt,
+            options=options
+        )
+    except CircuitOpenError:
+        logger.warning("Circuit breaker OPEN, agent falls back")
     except:
         pass
     return None
@@ -50,44 +161,61 @@ async def call_ollama_safe(prompt: str):
 
 @app.get("/health")
 async def health():
-    return {"status": "healthy", "service": "multiagent"}
+    return {
+        "status": "healthy",
+        "service": "multiagent",
+        "cache": llm.cache.stats() if llm.cache else None,
+        "coalescing": llm.single_flight.stats(),
+        "admission": admission.stats(),
+        **llm.stats(),
+        "agents": [node.name for node in executor.graph]
+    }
 
 
-@app.post("/orchestrate")
-async def orchestrate(request: OrchestrationRequest):
-    logger.info("Starting orchestration")
-    
-    # Simplified prompts for speed
-    diagnosis_prompt = f"What caused this: {request.context[:200]}\nAnswer briefly:"
-    risk_prompt = f"Business impact: {request.context[:200]}\nAnswer briefly:"
-    
-    # Run in parallel with timeout
-    try:
-        diagnosis, risk = await asyncio.wait_for(
-            asyncio.gather(
-                call_ollama_safe(diagnosis_prompt),
-                call_ollama_safe(risk_prompt)
-            ),
-            timeout=180.0  # 3 minutes total
-        )
-    except asyncio.TimeoutError:
-        logger.warning("Orchestration timeout, using fallbacks")
-        diagnosis = "Analysis timeout"
-        risk = "Unable to assess"
+def agent_options(node: AgentNode) -> dict:
+    if node.max_tokens is None:
+        return OLLAMA_OPTIONS
+    return {**OLLAMA_OPTIONS, "num_predict": node.max_tokens}
+
+
+def parse_actions(text) -> list:
+    actions = []
+    for line in (text or "").split("\n"):
+        line = line.strip()
+        if line.startswith("-") or line.startswith("*"):
+            action = line.lstrip("-*").strip()
+            if len(action) > 5:
+                actions.append(action)
+    return actions
+
+
+def build_orchestration(outputs: dict):
+    diagnosis = outputs.get("diagnosis")
+    risk = outputs.get("risk_assessment")
+    used_fallbacks = []
     
     # Fallbacks
     if not diagnosis or len(diagnosis) < 10:
         diagnosis = "Database connection issues due to recent deployment"
+        fallbacks.inc(service="multiagent", component="diagnosis")
+        used_fallbacks.append("diagnosis")
     
     if not risk or len(risk) < 10:
         risk = "High impact - authentication failures affecting users"
+        fallbacks.inc(service="multiagent", component="risk_assessment")
+        used_fallbacks.append("risk_assessment")
     
-    # Standard actions
-    actions = [
-        "Rollback auth-service deployment to v2.3.0",
-        "Verify database connection pool configuration",
-        "Monitor error rates for 5 minutes"
-    ]
+    # Remediation agent's actions when the graph has one, else standard actions
+    actions = parse_actions(outputs.get("remediation"))
+    if not actions:
+        actions = [
+            "Rollback auth-service deployment to v2.3.0",
+            "Verify database connection pool configuration",
+            "Monitor error rates for 5 minutes"
+        ]
+        if "remediation" in outputs:
+            fallbacks.inc(service="multiagent", component="actions")
+            used_fallbacks.append("actions")
     
     brief = f'''DIAGNOSIS: {diagnosis}
 
@@ -96,16 +224,104 @@ BUSINESS IMPACT: {risk}
 RECOMMENDED ACTIONS:
 {chr(10).join(f'- {a}' for a in actions)}'''
     
+    if outputs.get("verification"):
+        brief += f"\n\nVERIFICATION: {outputs['verification']}"
+    
+    agent_outputs = {name: output or "" for name, output in outputs.items()}
+    agent_outputs.update({"diagnosis": diagnosis, "risk_assessment": risk})
+    
     return {
         "brief": brief,
         "actions": actions,
-        "agent_outputs": {
-            "diagnosis": diagnosis,
-            "risk_assessment": risk
-        }
+        "agent_outputs": agent_outputs,
+        "fallbacks": used_fallbacks
+    }
+
+
+def orchestration_response(result) -> dict:
+    for name, node in result.nodes.items():
+        agent_runs.inc(agent=name, status=node.status)
+        if node.duration is not None:
+            agent_seconds.observe(node.duration, agent=name, status=node.status)
+    
+    return {
+        **build_orchestration(result.outputs),
+        "agent_timings": result.timings(),
+        "critical_path": result.critical_path,
+        "partial": bool(result.partial_agents),
+        "partial_agents": result.partial_agents,
+        "early_return": result.early_return,
+        "elapsed": round(result.elapsed, 3),
+        "ollama": combine_timings(
+            {name: node.usage for name, node in result.nodes.items()}, result.critical_path
+        )
     }
 
 
+async def run_agent(node: AgentNode, prompt: str, emit) -> str:
+    t_start = time.monotonic()
+    with tracer.span(f"agent {node.name}", attributes={"agent": node.name}):
+        result = await call_ollama_safe(prompt, agent_options(node))
+    if result is None:
+        return None
+    emit({"event": "usage", "agent": node.name, "ollama": ollama_timings(result, time.monotonic() - t_start)})
+    return result.get("response", "")
+
+
+async def stream_agent(node: AgentNode, prompt: str, emit) -> str:
+    """Stream one agent's tokens as events and return its full output."""
+    text = ""
+    t_start = time.monotonic()
+    with tracer.span(f"agent {node.name}", attributes={"agent": node.name, "stream": True}):
+        async for chunk in llm.generate_stream(
+            MODEL_NAME,
+            prompt,
+            options=agent_options(node)
+        ):
+            if chunk.get("done"):
+                emit({"event": "usage", "agent": node.name, "ollama": ollama_timings(chunk, time.monotonic() - t_start)})
+            token = chunk.get("response", "")
+            if token:
+                text += token
+                emit({"event": "token", "agent": node.name, "text": token})
+    return text
+
+
+async def stream_orchestration(context: str):
+    """Stream agent events as NDJSON while the graph runs, ending with the brief."""
+    queue = asyncio.Queue()
+    
+    async def run():
+        try:
+            return await executor.run(context, stream_agent, emit=queue.put_nowait)
+        finally:
+            queue.put_nowait(None)
+    
+    task = asyncio.create_task(run())
+    try:
+        while (event := await queue.get()) is not None:
+            yield ndjson(event)
+        result = orchestration_response(await task)
+    finally:
+        task.cancel()
+    
+    for action in result["actions"]:
+        yield ndjson({"event": "action", "action": action})
+    yield ndjson({"event": "done", **result})
+
+
+@app.post("/orchestrate")
+async def orchestrate(request: OrchestrationRequest):
+    logger.info(f"Starting orchestration (stream: {request.stream})")
+    
+    if request.stream:
+        return StreamingResponse(stream_orchestration(request.context), media_type="application/x-ndjson")
+    
+    # Independent agents run concurrently, dependents as soon as their inputs are ready
+    result = await executor.run(request.context, run_agent)
+    return orchestration_response(result)
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -0,0 +1,324 @@
+"""Open-loop load generator for the copilot and multiagent endpoints.
+
+Requests start on a precomputed arrival schedule (constant-rate or Poisson)
+whether or not earlier ones have finished, so an overloaded service builds a
+backlog instead of quietly slowing the generator down. Latency is measured
+from the scheduled arrival, which includes any wait for a free ``concurrency``
+slot. Run one stage per rate to find where throughput stops tracking the
+offered rate::
+
+    python -m src.evaluation.load_generator --target copilot --rates 0.5,1,2,4 --duration 60
+
+Each run is saved as JSON under ``results/load_tests``; ``--baseline`` compares
+it with an earlier run and exits non-zero on a regression.
+"""
+import asyncio
+import json
+import math
+import os
+import random
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import httpx
+
+from src.evaluation.scenarios import load_registry
+
+TARGETS = {
+    "copilot": (os.getenv("COPILOT_URL", "http://localhost:8001"), "/analyze"),
+    "multiagent": (os.getenv("MULTIAGENT_URL", "http://localhost:8002"), "/orchestrate")
+}
+ARRIVALS = ("constant", "poisson")
+QUANTILES = {"p50": 0.5, "p95": 0.95, "p99": 0.99, "p999": 0.999}
+
+# Metrics compared against a baseline run; higher is worse for all of them
+REGRESSION_METRICS = ("p50", "p95", "p99", "error_rate", "fallback_rate")
+
+
+def arrival_times(rate: float, duration: float, arrivals: str = "constant", seed: int = 42) -> List[float]:
+    """Request start offsets in seconds over ``duration`` at ``rate`` per second."""
+    if rate <= 0 or duration <= 0:
+        return []
+    if arrivals not in ARRIVALS:
+        raise ValueError(f"Unknown arrival process '{arrivals}' (expected one of {ARRIVALS})")
+    if arrivals == "constant":
+        return [i / rate for i in range(int(math.ceil(duration * rate - 1e-9)))]
+    rng = random.Random(seed)
+    times = []
+    t = rng.expovariate(rate)
+    while t < duration:
+        times.append(t)
+        t += rng.expovariate(rate)
+    return times
+
+
+def percentile(values: Sequence[float], q: float) -> Optional[float]:
+    """Linearly interpolated quantile ``q`` (0-1); None for no values."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q
+    lower = int(math.floor(position))
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+@dataclass
+class RequestResult:
+    scheduled: float
+    started: float
+    latency: float
+    status: Optional[int] = None
+    error: Optional[str] = None
+    fallback: bool = False
+    first_byte: Optional[float] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.status == 200
+
+
+async def send_request(
+    client: httpx.AsyncClient,
+    path: str,
+    payload: Dict,
+    slots: asyncio.Semaphore,
+    t0: float,
+    scheduled: float
+) -> RequestResult:
+    """Wait for a slot, send one request and time it from its scheduled arrival."""
+    async with slots:
+        started = time.monotonic() - t0
+        result = RequestResult(scheduled=scheduled, started=started, latency=0.0)
+        try:
+            if payload.get("stream"):
+                final = None
+                async with client.stream("POST", path, json=payload) as response:
+                    result.status = response.status_code
+                    async for line in response.aiter_lines():
+                        if result.first_byte is None:
+                            result.first_byte = time.monotonic() - t0 - scheduled
+                        if line.strip():
+                            final = line
+                body = json.loads(final) if final and result.status == 200 else {}
+            else:
+                response = await client.post(path, json=payload)
+                result.status = response.status_code
+                body = response.json() if response.status_code == 200 else {}
+            if result.status != 200:
+                result.error = f"HTTP {result.status}"
+            result.fallback = bool(body.get("fallbacks"))
+        except Exception as e:
+            result.error = type(e).__name__
+        result.latency = time.monotonic() - t0 - scheduled
+        return result
+
+
+async def run_stage(
+    base_url: str,
+    path: str,
+    payload: Dict,
+    rate: float,
+    duration: float,
+    arrivals: str = "constant",
+    concurrency: int = 64,
+    timeout: float = 300.0,
+    seed: int = 42,
+    transport: Optional[httpx.AsyncBaseTransport] = None
+) -> List[RequestResult]:
+    """Fire requests at ``rate`` for ``duration`` seconds and wait for all of them."""
+    schedule = arrival_times(rate, duration, arrivals, seed)
+    slots = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(
+        base_url=base_url, timeout=timeout, limits=limits, transport=transport
+    ) as client:
+        t0 = time.monotonic()
+        tasks = []
+        for scheduled in schedule:
+            delay = scheduled - (time.monotonic() - t0)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(send_request(client, path, payload, slots, t0, scheduled)))
+        return list(await asyncio.gather(*tasks))
+
+
+def summarize(results: List[RequestResult], rate: float, duration: float) -> Dict:
+    """Throughput, latency quantiles and error/fallback rates for one stage."""
+    ok = [r for r in results if r.ok]
+    latencies = [r.latency for r in ok]
+    first_bytes = [r.first_byte for r in ok if r.first_byte is not None]
+    # Completed over the span from the first arrival to the last completion
+    elapsed = max((r.scheduled + r.latency for r in results), default=0.0)
+    errors: Dict[str, int] = {}
+    for r in results:
+        if r.error:
+            errors[r.error] = errors.get(r.error, 0) + 1
+
+    def rounded(value: Optional[float]) -> Optional[float]:
+        return round(value, 4) if value is not None else None
+
+    summary = {
+        "offered_rate": rate,
+        "duration": duration,
+        "requests": len(results),
+        "completed": len(ok),
+        "throughput": round(len(ok) / max(elapsed, duration), 4) if results else 0.0,
+        "error_rate": round(1 - len(ok) / len(results), 4) if results else 0.0,
+        "fallback_rate": round(sum(r.fallback for r in ok) / len(ok), 4) if ok else None,
+        "errors": errors,
+        "mean": rounded(sum(latencies) / len(latencies)) if latencies else None,
+        "max": rounded(max(latencies, default=None))
+    }
+    summary.update({name: rounded(percentile(latencies, q)) for name, q in QUANTILES.items()})
+    summary["ttfb_p50"] = rounded(percentile(first_bytes, 0.5))
+    summary["ttfb_p95"] = rounded(percentile(first_bytes, 0.95))
+    # Time requests spent waiting for a concurrency slot; growth means the cap, not the service, limits
+    summary["queue_p95"] = rounded(percentile([r.started - r.scheduled for r in results], 0.95))
+    return summary
+
+
+def saturation_rate(stages: List[Dict], tolerance: float = 0.9) -> Optional[float]:
+    """Highest offered rate the service kept up with (throughput within ``tolerance``, no errors)."""
+    sustained = [
+        s["offered_rate"] for s in stages
+        if s["throughput"] >= tolerance * s["offered_rate"] and s["error_rate"] == 0
+    ]
+    return max(sustained) if sustained else None
+
+
+def compare(run: Dict, baseline: Dict, max_regression: float = 0.2) -> List[str]:
+    """Regressions of ``run`` against ``baseline`` for stages at the same offered rate.
+
+    Latencies regress when they grow by more than ``max_regression`` (relative);
+    error and fallback rates when they grow by more than ``max_regression`` absolute.
+    """
+    base_stages = {s["offered_rate"]: s for s in baseline.get("stages", [])}
+    regressions = []
+    for stage in run["stages"]:
+        base = base_stages.get(stage["offered_rate"])
+        if base is None:
+            continue
+        for metric in REGRESSION_METRICS:
+            new, old = stage.get(metric), base.get(metric)
+            if new is None or old is None:
+                continue
+            limit = old + max_regression if metric.endswith("_rate") else old * (1 + max_regression)
+            if new > limit:
+                regressions.append(f"{stage['offered_rate']}/s {metric}: {old} -> {new}")
+    return regressions
+
+
+def format_stage(stage: Dict) -> str:
+    def ms(value: Optional[float]) -> str:
+        return f"{value * 1000:.0f}ms" if value is not None else "-"
+
+    fallback = f"{stage['fallback_rate']:.1%}" if stage["fallback_rate"] is not None else "-"
+    return (
+        f"{stage['offered_rate']:>7.2f}/s  {stage['throughput']:>7.2f}/s  "
+        f"{ms(stage['p50']):>8} {ms(stage['p95']):>8} {ms(stage['p99']):>8} {ms(stage['p999']):>8}  "
+        f"err {stage['error_rate']:.1%}  fallback {fallback}"
+    )
+
+
+async def run_load_test(
+    target: str,
+    rates: Sequence[float],
+    duration: float,
+    arrivals: str = "constant",
+    concurrency: int = 64,
+    timeout: float = 300.0,
+    stream: bool = False,
+    scenario: Optional[str] = None,
+    seed: int = 42,
+    base_url: Optional[str] = None,
+    transport: Optional[httpx.AsyncBaseTransport] = None
+) -> Dict:
+    """Run one stage per rate against ``target`` and return the full report."""
+    default_url, path = TARGETS[target]
+    base_url = base_url or default_url
+    registry = load_registry()
+    incident = registry.get(scenario) if scenario else registry.default
+    payload = {"context": incident.context, "stream": stream}
+
+    print(f"{target} {base_url}{path}: {arrivals} arrivals, {duration:g}s per stage, concurrency {concurrency}")
+    print(f"{'offered':>9}  {'through':>9}  {'p50':>8} {'p95':>8} {'p99':>8} {'p999':>8}")
+    stages = []
+    for i, rate in enumerate(rates):
+        results = await run_stage(
+            base_url, path, payload, rate, duration, arrivals, concurrency, timeout, seed + i, transport
+        )
+        stage = summarize(results, rate, duration)
+        stages.append(stage)
+        print(format_stage(stage))
+
+    return {
+        "target": target,
+        "url": f"{base_url}{path}",
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "config": {
+            "arrivals": arrivals,
+            "duration": duration,
+            "concurrency": concurrency,
+            "timeout": timeout,
+            "stream": stream,
+            "scenario": incident.scenario_id,
+            "seed": seed
+        },
+        "stages": stages,
+        "saturation_rate": saturation_rate(stages)
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Open-loop load test of /analyze or /orchestrate")
+    parser.add_argument("--target", choices=sorted(TARGETS), default="copilot")
+    parser.add_argument("--url", help="service base URL (default: COPILOT_URL / MULTIAGENT_URL or localhost)")
+    parser.add_argument("--rates", default="0.5,1,2", help="comma-separated requests/second, one stage each")
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds of arrivals per stage")
+    parser.add_argument("--arrivals", choices=ARRIVALS, default="poisson")
+    parser.add_argument("--concurrency", type=int, default=64, help="max requests in flight")
+    parser.add_argument("--timeout", type=float, default=300.0)
+    parser.add_argument("--stream", action="store_true", help="request NDJSON streams (adds time to first byte)")
+    parser.add_argument("--scenario", help="scenario id for the request context (default: DEFAULT_SCENARIO)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output-dir", default="results/load_tests")
+    parser.add_argument("--baseline", help="earlier run to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    args = parser.parse_args()
+
+    report = asyncio.run(run_load_test(
+        args.target,
+        [float(rate) for rate in args.rates.split(",") if rate.strip()],
+        args.duration,
+        args.arrivals,
+        args.concurrency,
+        args.timeout,
+        args.stream,
+        args.scenario,
+        args.seed,
+        args.url
+    ))
+    print(f"Saturation: {report['saturation_rate'] or 'below the lowest rate'} req/s")
+
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    output = output_dir / f"{args.target}_{datetime.now():%Y%m%d_%H%M%S}.json"
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Saved {output}")
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            regressions = compare(report, json.load(f), args.max_regression)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions against {args.baseline}")
@@ -3,81 +3,73 @@ Re-score all existing trial results with corrected DQ formula.
 This script reads original trial outputs and applies DQScorer v2.0.
 """
 
-import json
 import pandas as pd
 from pathlib import Path
 import sys
-from typing import Dict, List
+from typing import Dict, Iterable, Iterator, Optional
 
-# Add parent directory to path
-sys.path.append(str(Path(__file__).parent.parent))
+# Add repository root to path (not needed once the package is installed)
+sys.path.append(str(Path(__file__).parent.parent.parent))
 
-from scoring.dq_scorer_v2 import DQScorer
-from analysis.statistical_tests import StatisticalAnalyzer
+from src.scoring.dq_scorer_v2 import DQScorer
+from src.analysis.statistical_tests import StatisticalAnalyzer
+from src.evaluation.scenarios import load_registry
+from src.utils.trial_log import collect_columns, iter_results
 
 
-def load_trial_results(results_dir: Path) -> List[Dict]:
-    """Load all trial JSON files from results directory."""
-    trials = []
+def load_trial_results(results_dir: Path) -> Iterator[Dict]:
+    """Stream trials from the results directory's JSONL trial log.
     
-    for trial_file in results_dir.glob("trial_*.json"):
-        with open(trial_file, 'r') as f:
-            trial_data = json.load(f)
-            trials.append(trial_data)
-    
-    return trials
+    Falls back to all_trials.json or per-trial JSON files for older runs.
+    """
+    return iter_results(results_dir)
 
 
-def rescore_trials(trials: List[Dict], 
-                   ground_truth: str) -> pd.DataFrame:
+def rescore_trials(trials: Iterable[Dict], 
+                   ground_truth: Optional[str] = None) -> pd.DataFrame:
     """
     Re-score all trials with corrected DQ formula.
     
     Args:
-        trials: List of trial result dictionaries
-        ground_truth: Known correct resolution for the incident
+        trials: Trial result dictionaries; a generator is read in one pass
+        ground_truth: Known correct resolution for the incident. If omitted,
+            each trial is scored against its own scenario's ground truth
+            (trials without a scenario use the default scenario).
     
     Returns:
         DataFrame with original and re-scored metrics
     """
-    scorer = DQScorer(ground_truth)
-    
-    rescored_data = []
-    
-    for trial in trials:
-        trial_id = trial['trial_id']
-        condition = trial['condition']
-        
-        # Original metrics
-        original_t2u = trial.get('t2u', 0)
-        original_dq = trial.get('dq', 0)
-        
-        # Extract actions from trial output
-        actions = trial.get('actions', [])
+    registry = load_registry()
+    default = registry.default.name
+    
+    # Keep only the fields scoring needs, so the full records are never held at once
+    df = pd.DataFrame(collect_columns(trials, {
+        'trial_id': lambda trial: trial['trial_id'],
+        'condition': lambda trial: trial['condition'],
+        'scenario': lambda trial: trial.get('scenario', default),
         
-        # Re-score with corrected formula
-        scores = scorer.score_trial(actions)
+        # Original metrics (for comparison)
+        'original_dq': lambda trial: trial.get('dq', 0),
         
-        rescored_data.append({
-            'trial_id': trial_id,
-            'condition': condition,
-            
-            # Original metrics (for comparison)
-            'original_dq': original_dq,
-            
-            # Re-scored metrics
-            't2u': original_t2u,  # T2U measurement unchanged
-            'dq': scores['dq'],
-            'validity': scores['validity'],
-            'specificity': scores['specificity'],
-            'correctness': scores['correctness'],
-            'action_count': scores['action_count'],
-            
-            # Change delta
-            'dq_change': scores['dq'] - original_dq
-        })
-    
-    return pd.DataFrame(rescored_data)
+        # Re-scored metrics
+        't2u': lambda trial: trial.get('t2u', 0),  # T2U measurement unchanged
+        'actions': lambda trial: trial.get('actions', []),
+    }))
+    
+    # Re-score with corrected formula in one vectorized pass per scenario
+    if ground_truth is not None:
+        scores = DQScorer(ground_truth).score_batch(df)
+    else:
+        scores = registry.score_batch(df)
+    
+    df = df.drop(columns='actions')
+    for column in ['dq', 'validity', 'specificity', 'correctness', 'action_count']:
+        df[column] = scores[column].to_numpy()
+    
+    # Change delta
+    df['dq_change'] = df['dq'] - df['original_dq']
+    
+    return df
 
 
 def generate_comparison_report(df: pd.DataFrame, output_path: Path):
@@ -130,19 +122,12 @@ def main():
     """Main re-scoring pipeline."""
     
     # Configuration
-    results_dir = Path("results/trials")
+    results_dir = Path("results")
     output_dir = Path("results/rescored")
     output_dir.mkdir(parents=True, exist_ok=True)
     
-    # Ground truth for auth service incident
-    ground_truth = "rollback auth-service deployment to v2.3.0 verify database connection pool"
-    
-    print("Loading trial results...")
-    trials = load_trial_results(results_dir)
-    print(f"✓ Loaded {len(trials)} trials")
-    
-    print("\nRe-scoring with corrected DQ formula...")
-    rescored_df = rescore_trials(trials, ground_truth)
+    print("Loading and re-scoring trial results with corrected DQ formula...")
+    rescored_df = rescore_trials(load_trial_results(results_dir))
     print(f"✓ Re-scored {len(rescored_df)} trials")
     
     # Save re-scored data
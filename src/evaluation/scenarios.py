@@ -0,0 +1,173 @@
+"""Incident scenario registry backed by the JSON files in data/scenarios."""
+import json
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+
+import pandas as pd
+
+from src.scoring.dq_scorer_v2 import DQScorer
+from src.utils.config import Config
+from src.utils.trial_log import collect_columns
+
+DEFAULT_QUESTION = "What is the root cause and what actions should be taken?"
+
+
+@dataclass
+class Scenario:
+    """One incident scenario with its prompt context rendered once at load time."""
+    scenario_id: str
+    name: str
+    description: str
+    telemetry: Dict[str, Union[str, List[str]]]
+    ground_truth: Dict
+    title: str = ""
+    question: str = DEFAULT_QUESTION
+    fallback_actions: Dict[str, List[str]] = field(default_factory=dict)
+    source: Optional[Path] = None
+
+    context: str = field(init=False, repr=False)
+    ground_truth_resolution: str = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.context = self.render_context()
+        self.ground_truth_resolution = (
+            self.ground_truth.get("resolution")
+            or " ".join(self.ground_truth.get("actions", []))
+        )
+        self._scorer: Optional[DQScorer] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict, source: Optional[Path] = None) -> "Scenario":
+        missing = [key for key in ("scenario_id", "description", "telemetry", "ground_truth") if key not in data]
+        if missing:
+            raise ValueError(f"Scenario {source or data.get('scenario_id')} is missing: {', '.join(missing)}")
+        return cls(
+            scenario_id=data["scenario_id"],
+            name=data.get("name", data["scenario_id"]),
+            description=data["description"],
+            telemetry=data["telemetry"],
+            ground_truth=data["ground_truth"],
+            title=data.get("title", ""),
+            question=data.get("question", DEFAULT_QUESTION),
+            fallback_actions=data.get("fallback_actions", {}),
+            source=source
+        )
+
+    def render_context(self) -> str:
+        lines = [f"Incident: {self.description}", "", "Telemetry:"]
+        for label, value in self.telemetry.items():
+            if isinstance(value, list):
+                value = ", ".join(str(v) for v in value)
+            lines.append(f"- {label}: {value}")
+        lines += ["", self.question]
+        return "\n".join(lines)
+
+    def to_context(self) -> str:
+        return self.context
+
+    @property
+    def scorer(self) -> DQScorer:
+        """DQScorer for this scenario, built on first use.
+
+        The scorer holds the tokenized ground truth, so it is tokenized once
+        per scenario rather than once per scoring call.
+        """
+        if self._scorer is None:
+            self._scorer = DQScorer(self.ground_truth_resolution)
+        return self._scorer
+
+
+class ScenarioRegistry:
+    """Index of scenarios by ``scenario_id`` and ``name``.
+
+    Use ``load_registry()`` to get the process-wide instance so each
+    scenario file is parsed and rendered only once.
+    """
+
+    def __init__(self, scenarios: Iterable[Scenario]):
+        self._scenarios: List[Scenario] = []
+        self._index: Dict[str, Scenario] = {}
+        for scenario in scenarios:
+            for key in {scenario.scenario_id, scenario.name}:
+                if key in self._index:
+                    raise ValueError(f"Duplicate scenario key '{key}' in {scenario.source}")
+                self._index[key] = scenario
+            self._scenarios.append(scenario)
+
+    @classmethod
+    def from_dir(cls, scenario_dir: Path) -> "ScenarioRegistry":
+        scenarios = []
+        for path in sorted(Path(scenario_dir).glob("*.json")):
+            with open(path, "r", encoding="utf-8") as f:
+                scenarios.append(Scenario.from_dict(json.load(f), source=path))
+        return cls(scenarios)
+
+    def get(self, key: str) -> Scenario:
+        try:
+            return self._index[key]
+        except KeyError:
+            available = ", ".join(s.name for s in self._scenarios) or "none"
+            raise KeyError(f"Unknown scenario '{key}' (available: {available})") from None
+
+    def select(self, spec: str) -> List[Scenario]:
+        """Resolve a comma-separated list of ids/names, or ``all``."""
+        if spec.strip().lower() == "all":
+            return list(self._scenarios)
+        return [self.get(key.strip()) for key in spec.split(",") if key.strip()]
+
+    @property
+    def default(self) -> Scenario:
+        return self.get(Config.DEFAULT_SCENARIO)
+
+    def score_batch(self, trials: Union[pd.DataFrame, Iterable[Dict]]) -> pd.DataFrame:
+        """Score trials against their own scenario's ground truth.
+
+        Accepts a DataFrame with an 'actions' column (and optionally a
+        'scenario' column), or an iterable of trial dicts. Trials are grouped
+        by scenario (default scenario when absent) and each group goes through
+        that scenario's cached scorer in one vectorized pass. Rows come back
+        in input order.
+        """
+        default = self.default.name
+        if isinstance(trials, pd.DataFrame):
+            actions = trials["actions"].reset_index(drop=True)
+            if "scenario" in trials:
+                names = trials["scenario"].reset_index(drop=True)
+            else:
+                names = pd.Series(default, index=actions.index, dtype=object)
+        else:
+            columns = collect_columns(trials, {
+                "actions": lambda trial: trial.get("actions", []),
+                "scenario": lambda trial: trial.get("scenario", default),
+            })
+            actions = pd.Series(columns["actions"], dtype=object)
+            names = pd.Series(columns["scenario"], dtype=object)
+
+        if actions.empty:
+            return self.default.scorer.score_batch([])
+
+        frames = [
+            self.get(name).scorer.score_batch(pd.DataFrame({"actions": actions[rows]}))
+            for name, rows in names.groupby(names).groups.items()
+        ]
+        return pd.concat(frames).sort_index()
+
+    def __getitem__(self, key: str) -> Scenario:
+        return self.get(key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._index
+
+    def __iter__(self) -> Iterator[Scenario]:
+        return iter(self._scenarios)
+
+    def __len__(self) -> int:
+        return len(self._scenarios)
+
+
+@lru_cache(maxsize=None)
+def load_registry(scenario_dir: Optional[str] = None) -> ScenarioRegistry:
+    """Load (once per process) every scenario in ``scenario_dir``."""
+    return ScenarioRegistry.from_dir(Path(scenario_dir or Config.SCENARIO_DIR))
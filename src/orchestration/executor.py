@@ -0,0 +1,237 @@
+"""Concurrent executor for agent graphs."""
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+
+from src.orchestration.graph import AgentGraph, AgentNode
+
+logger = logging.getLogger(__name__)
+
+Emit = Callable[[Dict], None]
+AgentRunner = Callable[[AgentNode, str, Emit], Awaitable[Optional[str]]]
+
+
+@dataclass
+class NodeResult:
+    """Outcome of one agent. Times are seconds since the run started.
+
+    ``status`` is ``ok`` for a finished agent; ``partial`` when it was cut
+    off (timeout, deadline or early return) after streaming some text, which
+    is kept as its output; otherwise ``timeout``, ``cancelled``, ``failed``
+    or ``skipped`` (never started). ``usage`` holds the Ollama timings the
+    runner reported with a ``usage`` event, if any.
+    """
+    name: str
+    status: str
+    output: Optional[str] = None
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    critical_path: List[str] = field(default_factory=list)
+    usage: Optional[Dict] = None
+
+    @property
+    def partial(self) -> bool:
+        return self.status != "ok"
+
+    @property
+    def duration(self) -> Optional[float]:
+        if self.started is None or self.finished is None:
+            return None
+        return self.finished - self.started
+
+    def timing(self) -> Dict:
+        def rounded(value):
+            return round(value, 3) if value is not None else None
+        return {
+            "status": self.status,
+            "partial": self.partial,
+            "start": rounded(self.started),
+            "end": rounded(self.finished),
+            "duration": rounded(self.duration),
+            "critical_path": self.critical_path,
+            "ollama": self.usage
+        }
+
+
+@dataclass
+class GraphResult:
+    nodes: Dict[str, NodeResult]
+    elapsed: float
+    early_return: bool = False
+
+    @property
+    def outputs(self) -> Dict[str, Optional[str]]:
+        return {name: node.output for name, node in self.nodes.items()}
+
+    @property
+    def partial_agents(self) -> List[str]:
+        return [name for name, node in self.nodes.items() if node.partial]
+
+    @property
+    def critical_path(self) -> List[str]:
+        """Dependency chain that ended last, i.e. the one that set the latency."""
+        finished = [node for node in self.nodes.values() if node.finished is not None and node.critical_path]
+        if not finished:
+            return []
+        return max(finished, key=lambda node: node.finished).critical_path
+
+    def timings(self) -> Dict[str, Dict]:
+        return {name: node.timing() for name, node in self.nodes.items()}
+
+
+class DAGExecutor:
+    """Run an AgentGraph with as much concurrency as its dependencies allow.
+
+    Every agent gets a task up front; each task waits only for its own
+    dependencies, so independent agents overlap and a dependent agent starts
+    the moment its inputs are ready, with their outputs rendered into its
+    prompt. Agents are bounded by their own ``timeout``/``deadline`` and the
+    whole run by ``deadline``; an agent that fails or times out passes on
+    whatever text it streamed (or ``None``) and its dependents still run.
+
+    Early return: when ``required`` agents (default: nodes marked
+    ``required``) are finished and at least ``quorum`` agents succeeded, the
+    remaining agents are cancelled and the run returns. With neither set,
+    the run waits for every agent. Results record start/end offsets, the
+    dependency chain that gated each agent and which agents were partial.
+    """
+
+    def __init__(
+        self,
+        graph: AgentGraph,
+        deadline: Optional[float] = None,
+        quorum: Optional[int] = None,
+        required: Optional[Iterable[str]] = None
+    ):
+        self.graph = graph
+        self.deadline = deadline
+        self.quorum = quorum
+        self.required = set(required) if required is not None else {
+            node.name for node in graph if node.required
+        }
+        unknown = self.required - set(graph.nodes)
+        if unknown:
+            raise ValueError(f"Required agent(s) not in graph: {', '.join(sorted(unknown))}")
+
+    @property
+    def early_return(self) -> bool:
+        return bool(self.required) or self.quorum is not None
+
+    async def run(self, context: str, run_agent: AgentRunner, emit: Optional[Emit] = None) -> GraphResult:
+        loop = asyncio.get_running_loop()
+        t0 = loop.time()
+        started: Dict[str, float] = {}
+        streamed: Dict[str, List[str]] = {}
+        usage: Dict[str, Dict] = {}
+        tasks: Dict[str, asyncio.Task] = {}
+
+        def forward(event: Dict):
+            # Keep streamed text so an agent cut off mid-generation is partial, not empty
+            if event.get("event") == "token":
+                streamed.setdefault(event["agent"], []).append(event["text"])
+            elif event.get("event") == "usage":
+                usage[event["agent"]] = event["ollama"]
+            if emit is not None:
+                emit(event)
+
+        def finish(node: AgentNode, status: str, output: Optional[str], critical_path: List[str]) -> NodeResult:
+            if not output and status != "ok":
+                output = "".join(streamed.get(node.name, [])) or None
+                if output and status in ("timeout", "cancelled"):
+                    status = "partial"
+            result = NodeResult(
+                name=node.name,
+                status=status,
+                output=output[:node.max_chars] if output else None,
+                started=started.get(node.name),
+                finished=loop.time() - t0 if node.name in started else None,
+                critical_path=critical_path,
+                usage=usage.get(node.name)
+            )
+            forward({
+                "event": "agent_done",
+                "agent": node.name,
+                "output": result.output or "",
+                "status": result.status,
+                "partial": result.partial,
+                "duration": round(result.duration, 3) if result.duration is not None else None
+            })
+            return result
+
+        def time_left(node: AgentNode) -> Optional[float]:
+            if node.deadline is None:
+                return node.timeout
+            left = max(0.0, node.deadline - (loop.time() - t0))
+            return left if node.timeout is None else min(left, node.timeout)
+
+        async def run_node(node: AgentNode) -> NodeResult:
+            dep_tasks = [tasks[dep] for dep in node.depends_on]
+            if dep_tasks:
+                wait = None if node.deadline is None else max(0.0, node.deadline - (loop.time() - t0))
+                _, waiting = await asyncio.wait(dep_tasks, timeout=wait)
+                if waiting:
+                    logger.warning(f"Agent {node.name} missed its {node.deadline}s deadline waiting on dependencies")
+                    return finish(node, "skipped", None, [])
+            deps = [task.result() for task in dep_tasks]
+
+            started[node.name] = loop.time() - t0
+            forward({"event": "agent_start", "agent": node.name})
+
+            prompt = node.render(context, {dep.name: dep.output for dep in deps})
+            try:
+                output = await asyncio.wait_for(run_agent(node, prompt, forward), timeout=time_left(node))
+                status = "ok" if output else "failed"
+            except asyncio.TimeoutError:
+                logger.warning(f"Agent {node.name} timed out")
+                output, status = None, "timeout"
+            except Exception as e:
+                logger.error(f"Agent {node.name} failed: {e}")
+                output, status = None, "failed"
+
+            gate = max(deps, key=lambda dep: dep.finished or 0.0, default=None)
+            return finish(node, status, output, (gate.critical_path if gate else []) + [node.name])
+
+        for node in self.graph:
+            tasks[node.name] = asyncio.create_task(run_node(node))
+
+        deadline_at = t0 + self.deadline if self.deadline is not None else None
+        pending = set(tasks.values())
+        early = False
+        try:
+            while pending:
+                timeout = None if deadline_at is None else max(0.0, deadline_at - loop.time())
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    logger.warning(f"Orchestration deadline ({self.deadline}s) hit, cancelling {len(pending)} agent(s)")
+                    break
+                if pending and self._satisfied(tasks):
+                    early = True
+                    logger.info(f"Early return, cancelling {len(pending)} straggler(s)")
+                    break
+        finally:
+            # Also runs when run() itself is cancelled (client gone, outer timeout),
+            # so no agent keeps generating against Ollama after the caller left
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+        nodes = {}
+        for name, task in tasks.items():
+            if task.cancelled():
+                status = ("cancelled" if early else "timeout") if name in started else "skipped"
+                nodes[name] = finish(self.graph.nodes[name], status, None, [])
+            else:
+                nodes[name] = task.result()
+        return GraphResult(nodes=nodes, elapsed=loop.time() - t0, early_return=early)
+
+    def _satisfied(self, tasks: Dict[str, asyncio.Task]) -> bool:
+        if not self.early_return:
+            return False
+        if not all(tasks[name].done() for name in self.required):
+            return False
+        succeeded = sum(
+            1 for task in tasks.values()
+            if task.done() and not task.cancelled() and task.result().status == "ok"
+        )
+        return succeeded >= (self.quorum or 0)
@@ -0,0 +1,80 @@
+"""Declarative agent graphs for multi-agent orchestration."""
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+UNAVAILABLE = "unavailable"
+
+
+@dataclass(frozen=True)
+class AgentNode:
+    """One agent: a prompt template plus the agents whose output it needs.
+
+    ``prompt`` is a ``str.format`` template; ``{context}`` is the incident
+    context (cut to ``context_chars``) and ``{<dependency>}`` is that
+    dependency's output. ``timeout`` bounds this agent's own generation and
+    ``deadline`` (seconds from the start of the run) bounds when it must be
+    finished, including time spent waiting on dependencies. ``max_tokens``
+    is its Ollama ``num_predict`` budget and ``max_chars`` truncates what it
+    passes on. ``required`` agents must finish before an early return.
+    """
+    name: str
+    prompt: str
+    depends_on: Tuple[str, ...] = ()
+    timeout: Optional[float] = None
+    deadline: Optional[float] = None
+    required: bool = False
+    max_tokens: Optional[int] = None
+    max_chars: int = 500
+    context_chars: int = 200
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "AgentNode":
+        return cls(**{**data, "depends_on": tuple(data.get("depends_on", ()))})
+
+    def render(self, context: str, outputs: Dict[str, Optional[str]]) -> str:
+        return self.prompt.format(
+            context=context[:self.context_chars],
+            **{dep: outputs.get(dep) or UNAVAILABLE for dep in self.depends_on}
+        )
+
+
+class AgentGraph:
+    """Validated DAG of agents, kept in a dependency-respecting order."""
+
+    def __init__(self, nodes: Iterable[AgentNode]):
+        self.nodes: Dict[str, AgentNode] = {}
+        for node in nodes:
+            if node.name in self.nodes:
+                raise ValueError(f"Duplicate agent '{node.name}'")
+            self.nodes[node.name] = node
+
+        for node in self.nodes.values():
+            unknown = [dep for dep in node.depends_on if dep not in self.nodes]
+            if unknown:
+                raise ValueError(f"Agent '{node.name}' depends on unknown agent(s): {', '.join(unknown)}")
+
+        self.order: List[AgentNode] = self._topological_order()
+
+    @classmethod
+    def from_dicts(cls, nodes: Iterable[Dict]) -> "AgentGraph":
+        return cls(AgentNode.from_dict(node) for node in nodes)
+
+    def _topological_order(self) -> List[AgentNode]:
+        remaining = {name: set(node.depends_on) for name, node in self.nodes.items()}
+        order = []
+        while remaining:
+            ready = [name for name, deps in remaining.items() if not deps]
+            if not ready:
+                raise ValueError(f"Agent graph has a cycle among: {', '.join(sorted(remaining))}")
+            for name in ready:
+                order.append(self.nodes[name])
+                del remaining[name]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+        return order
+
+    def __iter__(self):
+        return iter(self.order)
+
+    def __len__(self) -> int:
+        return len(self.nodes)
@@ -1,10 +1,23 @@
 ﻿import re
-from typing import List, Dict
+from typing import Dict, Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from .specificity import SpecificityMatcher, SpecificityTier
+
+
+SCORE_COLUMNS = ['validity', 'specificity', 'correctness', 'dq', 'action_count']
+
+# Correctness steps: (minimum overlap ratio, score)
+CORRECTNESS_STEPS = [(0.7, 1.0), (0.5, 0.75), (0.3, 0.50), (0.1, 0.25)]
 
 
 class DQScorer:
-    def __init__(self, ground_truth: str):
+    def __init__(self, ground_truth: str, specificity_tiers: Optional[List[SpecificityTier]] = None):
         self.ground_truth = ground_truth.lower()
+        self.gt_tokens = set(self.ground_truth.split())
+        self.specificity = SpecificityMatcher(specificity_tiers)
         self.alpha = 0.40
         self.beta = 0.30
         self.gamma = 0.30
@@ -21,22 +34,12 @@ class DQScorer:
         
         validity = 1.0
         
-        specificities = []
-        for action in actions:
-            action_lower = action.lower()
-            score = 0.0
-            if 'v2.' in action_lower or 'version' in action_lower:
-                score = 1.0
-            elif 'rollback' in action_lower or 'auth' in action_lower or 'database' in action_lower:
-                score = 0.67
-            elif 'deployment' in action_lower or 'service' in action_lower:
-                score = 0.33
-            specificities.append(score)
+        specificities = [self.specificity.score(action) for action in actions]
         
         specificity = sum(specificities) / len(specificities) if specificities else 0.0
         
         correctness_scores = []
-        gt_tokens = set(self.ground_truth.split())
+        gt_tokens = self.gt_tokens
         for action in actions:
             action_tokens = set(action.lower().split())
             overlap = len(gt_tokens & action_tokens)
@@ -63,4 +66,64 @@ class DQScorer:
             'correctness': round(correctness, 4),
             'dq': round(dq, 4),
             'action_count': len(actions)
-        }
\ No newline at end of file
+        }
+    
+    def score_batch(self, trials: Union[pd.DataFrame, Iterable]) -> pd.DataFrame:
+        """Score many trials at once and return one row per trial.
+        
+        Accepts a DataFrame with an 'actions' column, or an iterable of trial
+        dicts or plain action lists. Values match score_trial exactly. Each
+        distinct action string is scored once and the per-action scores are
+        folded back into trial means with NumPy, so large historical sets
+        (where the same actions recur across thousands of trials) are cheap.
+        """
+        if isinstance(trials, pd.DataFrame):
+            action_lists = trials['actions']
+        else:
+            action_lists = pd.Series([
+                t.get('actions', []) if isinstance(t, dict) else t
+                for t in trials
+            ], dtype=object)
+        action_lists = action_lists.map(lambda a: a if isinstance(a, list) else [])
+        
+        action_count = action_lists.map(len).to_numpy(dtype=np.int64)
+        result = pd.DataFrame(0.0, index=action_lists.index, columns=SCORE_COLUMNS)
+        result['action_count'] = action_count
+        if not action_count.any():
+            return result
+        
+        flat = np.array([a for actions in action_lists for a in actions], dtype=object)
+        codes, uniques = pd.factorize(flat)
+        lowered = pd.Series(uniques, dtype=object).astype(str).str.lower()
+        
+        unique_specificity = np.array([self.specificity.score(a) for a in lowered], dtype=float)
+        
+        gt_tokens = self.gt_tokens
+        overlap = np.array([len(gt_tokens & set(a.split())) for a in lowered], dtype=float)
+        ratio = overlap / len(gt_tokens) if gt_tokens else np.zeros(len(uniques))
+        unique_correctness = np.select(
+            [ratio >= threshold for threshold, _ in CORRECTNESS_STEPS],
+            [score for _, score in CORRECTNESS_STEPS],
+            0.0
+        )
+        
+        # Fold action scores back into per-trial means
+        trial_pos = np.repeat(np.arange(len(action_lists)), action_count)
+        has_actions = action_count > 0
+        counts = action_count[has_actions]
+        specificity = np.bincount(trial_pos, weights=unique_specificity[codes], minlength=len(action_lists))[has_actions] / counts
+        correctness = np.bincount(trial_pos, weights=unique_correctness[codes], minlength=len(action_lists))[has_actions] / counts
+        dq = self.alpha * 1.0 + self.beta * specificity + self.gamma * correctness
+        
+        result.loc[has_actions, 'validity'] = 1.0
+        result.loc[has_actions, 'specificity'] = _round4(specificity)
+        result.loc[has_actions, 'correctness'] = _round4(correctness)
+        result.loc[has_actions, 'dq'] = _round4(dq)
+        return result
+
+
+def _round4(values: np.ndarray) -> np.ndarray:
+    # np.round is not correctly rounded near ties; apply Python's round() to
+    # the (few) distinct values so batch results match score_trial exactly.
+    uniques, inverse = np.unique(values, return_inverse=True)
+    return np.array([round(float(v), 4) for v in uniques])[inverse]
@@ -0,0 +1,100 @@
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+@dataclass(frozen=True)
+class SpecificityTier:
+    score: float
+    keywords: Tuple[str, ...] = ()
+    patterns: Tuple[str, ...] = ()
+
+
+# Tiers with more keywords than this are matched with one compiled alternation
+KEYWORD_REGEX_THRESHOLD = 8
+
+# Substring tiers used for all published results (DQ v2.0)
+DEFAULT_TIERS = [
+    SpecificityTier(1.0, keywords=('v2.', 'version')),
+    SpecificityTier(0.67, keywords=('rollback', 'auth', 'database')),
+    SpecificityTier(0.33, keywords=('deployment', 'service')),
+]
+
+# Regex tiers from Docs/metrics_specification.md: version + service/command,
+# service/command alone, then a generic remediation category.
+SPEC_VERSION = r'\bv?\d+\.\d+\.\d+\b'
+SPEC_COMMAND = r'\b(?:kubectl|docker|systemctl|aws|gcloud)\b'
+SPEC_SERVICE = r'auth|payment|api|database'
+
+SPEC_TIERS = [
+    SpecificityTier(1.0, patterns=(
+        rf'^(?=.*{SPEC_VERSION})(?=.*(?:{SPEC_COMMAND}|{SPEC_SERVICE}))',
+    )),
+    SpecificityTier(0.67, patterns=(SPEC_COMMAND, SPEC_SERVICE)),
+    SpecificityTier(0.33, keywords=('rollback', 'restart', 'deploy', 'revert', 'scale')),
+]
+
+
+class SpecificityMatcher:
+    """Precompiled specificity scorer for action text.
+
+    Each tier is compiled once. A few plain keywords become substring checks
+    (the fastest test CPython offers); longer keyword lists and regex
+    patterns are joined into a single alternation per tier, so adding
+    scenario keywords costs one regex scan rather than one check per word.
+    Tiers are tried from highest to lowest score, stopping at the first hit,
+    and results are memoized per action string because the same actions
+    recur across many trials.
+    """
+
+    def __init__(self, tiers: Optional[Sequence[SpecificityTier]] = None, cache_size: int = 65536):
+        self.tiers = sorted(tiers if tiers is not None else DEFAULT_TIERS, key=lambda t: -t.score)
+        self.cache_size = cache_size
+        self._cache: Dict[str, float] = {}
+        self._compiled: List[Tuple[float, Tuple[str, ...], Optional[re.Pattern]]] = [
+            self._compile_tier(tier) for tier in self.tiers
+        ]
+
+    @staticmethod
+    def _compile_tier(tier: SpecificityTier) -> Tuple[float, Tuple[str, ...], Optional[re.Pattern]]:
+        keywords = tuple(k.lower() for k in tier.keywords)
+        patterns = list(tier.patterns)
+        if len(keywords) > KEYWORD_REGEX_THRESHOLD:
+            # Long keyword lists scan faster as one alternation than as N substring tests
+            patterns.append('|'.join(re.escape(k) for k in sorted(keywords, key=len, reverse=True)))
+            keywords = ()
+        pattern = re.compile('|'.join(f'(?:{p})' for p in patterns)) if patterns else None
+        return tier.score, keywords, pattern
+
+    def with_keywords(self, score: float, keywords: Iterable[str]) -> 'SpecificityMatcher':
+        """Return a matcher with extra keywords (e.g. scenario service names) at a tier."""
+        keywords = tuple(keywords)
+        tiers = [
+            SpecificityTier(t.score, t.keywords + keywords, t.patterns) if t.score == score else t
+            for t in self.tiers
+        ]
+        if all(t.score != score for t in self.tiers):
+            tiers.append(SpecificityTier(score, keywords=keywords))
+        return SpecificityMatcher(tiers, self.cache_size)
+
+    def score(self, action: str) -> float:
+        text = action.lower()
+        cached = self._cache.get(text)
+        if cached is not None:
+            return cached
+
+        result = self._match(text)
+
+        if len(self._cache) >= self.cache_size:
+            self._cache.clear()
+        self._cache[text] = result
+        return result
+
+    def _match(self, text: str) -> float:
+        for score, keywords, pattern in self._compiled:
+            for keyword in keywords:
+                if keyword in text:
+                    return score
+            if pattern is not None and pattern.search(text):
+                return score
+        return 0.0
@@ -0,0 +1,222 @@
+"""Admission control for the services' LLM endpoints.
+
+A fixed number of requests run at once and a bounded queue waits behind
+them; anything beyond that is rejected immediately with ``Retry-After``
+rather than piling up coroutines that all time out against Ollama.
+"""
+import asyncio
+import email.utils
+import logging
+import math
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Deque, Dict, Optional, Sequence
+
+from src.utils.config import Config
+from src.utils.metrics import MetricsRegistry
+
+logger = logging.getLogger(__name__)
+
+QUEUE_FULL = "queue_full"
+QUEUE_TIMEOUT = "queue_timeout"
+
+
+class OverloadedError(RuntimeError):
+    """Raised when a request cannot be admitted; carries the HTTP answer."""
+
+    def __init__(self, reason: str, status_code: int, retry_after: int):
+        super().__init__(f"Request rejected ({reason}), retry after {retry_after}s")
+        self.reason = reason
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Concurrency limit with a bounded FIFO wait queue.
+
+    Up to ``max_concurrent`` requests hold a slot; up to ``max_queue`` more
+    wait for one, each for at most ``queue_timeout`` seconds. A full queue is
+    rejected at once with 429, a wait that times out with 503. Both carry a
+    ``retry_after`` estimated from the queue ahead and the recent request
+    duration. A released slot is handed straight to the oldest waiter, so
+    newcomers cannot overtake the queue. ``max_concurrent`` <= 0 admits
+    everything.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = Config.ADMISSION_MAX_CONCURRENT,
+        max_queue: int = Config.ADMISSION_MAX_QUEUE,
+        queue_timeout: float = Config.ADMISSION_QUEUE_TIMEOUT,
+        max_retry_after: int = 300
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = queue_timeout
+        self.max_retry_after = max_retry_after
+        self.active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        # Exponentially weighted mean of how long an admitted request holds its slot
+        self.mean_seconds: Optional[float] = None
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = {QUEUE_FULL: 0, QUEUE_TIMEOUT: 0}
+        self.queue_wait_seconds = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_concurrent > 0
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely free for a new arrival."""
+        mean = self.mean_seconds if self.mean_seconds is not None else 1.0
+        rounds = (self.queue_depth + 1) / max(1, self.max_concurrent)
+        return min(self.max_retry_after, max(1, math.ceil(rounds * mean)))
+
+    async def acquire(self) -> float:
+        """Take a slot, queueing if needed. Returns seconds spent queued."""
+        if not self.enabled or (self.active < self.max_concurrent and not self._waiters):
+            self.active += 1
+            self.admitted += 1
+            return 0.0
+        if len(self._waiters) >= self.max_queue:
+            self.rejected[QUEUE_FULL] += 1
+            raise OverloadedError(QUEUE_FULL, 429, self.retry_after())
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.queued += 1
+        t_start = time.monotonic()
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except asyncio.TimeoutError:
+            # The slot may have been handed over just as the wait timed out: pass it on
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            self.rejected[QUEUE_TIMEOUT] += 1
+            raise OverloadedError(QUEUE_TIMEOUT, 503, self.retry_after()) from None
+        except BaseException:
+            # Cancelled after the slot was handed over: pass it on
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+        waited = time.monotonic() - t_start
+        self.queue_wait_seconds += waited
+        self.admitted += 1
+        return waited
+
+    def release(self, held_seconds: Optional[float] = None):
+        if held_seconds is not None:
+            self.mean_seconds = (
+                held_seconds if self.mean_seconds is None
+                else 0.8 * self.mean_seconds + 0.2 * held_seconds
+            )
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def stats(self) -> Dict:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "active": self.active,
+            "queue_depth": self.queue_depth,
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "rejected": dict(self.rejected),
+            "mean_seconds": round(self.mean_seconds, 3) if self.mean_seconds is not None else None,
+            "retry_after": self.retry_after()
+        }
+
+
+def parse_retry_after(value: Optional[str], now: Optional[datetime] = None) -> Optional[float]:
+    """Seconds from a ``Retry-After`` header (delta-seconds or HTTP-date); None if absent or invalid."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - (now or datetime.now(timezone.utc))).total_seconds())
+
+
+def instrument_admission(
+    app,
+    admission: AdmissionController,
+    metrics: MetricsRegistry,
+    service: str,
+    paths: Sequence[str]
+):
+    """Gate ``paths`` through ``admission`` and export its queue metrics.
+
+    Call before ``instrument_app``/``instrument_tracing`` so the gate is the
+    innermost middleware: rejections and queueing time still show up in the
+    request metrics and traces. The slot is held until the app has finished
+    with the request (streamed bodies included) and released on every exit,
+    also when the handler raises or the client disconnects mid-response.
+    """
+    from fastapi.responses import JSONResponse
+
+    paths = set(paths)
+    queue_wait = metrics.histogram(
+        "myantfarm_admission_queue_wait_seconds", "Time admitted requests waited for a slot", ["service"]
+    )
+    rejected = metrics.counter(
+        "myantfarm_admission_rejected_total", "Requests shed by admission control", ["service", "reason"]
+    )
+    active = metrics.gauge("myantfarm_admission_active", "Requests holding an admission slot", ["service"])
+    depth = metrics.gauge("myantfarm_admission_queue_depth", "Requests waiting for an admission slot", ["service"])
+
+    def collect():
+        active.set(admission.active, service=service)
+        depth.set(admission.queue_depth, service=service)
+
+    metrics.add_collector(collect)
+
+    # Plain ASGI rather than @app.middleware("http"): a BaseHTTPMiddleware can
+    # only release from the body iterator, which never runs if the body is
+    # not sent
+    def admission_middleware(app):
+        async def admit_request(scope, receive, send):
+            if scope["type"] != "http" or scope["path"] not in paths or not admission.enabled:
+                return await app(scope, receive, send)
+            try:
+                waited = await admission.acquire()
+            except OverloadedError as e:
+                rejected.inc(service=service, reason=e.reason)
+                logger.warning(f"{scope['path']} rejected: {e}")
+                response = JSONResponse(
+                    {"detail": "Service overloaded", "reason": e.reason, "retry_after": e.retry_after},
+                    status_code=e.status_code,
+                    headers={"Retry-After": str(e.retry_after)}
+                )
+                return await response(scope, receive, send)
+            queue_wait.observe(waited, service=service)
+
+            t_start = time.monotonic()
+            try:
+                await app(scope, receive, send)
+            finally:
+                admission.release(time.monotonic() - t_start)
+
+        return admit_request
+
+    app.add_middleware(admission_middleware)
@@ -0,0 +1,85 @@
+"""Ollama backend pool with least-outstanding-requests balancing."""
+import itertools
+import math
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+
+import httpx
+
+
+def parse_backend_urls(urls: Union[str, Sequence[str]]) -> List[str]:
+    """Accept one URL, a comma-separated list or a sequence of URLs."""
+    if isinstance(urls, str):
+        urls = urls.split(",")
+    parsed = [url.strip().rstrip("/") for url in urls if url.strip()]
+    if not parsed:
+        raise ValueError("At least one Ollama backend URL is required")
+    return parsed
+
+
+class Backend:
+    """One Ollama server and its pooled client."""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.client: Optional[httpx.AsyncClient] = None
+        self.outstanding = 0
+        self.requests = 0
+        self.failures = 0
+
+    def stats(self) -> Dict:
+        return {
+            "url": self.url,
+            "outstanding": self.outstanding,
+            "requests": self.requests,
+            "failures": self.failures
+        }
+
+
+class BackendPool:
+    """Pick the backend with the fewest in-flight requests.
+
+    Ties rotate round-robin so idle backends share load evenly.
+    """
+
+    def __init__(self, urls: Union[str, Sequence[str]]):
+        self.backends = [Backend(url) for url in parse_backend_urls(urls)]
+        self._rotation = itertools.cycle(range(len(self.backends)))
+
+    def pick(self, exclude: Iterable[Backend] = ()) -> Optional[Backend]:
+        ranked = self.ranked(exclude)
+        return ranked[0] if ranked else None
+
+    def ranked(self, exclude: Iterable[Backend] = ()) -> List[Backend]:
+        """Backends in preference order: fewest in flight first, ties rotated."""
+        excluded = set(id(b) for b in exclude)
+        start = next(self._rotation)
+        ordered = self.backends[start:] + self.backends[:start]
+        # sorted() is stable, so the rotation breaks ties
+        return sorted((b for b in ordered if id(b) not in excluded), key=lambda b: b.outstanding)
+
+    def __iter__(self):
+        return iter(self.backends)
+
+    def __len__(self) -> int:
+        return len(self.backends)
+
+    def stats(self) -> List[Dict]:
+        return [backend.stats() for backend in self.backends]
+
+
+class LatencyWindow:
+    """Recent request latencies, for percentile-based hedge delays."""
+
+    def __init__(self, size: int = 200, min_samples: int = 20):
+        self.samples = deque(maxlen=size)
+        self.min_samples = min_samples
+
+    def add(self, seconds: float):
+        self.samples.append(seconds)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if len(self.samples) < self.min_samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, math.ceil(q * len(ordered)) - 1)]
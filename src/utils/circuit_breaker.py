@@ -0,0 +1,197 @@
+"""Circuit breakers for Ollama backends."""
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+from src.utils.config import Config
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "CLOSED"
+OPEN = "OPEN"
+HALF_OPEN = "HALF_OPEN"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when every eligible backend's breaker is refusing calls."""
+
+
+@dataclass(frozen=True)
+class Permit:
+    """A call admitted by ``allow()``; ``probe`` is the half-open period whose probe slot it holds."""
+    probe: Optional[int] = None
+
+
+class CircuitBreaker:
+    """Sliding-window breaker for one backend/model pair.
+
+    The last ``window`` calls are kept; once at least ``min_calls`` are in the
+    window the breaker opens when the failure rate reaches ``failure_rate`` or
+    the share of calls slower than ``slow_call_seconds`` reaches
+    ``slow_call_rate``. After ``open_seconds`` it goes half-open and admits at
+    most ``half_open_calls`` probes at a time; that many successes close it,
+    any failed or slow probe opens it again.
+
+    ``allow()`` reserves the call (and a probe slot when half-open) and
+    returns a ``Permit``; every allowed call must end in ``record()`` or
+    ``release()`` with that permit. Only permits holding a probe slot of the
+    current half-open period decide whether it closes, so calls admitted
+    while the breaker was still closed cannot close it. Nothing awaits, so
+    check-and-reserve is atomic on the event loop without a lock. A caller
+    that can fall back to another backend passes ``count=False`` and reports
+    the refusal with ``reject()`` or ``skip()`` once it knows the outcome.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window: int = Config.CIRCUIT_BREAKER_WINDOW,
+        min_calls: int = Config.CIRCUIT_BREAKER_MIN_CALLS,
+        failure_rate: float = Config.CIRCUIT_BREAKER_FAILURE_RATE,
+        slow_call_seconds: Optional[float] = Config.CIRCUIT_BREAKER_SLOW_CALL_SECONDS,
+        slow_call_rate: float = Config.CIRCUIT_BREAKER_SLOW_CALL_RATE,
+        open_seconds: float = Config.CIRCUIT_BREAKER_OPEN_SECONDS,
+        half_open_calls: int = Config.CIRCUIT_BREAKER_HALF_OPEN_CALLS,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.name = name
+        self.min_calls = max(1, min_calls)
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.open_seconds = open_seconds
+        self.half_open_calls = max(1, half_open_calls)
+        self.clock = clock
+
+        # (failed, slow) per completed call
+        self._outcomes = deque(maxlen=max(window, self.min_calls))
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probes = 0
+        self._probe_successes = 0
+        self.rejected = 0
+        self.skipped = 0
+        self.transitions = {CLOSED: 0, OPEN: 0, HALF_OPEN: 0}
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and self.clock() - self._opened_at >= self.open_seconds:
+            self._transition(HALF_OPEN)
+        return self._state
+
+    def allow(self, count: bool = True) -> Optional[Permit]:
+        """A ``Permit`` for the call, or None when the breaker refuses it."""
+        state = self.state
+        if state == CLOSED:
+            return Permit()
+        if state == HALF_OPEN and self._probes < self.half_open_calls:
+            self._probes += 1
+            return Permit(probe=self.transitions[HALF_OPEN])
+        if count:
+            self.reject()
+        return None
+
+    def _holds_probe(self, permit: Optional[Permit]) -> bool:
+        return (
+            self._state == HALF_OPEN
+            and permit is not None
+            and permit.probe == self.transitions[HALF_OPEN]
+        )
+
+    def reject(self):
+        """Count a refused call that no other backend took either."""
+        self.rejected += 1
+
+    def skip(self):
+        """Count a refused call that went to another backend instead."""
+        self.skipped += 1
+
+    def record(self, success: bool, duration: Optional[float] = None, permit: Optional[Permit] = None):
+        slow = (
+            self.slow_call_seconds is not None
+            and duration is not None
+            and duration > self.slow_call_seconds
+        )
+        if self._state == HALF_OPEN:
+            if not self._holds_probe(permit):
+                # Admitted before the breaker went half-open: not a probe
+                return
+            self._probes -= 1
+            if not success or slow:
+                self._transition(OPEN)
+                return
+            self._probe_successes += 1
+            if self._probe_successes >= self.half_open_calls:
+                self._transition(CLOSED)
+            return
+        if self._state == OPEN:
+            # A call admitted before the breaker opened
+            return
+
+        self._outcomes.append((not success, slow))
+        if len(self._outcomes) < self.min_calls:
+            return
+        failure_rate, slow_rate = self._rates()
+        if failure_rate >= self.failure_rate:
+            logger.warning(f"Circuit breaker {self.name} OPEN: failure rate {failure_rate:.0%}")
+            self._transition(OPEN)
+        elif self.slow_call_seconds is not None and slow_rate >= self.slow_call_rate:
+            logger.warning(f"Circuit breaker {self.name} OPEN: {slow_rate:.0%} of calls over {self.slow_call_seconds}s")
+            self._transition(OPEN)
+
+    def release(self, permit: Optional[Permit] = None):
+        """Give back an allowed call that ended without a verdict (e.g. cancelled)."""
+        if self._holds_probe(permit):
+            self._probes -= 1
+
+    def _rates(self):
+        if not self._outcomes:
+            return 0.0, 0.0
+        total = len(self._outcomes)
+        failures = sum(1 for failed, _ in self._outcomes if failed)
+        slow = sum(1 for _, slow in self._outcomes if slow)
+        return failures / total, slow / total
+
+    def _transition(self, state: str):
+        self._state = state
+        self.transitions[state] += 1
+        self._probes = 0
+        self._probe_successes = 0
+        if state == OPEN:
+            self._opened_at = self.clock()
+        elif state == CLOSED:
+            self._outcomes.clear()
+        logger.info(f"Circuit breaker {self.name} -> {state}")
+
+    def stats(self) -> Dict:
+        failure_rate, slow_rate = self._rates()
+        return {
+            "state": self.state,
+            "window_calls": len(self._outcomes),
+            "failure_rate": round(failure_rate, 4),
+            "slow_call_rate": round(slow_rate, 4),
+            "half_open_probes": self._probes,
+            "rejected": self.rejected,
+            "skipped": self.skipped,
+            "opened": self.transitions[OPEN]
+        }
+
+
+class CircuitBreakerRegistry:
+    """One CircuitBreaker per backend/model, created on first use."""
+
+    def __init__(self, **settings):
+        self.settings = settings
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, backend: str, model: str) -> CircuitBreaker:
+        key = f"{backend}|{model}"
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            breaker = self._breakers[key] = CircuitBreaker(key, **self.settings)
+        return breaker
+
+    def stats(self) -> Dict[str, Dict]:
+        return {key: breaker.stats() for key, breaker in self._breakers.items()}
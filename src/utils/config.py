@@ -1,5 +1,6 @@
 """Shared configuration management."""
 import os
+from pathlib import Path
 
 class Config:
     """Configuration for MyAntFarm.ai services."""
@@ -7,14 +8,82 @@ class Config:
     # Ollama
     OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://ollama:11434")
     OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "tinyllama")
+    # Comma-separated list; requests go to the backend with the fewest in flight
+    OLLAMA_BACKENDS = os.getenv("OLLAMA_BACKENDS", OLLAMA_BASE_URL)
+    
+    # Hedged requests: duplicate a slow call to a second backend after a delay
+    # (fixed OLLAMA_HEDGE_DELAY seconds, else the observed latency quantile)
+    OLLAMA_HEDGE = os.getenv("OLLAMA_HEDGE", "0") == "1"
+    OLLAMA_HEDGE_DELAY = float(os.getenv("OLLAMA_HEDGE_DELAY")) if os.getenv("OLLAMA_HEDGE_DELAY") else None
+    OLLAMA_HEDGE_QUANTILE = float(os.getenv("OLLAMA_HEDGE_QUANTILE", "0.95"))
+    OLLAMA_HEDGE_INITIAL_DELAY = float(os.getenv("OLLAMA_HEDGE_INITIAL_DELAY", "60.0"))
+    
+    # How long Ollama keeps the model loaded after a request ("30m", seconds, -1 = forever;
+    # empty = Ollama's default) and whether services pre-load it before reporting ready
+    OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "")
+    OLLAMA_WARMUP = os.getenv("OLLAMA_WARMUP", "1") == "1"
+    OLLAMA_WARMUP_RETRY_SECONDS = float(os.getenv("OLLAMA_WARMUP_RETRY_SECONDS", "5.0"))
+    
+    # Ollama connection pool
+    OLLAMA_MAX_CONNECTIONS = int(os.getenv("OLLAMA_MAX_CONNECTIONS", "16"))
+    OLLAMA_MAX_KEEPALIVE = int(os.getenv("OLLAMA_MAX_KEEPALIVE", "16"))
+    OLLAMA_KEEPALIVE_EXPIRY = float(os.getenv("OLLAMA_KEEPALIVE_EXPIRY", "120.0"))
+    OLLAMA_CONNECT_TIMEOUT = float(os.getenv("OLLAMA_CONNECT_TIMEOUT", "10.0"))
     
     # LLM
     LLM_TEMPERATURE = float(os.getenv("LLM_TEMPERATURE", "0.7"))
     LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "300.0"))
     
+    # LLM response cache: off, deterministic (temperature 0 or pinned seed) or all
+    LLM_CACHE = os.getenv("LLM_CACHE", "off")
+    LLM_CACHE_DIR = os.getenv("LLM_CACHE_DIR", "")
+    LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1024"))
+    LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+    LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "0"))
+    
+    # Share one generation between identical in-flight requests: all, deterministic or off.
+    # "deterministic" (temperature 0 or a pinned seed) keeps sampled trials independent
+    LLM_COALESCE = os.getenv("LLM_COALESCE", "deterministic")
+    
+    # Circuit breaker per backend/model: trips on the failure rate (or slow-call
+    # rate, when CIRCUIT_BREAKER_SLOW_CALL_SECONDS is set) over the last WINDOW calls
+    CIRCUIT_BREAKER_WINDOW = int(os.getenv("CIRCUIT_BREAKER_WINDOW", "20"))
+    CIRCUIT_BREAKER_MIN_CALLS = int(os.getenv("CIRCUIT_BREAKER_MIN_CALLS", "5"))
+    CIRCUIT_BREAKER_FAILURE_RATE = float(os.getenv("CIRCUIT_BREAKER_FAILURE_RATE", "0.5"))
+    CIRCUIT_BREAKER_SLOW_CALL_SECONDS = (
+        float(os.getenv("CIRCUIT_BREAKER_SLOW_CALL_SECONDS"))
+        if os.getenv("CIRCUIT_BREAKER_SLOW_CALL_SECONDS") else None
+    )
+    CIRCUIT_BREAKER_SLOW_CALL_RATE = float(os.getenv("CIRCUIT_BREAKER_SLOW_CALL_RATE", "0.8"))
+    CIRCUIT_BREAKER_OPEN_SECONDS = float(os.getenv("CIRCUIT_BREAKER_OPEN_SECONDS", "60.0"))
+    CIRCUIT_BREAKER_HALF_OPEN_CALLS = int(os.getenv("CIRCUIT_BREAKER_HALF_OPEN_CALLS", "1"))
+    
+    # Admission control: requests running at once per service (0 = unlimited),
+    # how many more may wait for a slot and for how long before a 503
+    ADMISSION_MAX_CONCURRENT = int(os.getenv("ADMISSION_MAX_CONCURRENT", "8"))
+    ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "32"))
+    ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "60.0"))
+    
+    # Client retries: jittered exponential backoff (Retry-After wins when sent) and a
+    # budget of RETRY_BUDGET_RATIO retries per call, plus RETRY_BUDGET_MIN up front
+    RETRY_MAX_ATTEMPTS = int(os.getenv("RETRY_MAX_ATTEMPTS", "3"))
+    RETRY_BASE_DELAY = float(os.getenv("RETRY_BASE_DELAY", "2.0"))
+    RETRY_MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY", "60.0"))
+    RETRY_BUDGET_RATIO = float(os.getenv("RETRY_BUDGET_RATIO", "0.2"))
+    RETRY_BUDGET_MIN = int(os.getenv("RETRY_BUDGET_MIN", "5"))
+    
+    # Tracing: JSONL span file (empty disables export; traceparent is still propagated)
+    TRACE_FILE = os.getenv("TRACE_FILE", "")
+    
     # Evaluation
     TRIALS_PER_CONDITION = int(os.getenv("TRIALS_PER_CONDITION", "116"))
     RANDOM_SEED = int(os.getenv("RANDOM_SEED", "42"))
     
+    # Scenarios
+    SCENARIO_DIR = os.getenv(
+        "SCENARIO_DIR", str(Path(__file__).resolve().parents[2] / "data" / "scenarios")
+    )
+    DEFAULT_SCENARIO = os.getenv("DEFAULT_SCENARIO", "auth_service_regression")
+    
     # Rate Limiting
     RATE_LIMIT_CALLS_PER_MIN = int(os.getenv("RATE_LIMIT_CALLS_PER_MIN", "10"))
\ No newline at end of file
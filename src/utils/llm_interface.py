@@ -1,29 +1,493 @@
 """Common LLM interface wrapper for all services."""
+import asyncio
+import json
+import time
 import httpx
-from typing import Optional
+from typing import AsyncIterator, Dict, Optional, Sequence, Tuple, Union
+
+from src.utils.backends import Backend, BackendPool, LatencyWindow
+from src.utils.circuit_breaker import CircuitBreaker, CircuitBreakerRegistry, CircuitOpenError, Permit
+from src.utils.config import Config
+from src.utils.metrics import MetricsRegistry
+from src.utils.response_cache import ResponseCache, is_deterministic, request_key
+from src.utils.single_flight import SingleFlight
+from src.utils.tracing import TRACEPARENT, Span, Tracer
+
+
+def parse_keep_alive(value: Optional[Union[str, int]]) -> Optional[Union[str, int]]:
+    """Ollama takes a duration string ("30m") or a number of seconds (-1: forever)."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, str) and value.lstrip("-").isdigit():
+        return int(value)
+    return value
+
 
 class LLMInterface:
-    """Shared LLM client for Ollama."""
-    
-    def __init__(self, base_url: str = "http://ollama:11434"):
-        self.base_url = base_url
-    
+    """Shared LLM client for Ollama.
+
+    Owns one pooled ``httpx.AsyncClient`` per Ollama backend for the
+    lifetime of the service so every generation reuses a warm keep-alive
+    connection instead of paying TCP setup per call. Call ``start()`` from
+    the service lifespan and ``aclose()`` on shutdown; ``generate()`` starts
+    the pools lazily if needed.
+
+    ``base_url`` may list several backends (comma-separated or a sequence);
+    each request goes to the one with the fewest requests in flight. With
+    ``hedge`` enabled, a non-streaming request still running after the hedge
+    delay (``hedge_delay`` seconds, or the recent ``hedge_quantile`` latency)
+    is duplicated to a second backend and the first success wins. With
+    ``breakers``, a backend whose breaker for the model is open is skipped;
+    ``CircuitOpenError`` is raised when no backend will take the call.
+    With ``metrics``, Ollama call latency, token counts, backend load and
+    breaker states are exported to that registry. With ``tracer``, each
+    backend call is a client span (child of the active span) whose
+    ``traceparent`` is sent to Ollama. ``keep_alive`` (e.g. ``"30m"``, or
+    seconds; -1 keeps the model loaded indefinitely) is sent with every
+    request, and ``warm_up()`` loads the model on each backend ahead of traffic.
+
+    An optional ``ResponseCache`` serves repeated cacheable requests without
+    calling Ollama; cache hits carry ``"cached": True``. Identical requests
+    that are in flight at the same time share one generation (``coalesce``:
+    ``all``, ``deterministic`` for temperature 0 / pinned seed only, or
+    ``off``).
+    """
+
+    def __init__(
+        self,
+        base_url: Union[str, Sequence[str]] = Config.OLLAMA_BACKENDS,
+        max_connections: int = Config.OLLAMA_MAX_CONNECTIONS,
+        max_keepalive_connections: int = Config.OLLAMA_MAX_KEEPALIVE,
+        keepalive_expiry: float = Config.OLLAMA_KEEPALIVE_EXPIRY,
+        connect_timeout: float = Config.OLLAMA_CONNECT_TIMEOUT,
+        timeout: float = Config.LLM_TIMEOUT,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        cache: Optional[ResponseCache] = None,
+        coalesce: str = Config.LLM_COALESCE,
+        hedge: bool = Config.OLLAMA_HEDGE,
+        hedge_delay: Optional[float] = Config.OLLAMA_HEDGE_DELAY,
+        hedge_quantile: float = Config.OLLAMA_HEDGE_QUANTILE,
+        hedge_initial_delay: float = Config.OLLAMA_HEDGE_INITIAL_DELAY,
+        breakers: Optional[CircuitBreakerRegistry] = None,
+        metrics: Optional[MetricsRegistry] = None,
+        tracer: Optional[Tracer] = None,
+        keep_alive: Optional[str] = Config.OLLAMA_KEEP_ALIVE
+    ):
+        self.pool = BackendPool(base_url)
+        self.base_url = self.pool.backends[0].url
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.transport = transport
+        self.cache = cache
+        self.coalesce = coalesce
+        self.single_flight = SingleFlight()
+        self.hedge = hedge and len(self.pool) > 1
+        self.hedge_delay = hedge_delay
+        self.hedge_quantile = hedge_quantile
+        self.hedge_initial_delay = hedge_initial_delay
+        self.latency = LatencyWindow()
+        self.hedges = {"fired": 0, "won": 0}
+        self.breakers = breakers
+        self.metrics = metrics
+        self.tracer = tracer
+        self.keep_alive = parse_keep_alive(keep_alive)
+        if metrics is not None:
+            self._instrument(metrics)
+
+    @property
+    def _client(self) -> Optional[httpx.AsyncClient]:
+        return self.pool.backends[0].client
+
+    async def start(self) -> httpx.AsyncClient:
+        """Open the pooled clients (idempotent); returns the first backend's."""
+        for backend in self.pool:
+            if backend.client is None or backend.client.is_closed:
+                # Ollama speaks HTTP/1.1; keep connections persistent and let the
+                # pool hold one socket per concurrent generation.
+                backend.client = httpx.AsyncClient(
+                    base_url=backend.url,
+                    limits=self.limits,
+                    timeout=self.timeout,
+                    http1=True,
+                    http2=False,
+                    headers={"Connection": "keep-alive"},
+                    transport=self.transport
+                )
+        return self._client
+
+    async def aclose(self):
+        """Close the pooled clients and release their connections."""
+        for backend in self.pool:
+            if backend.client is not None:
+                await backend.client.aclose()
+                backend.client = None
+
+    def stats(self) -> Dict:
+        return {
+            "backends": self.pool.stats(),
+            "hedging": {
+                "enabled": self.hedge,
+                "delay": round(self._hedge_delay(), 3) if self.hedge else None,
+                **self.hedges
+            },
+            "circuit_breakers": self.breakers.stats() if self.breakers else None
+        }
+
+    def _instrument(self, metrics: MetricsRegistry):
+        self._call_seconds = metrics.histogram(
+            "myantfarm_ollama_request_duration_seconds",
+            "Ollama /api/generate call duration (whole stream for streaming calls)",
+            ["backend", "model", "outcome"]
+        )
+        self._eval_seconds = metrics.histogram(
+            "myantfarm_ollama_eval_duration_seconds",
+            "Server-side generation time reported by Ollama (eval_duration)",
+            ["model"]
+        )
+        self._eval_tokens = metrics.counter(
+            "myantfarm_ollama_eval_tokens_total", "Tokens generated (Ollama eval_count)", ["model"]
+        )
+        self._prompt_tokens = metrics.counter(
+            "myantfarm_ollama_prompt_eval_tokens_total", "Prompt tokens evaluated (Ollama prompt_eval_count)", ["model"]
+        )
+        in_flight = metrics.gauge(
+            "myantfarm_ollama_requests_in_flight", "Ollama calls in flight per backend", ["backend"]
+        )
+        hedges = metrics.counter("myantfarm_ollama_hedges_total", "Hedged requests fired and won", ["result"])
+        breaker_state = metrics.gauge(
+            "myantfarm_circuit_breaker_state", "Breaker state: 0 closed, 1 half-open, 2 open", ["breaker"]
+        )
+        breaker_opened = metrics.counter(
+            "myantfarm_circuit_breaker_opened_total", "Times the breaker opened", ["breaker"]
+        )
+        breaker_rejected = metrics.counter(
+            "myantfarm_circuit_breaker_rejected_total", "Calls refused by the breaker and every other backend", ["breaker"]
+        )
+        breaker_skipped = metrics.counter(
+            "myantfarm_circuit_breaker_skipped_total", "Calls refused by the breaker but served elsewhere", ["breaker"]
+        )
+        states = {"CLOSED": 0, "HALF_OPEN": 1, "OPEN": 2}
+
+        def collect():
+            for backend in self.pool:
+                in_flight.set(backend.outstanding, backend=backend.url)
+            for result, count in self.hedges.items():
+                hedges.set(count, result=result)
+            for name, stats in (self.breakers.stats() if self.breakers else {}).items():
+                breaker_state.set(states[stats["state"]], breaker=name)
+                breaker_opened.set(stats["opened"], breaker=name)
+                breaker_rejected.set(stats["rejected"], breaker=name)
+                breaker_skipped.set(stats["skipped"], breaker=name)
+
+        metrics.add_collector(collect)
+
+    def _record_usage(self, model: str, result: dict):
+        # Ollama reports durations in nanoseconds on the final (done) response
+        if self.metrics is None:
+            return
+        if result.get("eval_count") is not None:
+            self._eval_tokens.inc(result["eval_count"], model=model)
+        if result.get("prompt_eval_count") is not None:
+            self._prompt_tokens.inc(result["prompt_eval_count"], model=model)
+        if result.get("eval_duration") is not None:
+            self._eval_seconds.observe(result["eval_duration"] / 1e9, model=model)
+
     async def generate(
-        self, 
-        model: str, 
-        prompt: str, 
+        self,
+        model: str,
+        prompt: str,
+        temperature: float = 0.7,
+        timeout: Optional[float] = None,
+        options: Optional[dict] = None
+    ) -> dict:
+        """Generate completion from Ollama.
+
+        ``options`` is forwarded as Ollama's ``options`` object and takes
+        precedence over ``temperature``. Raises ``httpx.HTTPStatusError`` on
+        non-2xx responses. Callers that joined another caller's identical
+        in-flight request get its result marked ``"coalesced": True``.
+        """
+        options = {"temperature": temperature, **(options or {})}
+        key = request_key(model, prompt, options)
+        cache_key = key if self.cache is not None and self.cache.accepts(options) else None
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return {**cached, "cached": True}
+
+        if not self._coalesces(options):
+            result = await self._post_generate(model, prompt, options, timeout)
+        else:
+            result, shared = await self.single_flight.do(
+                key, lambda: self._post_generate(model, prompt, options, timeout)
+            )
+            if shared:
+                return {**result, "coalesced": True}
+
+        if cache_key is not None:
+            self.cache.put(cache_key, result)
+        return result
+
+    async def generate_stream(
+        self,
+        model: str,
+        prompt: str,
         temperature: float = 0.7,
-        timeout: float = 300.0
+        timeout: Optional[float] = None,
+        options: Optional[dict] = None
+    ) -> AsyncIterator[dict]:
+        """Stream completion chunks from Ollama as they are generated.
+
+        Yields each NDJSON object from ``/api/generate``; token text is in
+        ``chunk["response"]`` and the last chunk has ``done: True``. A cache
+        hit is replayed as a single final chunk, and a caller joining an
+        identical in-flight stream replays its chunks so far, then follows it.
+        """
+        options = {"temperature": temperature, **(options or {})}
+        key = request_key(model, prompt, options)
+        cache_key = key if self.cache is not None and self.cache.accepts(options) else None
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                yield {**cached, "done": True, "cached": True}
+                return
+
+        if not self._coalesces(options):
+            chunks = self._shared_chunks(self._stream_generate(model, prompt, options, timeout))
+        else:
+            chunks = self.single_flight.stream(
+                key, lambda: self._stream_generate(model, prompt, options, timeout)
+            )
+
+        parts = []
+        async for chunk, shared in chunks:
+            if shared:
+                yield {**chunk, "coalesced": True}
+                continue
+            if cache_key is not None:
+                parts.append(chunk.get("response", ""))
+                if chunk.get("done"):
+                    self.cache.put(cache_key, {**chunk, "response": "".join(parts)})
+            yield chunk
+
+    async def warm_up(self, model: str, timeout: Optional[float] = None) -> Dict[str, dict]:
+        """Load ``model`` on every backend (an empty prompt only loads it).
+
+        Returns Ollama's response per backend URL, whose ``load_duration``
+        shows what the first real request would otherwise have paid. Raises
+        if any backend fails, so callers can retry until all are warm.
+        """
+        await self.start()
+        payload = {"model": model, "prompt": "", "stream": False}
+        if self.keep_alive is not None:
+            payload["keep_alive"] = self.keep_alive
+
+        async def load(backend: Backend) -> dict:
+            response = await backend.client.post(
+                "/api/generate",
+                json=payload,
+                timeout=timeout if timeout is not None else self.timeout
+            )
+            response.raise_for_status()
+            return response.json()
+
+        results = await asyncio.gather(*(load(backend) for backend in self.pool))
+        return {backend.url: result for backend, result in zip(self.pool, results)}
+
+    def _payload(self, model: str, prompt: str, options: dict, stream: bool) -> dict:
+        payload = {
+            "model": model,
+            "prompt": prompt,
+            "stream": stream,
+            "options": options
+        }
+        if self.keep_alive is not None:
+            payload["keep_alive"] = self.keep_alive
+        return payload
+
+    def _coalesces(self, options: dict) -> bool:
+        if self.coalesce == "all":
+            return True
+        return self.coalesce == "deterministic" and is_deterministic(options)
+
+    async def _post_generate(self, model: str, prompt: str, options: dict, timeout: Optional[float]) -> dict:
+        await self.start()
+        payload = self._payload(model, prompt, options, stream=False)
+        primary, permit = self._acquire(model)
+        if not self.hedge:
+            return await self._post_to(primary, permit, payload, timeout)
+
+        first = asyncio.create_task(self._post_to(primary, permit, payload, timeout))
+        tasks = [first]
+        try:
+            done, _ = await asyncio.wait({first}, timeout=self._hedge_delay())
+            if done:
+                return first.result()
+
+            # Still running past the hedge delay: race a duplicate on another backend
+            try:
+                secondary, secondary_permit = self._acquire(model, exclude=[primary])
+            except CircuitOpenError:
+                return await first
+            self.hedges["fired"] += 1
+            second = asyncio.create_task(self._post_to(secondary, secondary_permit, payload, timeout))
+            tasks.append(second)
+            racing = {first, second}
+            while racing:
+                done, racing = await asyncio.wait(racing, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is second:
+                            self.hedges["won"] += 1
+                        return task.result()
+            return first.result()  # both failed: surface the primary's error
+        finally:
+            # Also when the caller is cancelled mid-hedge: no call keeps holding its backend
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _breaker(self, backend: Backend, model: str) -> Optional[CircuitBreaker]:
+        return self.breakers.get(backend.url, model) if self.breakers else None
+
+    def _acquire(self, model: str, exclude=()) -> Tuple[Backend, Optional[Permit]]:
+        """Preferred backend whose breaker admits the call, with its breaker permit.
+
+        Breakers passed over count the call as skipped when another backend
+        takes it, or when it is a hedge (``exclude``) whose primary is still
+        running; only a call that goes nowhere counts as rejected.
+        """
+        ranked = self.pool.ranked(exclude)
+        refused = []
+        for backend in ranked:
+            breaker = self._breaker(backend, model)
+            permit = breaker.allow(count=False) if breaker is not None else None
+            if breaker is None or permit is not None:
+                for skipped in refused:
+                    skipped.skip()
+                return backend, permit
+            refused.append(breaker)
+        for breaker in refused:
+            if exclude:
+                breaker.skip()
+            else:
+                breaker.reject()
+        raise CircuitOpenError(f"Circuit open for {model} on {len(ranked)} backend(s)")
+
+    def _settle(
+        self, backend: Backend, permit: Optional[Permit], model: str, success: Optional[bool], elapsed: float
+    ):
+        # success None: the call was abandoned (cancelled), so it has no verdict
+        backend.outstanding -= 1
+        backend.requests += 1
+        if success is False:
+            backend.failures += 1
+        if self.metrics is not None:
+            outcome = {True: "ok", False: "error", None: "cancelled"}[success]
+            self._call_seconds.observe(elapsed, backend=backend.url, model=model, outcome=outcome)
+        breaker = self._breaker(backend, model)
+        if breaker is not None:
+            if success is None:
+                breaker.release(permit)
+            else:
+                breaker.record(success, elapsed, permit)
+
+    def _call_span(self, backend: Backend, model: str, stream: bool) -> Optional[Span]:
+        if self.tracer is None:
+            return None
+        return self.tracer.start_span(
+            "ollama.generate",
+            kind="client",
+            attributes={"backend": backend.url, "model": model, "stream": stream}
+        )
+
+    @staticmethod
+    def _end_call_span(span: Optional[Span], success: Optional[bool], result: Optional[dict] = None):
+        if span is None:
+            return
+        if success is None:
+            span.set_attribute("cancelled", True)
+        elif not success:
+            span.status = "error"
+        for field in ("eval_count", "prompt_eval_count", "total_duration", "load_duration"):
+            if result and result.get(field) is not None:
+                span.set_attribute(field, result[field])
+        span.end()
+
+    async def _post_to(
+        self, backend: Backend, permit: Optional[Permit], payload: dict, timeout: Optional[float]
     ) -> dict:
-        """Generate completion from Ollama."""
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            response = await client.post(
-                f"{self.base_url}/api/generate",
-                json={
-                    "model": model,
-                    "prompt": prompt,
-                    "temperature": temperature,
-                    "stream": False
-                }
+        backend.outstanding += 1
+        t_start = time.monotonic()
+        span = self._call_span(backend, payload["model"], stream=False)
+        success = None
+        result = None
+        try:
+            response = await backend.client.post(
+                "/api/generate",
+                json=payload,
+                timeout=timeout if timeout is not None else self.timeout,
+                headers={TRACEPARENT: span.traceparent} if span else None
             )
-            return response.json()
\ No newline at end of file
+            response.raise_for_status()
+            result = response.json()
+            success = True
+            self._record_usage(payload["model"], result)
+        except Exception:
+            success = False
+            raise
+        finally:
+            self._settle(backend, permit, payload["model"], success, time.monotonic() - t_start)
+            self._end_call_span(span, success, result)
+        self.latency.add(time.monotonic() - t_start)
+        return result
+
+    def _hedge_delay(self) -> float:
+        if self.hedge_delay is not None:
+            return self.hedge_delay
+        observed = self.latency.quantile(self.hedge_quantile)
+        return observed if observed is not None else self.hedge_initial_delay
+
+    async def _stream_generate(
+        self, model: str, prompt: str, options: dict, timeout: Optional[float]
+    ) -> AsyncIterator[dict]:
+        # Streams are balanced but not hedged: tokens may already be on their way to the client
+        await self.start()
+        backend, permit = self._acquire(model)
+        backend.outstanding += 1
+        t_start = time.monotonic()
+        span = self._call_span(backend, model, stream=True)
+        success = None
+        final = None
+        try:
+            async with backend.client.stream(
+                "POST",
+                "/api/generate",
+                json=self._payload(model, prompt, options, stream=True),
+                timeout=timeout if timeout is not None else self.timeout,
+                headers={TRACEPARENT: span.traceparent} if span else None
+            ) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if line.strip():
+                        chunk = json.loads(line)
+                        if chunk.get("done"):
+                            final = chunk
+                            self._record_usage(model, chunk)
+                        yield chunk
+            success = True
+        except Exception:
+            success = False
+            raise
+        finally:
+            self._settle(backend, permit, model, success, time.monotonic() - t_start)
+            self._end_call_span(span, success, final)
+
+    @staticmethod
+    async def _shared_chunks(chunks: AsyncIterator[dict]) -> AsyncIterator[Tuple[dict, bool]]:
+        async for chunk in chunks:
+            yield chunk, False
@@ -0,0 +1,207 @@
+"""Prometheus text-format metrics for the services."""
+import bisect
+import math
+import time
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+# Seconds; LLM calls on CPU range from sub-second cache/fallback paths to minutes
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(pairs: Iterable[Tuple[str, str]]) -> str:
+    rendered = ",".join(f'{name}="{_escape(value)}"' for name, value in pairs)
+    return f"{{{rendered}}}" if rendered else ""
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._values: Dict[Tuple[str, ...], object] = {}
+
+    def _key(self, labels: Dict[str, object]) -> Tuple[str, ...]:
+        if set(labels) != set(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for key in sorted(self._values):
+            lines.extend(self._samples(list(zip(self.label_names, key)), self._values[key]))
+        return lines
+
+    def _samples(self, labels: List[Tuple[str, str]], value) -> List[str]:
+        return [f"{self.name}{_format_labels(labels)} {_format_value(value)}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def set(self, value: float, **labels):
+        """Mirror a monotonic count kept elsewhere (for collectors)."""
+        self._values[self._key(labels)] = value
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        state = self._values.get(key)
+        if state is None:
+            # [per-bucket counts..., +Inf count], sum
+            state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+        state[0][bisect.bisect_left(self.buckets, value)] += 1
+        state[1] += value
+
+    def _samples(self, labels: List[Tuple[str, str]], state) -> List[str]:
+        counts, total = state
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (math.inf,), counts):
+            cumulative += count
+            le = _format_labels(labels + [("le", _format_value(bound))])
+            lines.append(f"{self.name}_bucket{le} {cumulative}")
+        lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}")
+        lines.append(f"{self.name}_count{_format_labels(labels)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named metrics rendered in the Prometheus text exposition format.
+
+    ``counter``/``gauge``/``histogram`` return the existing metric when the
+    name is already registered, so several components can share one. State
+    kept elsewhere (pool sizes, breaker states) is copied in at scrape time
+    by functions passed to ``add_collector``.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+
+    def _register(self, cls, name: str, help: str, labels: Sequence[str], **kwargs):
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics[name] = cls(name, help, labels, **kwargs)
+        elif not isinstance(metric, cls) or metric.label_names != tuple(labels):
+            raise ValueError(f"Metric {name} already registered with a different type or labels")
+        return metric
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        return self._register(Counter, name, help, labels)
+
+    def gauge(self, name: str, help: str, labels: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge, name, help, labels)
+
+    def histogram(
+        self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram, name, help, labels, buckets=buckets)
+
+    def add_collector(self, collect: Callable[[], None]):
+        self._collectors.append(collect)
+
+    def render(self) -> str:
+        for collect in self._collectors:
+            collect()
+        lines = []
+        for name in sorted(self._metrics):
+            lines.extend(self._metrics[name].render())
+        return "\n".join(lines) + "\n"
+
+
+def instrument_app(app, metrics: MetricsRegistry, service: str):
+    """Time every request per route and serve ``metrics`` at ``/metrics``.
+
+    Streaming responses are timed until their last chunk has been sent; the
+    in-flight gauge and duration are also settled when the handler raises or
+    the client disconnects.
+    """
+    from fastapi.responses import Response
+
+    duration = metrics.histogram(
+        "myantfarm_http_request_duration_seconds",
+        "Request latency by endpoint, including streamed bodies",
+        ["service", "endpoint", "status"]
+    )
+    in_flight = metrics.gauge(
+        "myantfarm_http_requests_in_flight",
+        "Requests currently being handled",
+        ["service", "endpoint"]
+    )
+
+    @app.get("/metrics", include_in_schema=False)
+    async def export_metrics():
+        return Response(metrics.render(), media_type=CONTENT_TYPE)
+
+    # Collected on the first request, once the service has registered its routes
+    router = app.router
+    routes = set()
+
+    def metrics_middleware(app):
+        async def record_request(scope, receive, send):
+            if scope["type"] != "http" or scope["path"] == "/metrics":
+                return await app(scope, receive, send)
+            start = time.monotonic()
+            if not routes:
+                routes.update(getattr(route, "path", None) for route in router.routes)
+            # Label by known route only, so stray paths cannot grow the series count
+            endpoint = scope["path"] if scope["path"] in routes else "other"
+            in_flight.inc(service=service, endpoint=endpoint)
+            status = 500
+
+            async def send_with_status(message):
+                nonlocal status
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                await send(message)
+
+            try:
+                await app(scope, receive, send_with_status)
+            finally:
+                in_flight.dec(service=service, endpoint=endpoint)
+                duration.observe(time.monotonic() - start, service=service, endpoint=endpoint, status=status)
+
+        return record_request
+
+    app.add_middleware(metrics_middleware)
@@ -0,0 +1,83 @@
+"""Server-side timing fields from Ollama responses."""
+from typing import Dict, Iterable, Mapping, Optional
+
+# Ollama reports these in nanoseconds on the final (done) response
+DURATION_FIELDS = {
+    "total_duration": "total_seconds",
+    "load_duration": "load_seconds",
+    "prompt_eval_duration": "prompt_eval_seconds",
+    "eval_duration": "eval_seconds"
+}
+COUNT_FIELDS = ("prompt_eval_count", "eval_count")
+
+
+def _rate(count: Optional[float], seconds: Optional[float]) -> Optional[float]:
+    if not count or not seconds:
+        return None
+    return round(count / seconds, 3)
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 6) if value is not None else None
+
+
+def ollama_timings(result: Optional[Mapping], call_seconds: Optional[float] = None) -> Optional[Dict]:
+    """Ollama's timing fields in seconds, with token rates and overhead.
+
+    ``call_seconds`` is the caller's wall-clock time for the call; whatever
+    Ollama did not account for (network, queueing before the server started
+    its clock) is ``overhead_seconds``. ``model_seconds`` is the model time
+    the caller waited on: ``total_seconds``, or 0 for a response replayed
+    from the cache or another caller's generation. Returns None when
+    the response carries no timings (e.g. a mocked or failed call).
+    """
+    if not result or result.get("total_duration") is None:
+        return None
+    timings = {
+        seconds: _round(result[field] / 1e9) if result.get(field) is not None else None
+        for field, seconds in DURATION_FIELDS.items()
+    }
+    timings.update({field: result.get(field) for field in COUNT_FIELDS})
+    timings["tokens_per_second"] = _rate(timings["eval_count"], timings["eval_seconds"])
+    timings["prompt_tokens_per_second"] = _rate(timings["prompt_eval_count"], timings["prompt_eval_seconds"])
+
+    # A replayed (cached or coalesced) response did not cost this call its model time
+    replayed = bool(result.get("cached") or result.get("coalesced"))
+    timings["replayed"] = replayed
+    timings["model_seconds"] = 0.0 if replayed else timings["total_seconds"]
+    timings["call_seconds"] = _round(call_seconds)
+    timings["overhead_seconds"] = (
+        _round(call_seconds - timings["total_seconds"])
+        if call_seconds is not None and not replayed else None
+    )
+    return timings
+
+
+def combine_timings(agents: Mapping[str, Optional[Dict]], critical_path: Iterable[str] = ()) -> Optional[Dict]:
+    """Totals over several agents' ``ollama_timings``.
+
+    Counts and durations are summed over every agent (the compute spent);
+    ``model_seconds`` sums only the agents on ``critical_path``, which is
+    the model time the overall response actually waited on.
+    """
+    present = {name: timings for name, timings in agents.items() if timings}
+    if not present:
+        return None
+    combined = {}
+    for field in list(DURATION_FIELDS.values()) + list(COUNT_FIELDS):
+        values = [t[field] for t in present.values() if t.get(field) is not None]
+        combined[field] = _round(sum(values)) if values else None
+    combined["tokens_per_second"] = _rate(combined["eval_count"], combined["eval_seconds"])
+    combined["prompt_tokens_per_second"] = _rate(combined["prompt_eval_count"], combined["prompt_eval_seconds"])
+    combined["model_seconds"] = _round(sum(
+        present[name]["model_seconds"] for name in critical_path if name in present
+    ))
+    combined["agents"] = len(present)
+    return combined
+
+
+def overhead_seconds(t2u: float, timings: Optional[Mapping]) -> Optional[float]:
+    """Part of an end-to-end latency not spent in the model (network, queueing, orchestration)."""
+    if not timings or timings.get("model_seconds") is None:
+        return None
+    return round(t2u - timings["model_seconds"], 6)
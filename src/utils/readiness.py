@@ -0,0 +1,76 @@
+"""Model warm-up and the ``/ready`` endpoint for the services."""
+import asyncio
+import logging
+import time
+from typing import Dict, Optional
+
+from src.utils.config import Config
+from src.utils.llm_interface import LLMInterface
+from src.utils.ollama_timings import ollama_timings
+
+logger = logging.getLogger(__name__)
+
+
+class Warmup:
+    """Pre-load the service's model on every backend before reporting ready.
+
+    ``run()`` retries every ``retry_seconds`` until all backends have loaded
+    the model (Ollama may still be pulling or starting), so it belongs in a
+    background task started from the lifespan; ``/health`` stays live while
+    ``/ready`` answers 503. With ``enabled`` False the service is ready at once.
+    """
+
+    def __init__(
+        self,
+        llm: LLMInterface,
+        model: str,
+        enabled: bool = Config.OLLAMA_WARMUP,
+        retry_seconds: float = Config.OLLAMA_WARMUP_RETRY_SECONDS
+    ):
+        self.llm = llm
+        self.model = model
+        self.enabled = enabled
+        self.retry_seconds = retry_seconds
+        self.ready = not enabled
+        self.attempts = 0
+        self.error: Optional[str] = None
+        self.seconds: Optional[float] = None
+        self.backends: Dict[str, Optional[Dict]] = {}
+
+    async def run(self):
+        t_start = time.monotonic()
+        while not self.ready:
+            self.attempts += 1
+            try:
+                results = await self.llm.warm_up(self.model)
+            except Exception as e:
+                self.error = f"{type(e).__name__}: {e}"
+                logger.warning(f"Warm-up of {self.model} failed (attempt {self.attempts}): {self.error}")
+                await asyncio.sleep(self.retry_seconds)
+                continue
+            self.backends = {url: ollama_timings(result) for url, result in results.items()}
+            self.seconds = time.monotonic() - t_start
+            self.error = None
+            self.ready = True
+            logger.info(f"Model {self.model} warm on {len(results)} backend(s) after {self.seconds:.1f}s")
+
+    def status(self) -> Dict:
+        return {
+            "ready": self.ready,
+            "model": self.model,
+            "warmup": self.enabled,
+            "keep_alive": self.llm.keep_alive,
+            "attempts": self.attempts,
+            "seconds": round(self.seconds, 3) if self.seconds is not None else None,
+            "error": self.error,
+            "backends": self.backends
+        }
+
+
+def instrument_readiness(app, warmup: Warmup):
+    """Serve ``/ready``: 200 once the model is warm, 503 until then."""
+    from fastapi.responses import JSONResponse
+
+    @app.get("/ready")
+    async def ready():
+        return JSONResponse(warmup.status(), status_code=200 if warmup.ready else 503)
@@ -0,0 +1,191 @@
+"""Content-addressed cache for Ollama generations."""
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from src.utils.config import Config
+
+CACHE_MODES = ("off", "deterministic", "all")
+
+
+def request_key(model: str, prompt: str, options: Dict) -> str:
+    """Content address of a generate request (model, prompt and options)."""
+    payload = json.dumps(
+        {"model": model, "prompt": prompt, "options": options},
+        sort_keys=True,
+        separators=(",", ":")
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def is_deterministic(options: Dict) -> bool:
+    """Whether Ollama output is reproducible: temperature 0 or a pinned seed."""
+    return options.get("temperature") == 0 or options.get("seed") is not None
+
+
+class ResponseCache:
+    """Two-tier (memory LRU + optional disk) cache of generate() responses.
+
+    Entries are keyed by a SHA-256 of the model, prompt and options (which
+    include temperature and seed), so identical requests map to one file no
+    matter which service or process made them. In ``deterministic`` mode only
+    reproducible calls are cached (temperature 0 or a pinned seed); ``all``
+    caches every call and is meant for CI smoke runs. Entries older than
+    ``ttl`` seconds are ignored and removed; the disk tier evicts least
+    recently used files once it grows past ``max_disk_bytes``.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[Path] = None,
+        mode: str = "deterministic",
+        max_entries: int = Config.LLM_CACHE_MAX_ENTRIES,
+        max_disk_bytes: int = Config.LLM_CACHE_MAX_BYTES,
+        ttl: Optional[float] = None
+    ):
+        if mode not in CACHE_MODES[1:]:
+            raise ValueError(f"Unsupported cache mode '{mode}' (expected deterministic or all)")
+        self.mode = mode
+        self.max_entries = max(1, max_entries)
+        self.max_disk_bytes = max_disk_bytes
+        self.ttl = ttl if ttl and ttl > 0 else None
+        self.directory = Path(directory) if directory else None
+
+        self._memory: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+        self._disk: "OrderedDict[str, int]" = OrderedDict()
+        self._disk_bytes = 0
+        self.hits = {"memory": 0, "disk": 0}
+        self.misses = 0
+
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._load_disk_index()
+
+    @classmethod
+    def from_config(cls) -> Optional["ResponseCache"]:
+        """Build the cache described by the LLM_CACHE* settings, or None when off."""
+        if Config.LLM_CACHE == "off":
+            return None
+        return cls(
+            directory=Config.LLM_CACHE_DIR or None,
+            mode=Config.LLM_CACHE,
+            max_entries=Config.LLM_CACHE_MAX_ENTRIES,
+            max_disk_bytes=Config.LLM_CACHE_MAX_BYTES,
+            ttl=Config.LLM_CACHE_TTL
+        )
+
+    @staticmethod
+    def key(model: str, prompt: str, options: Dict) -> str:
+        return request_key(model, prompt, options)
+
+    def accepts(self, options: Dict) -> bool:
+        """Whether a call with these options may be served from the cache."""
+        if self.mode == "all":
+            return True
+        return is_deterministic(options)
+
+    def get(self, key: str) -> Optional[Dict]:
+        entry = self._memory.get(key)
+        if entry is not None and self._fresh(entry[0]):
+            self._memory.move_to_end(key)
+            self.hits["memory"] += 1
+            return entry[1]
+        if entry is not None:
+            del self._memory[key]
+
+        entry = self._read_disk(key)
+        if entry is not None:
+            self._remember(key, *entry)
+            self.hits["disk"] += 1
+            return entry[1]
+
+        self.misses += 1
+        return None
+
+    def put(self, key: str, response: Dict):
+        created = time.time()
+        self._remember(key, created, response)
+        if self.directory is not None:
+            self._write_disk(key, created, response)
+
+    def stats(self) -> Dict:
+        lookups = self.hits["memory"] + self.hits["disk"] + self.misses
+        return {
+            "mode": self.mode,
+            "memory_entries": len(self._memory),
+            "disk_entries": len(self._disk),
+            "disk_bytes": self._disk_bytes,
+            "memory_hits": self.hits["memory"],
+            "disk_hits": self.hits["disk"],
+            "misses": self.misses,
+            "hit_rate": round((lookups - self.misses) / lookups, 4) if lookups else 0.0
+        }
+
+    def _fresh(self, created: float) -> bool:
+        return self.ttl is None or time.time() - created <= self.ttl
+
+    def _remember(self, key: str, created: float, response: Dict):
+        self._memory[key] = (created, response)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def _load_disk_index(self):
+        # Oldest access first, so eviction order survives restarts
+        entries = []
+        for path in self.directory.glob("*/*.json"):
+            stat = path.stat()
+            entries.append((stat.st_mtime, path.stem, stat.st_size))
+        for _, key, size in sorted(entries):
+            self._disk[key] = size
+            self._disk_bytes += size
+
+    def _read_disk(self, key: str) -> Optional[Tuple[float, Dict]]:
+        if self.directory is None:
+            return None
+        # Always try the file: another process sharing the directory may
+        # have written it since the index was built.
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self._drop_disk(key)
+            return None
+        if not self._fresh(entry["created"]):
+            self._drop_disk(key)
+            return None
+        if key not in self._disk:
+            self._disk[key] = path.stat().st_size
+            self._disk_bytes += self._disk[key]
+        self._disk.move_to_end(key)
+        os.utime(path)
+        return entry["created"], entry["response"]
+
+    def _write_disk(self, key: str, created: float, response: Dict):
+        path = self._path(key)
+        path.parent.mkdir(exist_ok=True)
+        data = json.dumps({"created": created, "response": response}).encode("utf-8")
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        self._disk_bytes += len(data) - self._disk.pop(key, 0)
+        self._disk[key] = len(data)
+        while self._disk_bytes > self.max_disk_bytes and len(self._disk) > 1:
+            self._drop_disk(next(iter(self._disk)))
+
+    def _drop_disk(self, key: str):
+        self._disk_bytes -= self._disk.pop(key, 0)
+        try:
+            self._path(key).unlink()
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,179 @@
+"""Retry policy with jittered exponential backoff and a shared retry budget."""
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from src.utils.config import Config
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Statuses worth retrying: timeouts, overload (429/503 with Retry-After) and gateway errors
+RETRYABLE_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+
+
+class RetryableError(Exception):
+    """A failed attempt that may be retried, with the server's ``Retry-After`` if it sent one."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+@dataclass
+class RetryState:
+    """How one call went: attempts made and time lost to failed attempts and backoff."""
+    attempts: int = 0
+    retry_seconds: float = 0.0
+    backoff_seconds: float = 0.0
+    errors: List[str] = field(default_factory=list)
+    budget_exhausted: bool = False
+
+    def to_dict(self) -> Dict:
+        return {
+            "attempts": self.attempts,
+            "retry_seconds": round(self.retry_seconds, 3),
+            "backoff_seconds": round(self.backoff_seconds, 3),
+            "retry_errors": list(self.errors),
+            "retry_budget_exhausted": self.budget_exhausted
+        }
+
+
+class RetryError(Exception):
+    """Raised when a call gave up; ``state`` says why and what it cost."""
+
+    def __init__(self, message: str, state: RetryState):
+        super().__init__(message)
+        self.state = state
+
+
+class RetryBudget:
+    """Caps retries at a fraction of calls, shared by everyone using one target.
+
+    Each first attempt deposits ``ratio`` tokens and each retry spends one,
+    so when a service is failing outright retries add at most ``ratio`` extra
+    load instead of multiplying it. ``min_retries`` tokens are available up
+    front (and the balance never exceeds ``max_tokens``) so a quiet target can
+    still retry its first few failures.
+    """
+
+    def __init__(
+        self,
+        ratio: float = Config.RETRY_BUDGET_RATIO,
+        min_retries: int = Config.RETRY_BUDGET_MIN,
+        max_tokens: Optional[float] = None
+    ):
+        self.ratio = ratio
+        self.max_tokens = max(float(min_retries), max_tokens if max_tokens is not None else min_retries + 10 * ratio)
+        self.tokens = float(min_retries)
+        self.calls = 0
+        self.retries = 0
+        self.denied = 0
+
+    def record_call(self):
+        self.calls += 1
+        self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        if self.tokens < 1:
+            self.denied += 1
+            return False
+        self.tokens -= 1
+        self.retries += 1
+        return True
+
+    def stats(self) -> Dict:
+        return {
+            "ratio": self.ratio,
+            "tokens": round(self.tokens, 3),
+            "calls": self.calls,
+            "retries": self.retries,
+            "denied": self.denied
+        }
+
+
+class RetryPolicy:
+    """Retry an async call with capped exponential backoff and full jitter.
+
+    Retry ``n`` (1-based) sleeps a uniform draw from
+    ``[0, min(max_delay, base_delay * multiplier ** (n - 1))]``, which
+    spreads retries from concurrent callers instead of synchronizing them.
+    A ``Retry-After`` from the server replaces the backoff (capped at
+    ``max_retry_after``). ``RetryableError`` with a retryable (or no) status
+    and the exception types in ``retry_on`` are retried; any other failure
+    ends the call at once.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = Config.RETRY_MAX_ATTEMPTS,
+        base_delay: float = Config.RETRY_BASE_DELAY,
+        max_delay: float = Config.RETRY_MAX_DELAY,
+        multiplier: float = 2.0,
+        max_retry_after: float = 300.0,
+        budget: Optional[RetryBudget] = None,
+        retry_on: Tuple[type, ...] = (RetryableError, OSError, asyncio.TimeoutError),
+        rng: Optional[random.Random] = None,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep
+    ):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.max_retry_after = max_retry_after
+        self.budget = budget
+        self.retry_on = retry_on
+        self.rng = rng or random.Random()
+        self.sleep = sleep
+
+    def delay(self, retry: int, retry_after: Optional[float] = None) -> float:
+        if retry_after is not None:
+            return min(retry_after, self.max_retry_after)
+        ceiling = min(self.max_delay, self.base_delay * self.multiplier ** (retry - 1))
+        return self.rng.uniform(0, ceiling)
+
+    def _retryable(self, error: BaseException) -> bool:
+        if isinstance(error, RetryableError):
+            return error.status_code is None or error.status_code in RETRYABLE_STATUSES
+        return isinstance(error, self.retry_on)
+
+    async def run(self, attempt: Callable[[], Awaitable[T]], label: str = "call") -> Tuple[T, RetryState]:
+        """Await ``attempt()`` until it succeeds; returns its result and the ``RetryState``.
+
+        Raises ``RetryError`` (chained to the last failure) once attempts run
+        out, the budget is spent or a failure is not retryable.
+        """
+        state = RetryState()
+        if self.budget is not None:
+            self.budget.record_call()
+        t_start = time.monotonic()
+        while True:
+            state.attempts += 1
+            t_attempt = time.monotonic()
+            try:
+                return await attempt(), state
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+                state.errors.append(error)
+                state.retry_seconds = time.monotonic() - t_start
+                if not self._retryable(e):
+                    raise RetryError(f"{label}: {error} (not retryable)", state) from e
+                if state.attempts >= self.max_attempts:
+                    raise RetryError(f"{label}: {error} after {state.attempts} attempts", state) from e
+                if self.budget is not None and not self.budget.try_spend():
+                    state.budget_exhausted = True
+                    raise RetryError(f"{label}: {error} (retry budget exhausted)", state) from e
+
+                delay = self.delay(state.attempts, getattr(e, "retry_after", None))
+                logger.warning(
+                    f"{label} attempt {state.attempts} failed after {time.monotonic() - t_attempt:.1f}s "
+                    f"({error}), retrying in {delay:.1f}s"
+                )
+                await self.sleep(delay)
+                state.backoff_seconds += delay
+                state.retry_seconds = time.monotonic() - t_start
@@ -0,0 +1,112 @@
+"""Single-flight deduplication of identical concurrent calls."""
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+
+class _Flight:
+    def __init__(self):
+        self.task: Optional[asyncio.Task] = None
+        self.waiters = 0
+        # Streaming flights only
+        self.chunks: List[Any] = []
+        self.finished = False
+        self.error: Optional[BaseException] = None
+        self.updated = asyncio.Event()
+
+
+class SingleFlight:
+    """Let concurrent callers with the same key share one in-flight call.
+
+    The first caller starts the work as a task; callers arriving while it
+    runs await the same task instead of starting their own. The task is
+    shielded from any single caller's cancellation and is only cancelled
+    once every caller has gone away. ``stream()`` does the same for async
+    iterators: late joiners replay the chunks produced so far, then follow
+    live. Keys are forgotten as soon as the call finishes, so results are
+    never reused after the fact (that is what a cache is for).
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, _Flight] = {}
+        self._streams: Dict[str, _Flight] = {}
+        self.started = 0
+        self.shared = 0
+
+    def _join(self, flights: Dict[str, _Flight], key: str) -> Tuple[_Flight, bool]:
+        flight = flights.get(key)
+        shared = flight is not None
+        if shared:
+            self.shared += 1
+        else:
+            flight = flights[key] = _Flight()
+            self.started += 1
+        flight.waiters += 1
+        return flight, shared
+
+    @staticmethod
+    def _leave(flight: _Flight):
+        flight.waiters -= 1
+        if flight.waiters == 0 and not flight.task.done():
+            flight.task.cancel()
+
+    @staticmethod
+    def _forget(flights: Dict[str, _Flight], key: str, flight: _Flight):
+        if flights.get(key) is flight:
+            del flights[key]
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Run ``fn()`` once per key at a time. Returns ``(result, shared)``."""
+        flight, shared = self._join(self._calls, key)
+        if not shared:
+            flight.task = asyncio.ensure_future(fn())
+            flight.task.add_done_callback(lambda _: self._forget(self._calls, key, flight))
+        try:
+            return await asyncio.shield(flight.task), shared
+        finally:
+            self._leave(flight)
+
+    async def stream(self, key: str, fn: Callable[[], AsyncIterator[Any]]) -> AsyncIterator[Tuple[Any, bool]]:
+        """Iterate ``fn()`` once per key at a time, yielding ``(chunk, shared)``."""
+        flight, shared = self._join(self._streams, key)
+        if not shared:
+            flight.task = asyncio.ensure_future(self._pump(key, flight, fn))
+
+        position = 0
+        try:
+            while True:
+                updated = flight.updated
+                if position < len(flight.chunks):
+                    position += 1
+                    yield flight.chunks[position - 1], shared
+                elif flight.finished:
+                    if flight.error is not None:
+                        raise flight.error
+                    return
+                else:
+                    await updated.wait()
+        finally:
+            self._leave(flight)
+
+    async def _pump(self, key: str, flight: _Flight, fn: Callable[[], AsyncIterator[Any]]):
+        try:
+            async for chunk in fn():
+                flight.chunks.append(chunk)
+                self._notify(flight)
+        except Exception as e:
+            flight.error = e
+        finally:
+            flight.finished = True
+            self._forget(self._streams, key, flight)
+            self._notify(flight)
+
+    @staticmethod
+    def _notify(flight: _Flight):
+        flight.updated.set()
+        flight.updated = asyncio.Event()
+
+    def stats(self) -> Dict:
+        return {
+            "in_flight": len(self._calls) + len(self._streams),
+            "started": self.started,
+            "shared": self.shared
+        }
@@ -0,0 +1,70 @@
+"""Helpers for streaming LLM output to clients as NDJSON."""
+import json
+from typing import List
+
+SUMMARY_MARKER = "SUMMARY:"
+ACTIONS_MARKER = "ACTIONS:"
+
+
+def ndjson(event: dict) -> str:
+    """Serialize one stream event as a newline-delimited JSON line."""
+    return json.dumps(event) + "\n"
+
+
+class BriefStreamParser:
+    """Incrementally parse ``SUMMARY:``/``ACTIONS:`` output from token chunks.
+
+    ``feed()`` returns the events that became complete with the new text:
+    a ``summary`` event once the ``ACTIONS:`` marker arrives and one
+    ``action`` event per finished ``-``/``*`` bullet line. ``close()`` flushes
+    a trailing bullet that was not newline-terminated.
+    """
+
+    def __init__(self, min_action_length: int = 5):
+        self.min_action_length = min_action_length
+        self.text = ""
+        self.summary = ""
+        self.actions: List[str] = []
+        self._actions_start = None
+        self._line_start = None
+
+    def feed(self, chunk: str) -> List[dict]:
+        self.text += chunk
+        events = []
+
+        if self._actions_start is None:
+            marker = self.text.find(ACTIONS_MARKER)
+            if marker == -1:
+                return events
+            self._actions_start = marker + len(ACTIONS_MARKER)
+            self._line_start = self._actions_start
+            summary_at = self.text.find(SUMMARY_MARKER)
+            if summary_at != -1 and summary_at < marker:
+                self.summary = self.text[summary_at + len(SUMMARY_MARKER):marker].strip()
+                events.append({"event": "summary", "summary": self.summary})
+
+        while True:
+            newline = self.text.find("\n", self._line_start)
+            if newline == -1:
+                break
+            events.extend(self._take_line(self.text[self._line_start:newline]))
+            self._line_start = newline + 1
+
+        return events
+
+    def close(self) -> List[dict]:
+        if self._actions_start is None or self._line_start >= len(self.text):
+            return []
+        events = self._take_line(self.text[self._line_start:])
+        self._line_start = len(self.text)
+        return events
+
+    def _take_line(self, line: str) -> List[dict]:
+        line = line.strip()
+        if not line or not (line.startswith("-") or line.startswith("*")):
+            return []
+        action = line.lstrip("-*").strip()
+        if len(action) <= self.min_action_length:
+            return []
+        self.actions.append(action)
+        return [{"event": "action", "action": action}]
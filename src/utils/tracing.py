@@ -0,0 +1,271 @@
+"""Minimal distributed tracing with W3C ``traceparent`` propagation.
+
+Spans are written one JSON object per line to a file (``TRACE_FILE``), so
+the evaluator and each service can share a directory and their spans be
+joined on ``trace_id``. Print one trace as a tree with::
+
+    python -m src.utils.tracing traces/*.jsonl --trace <trace_id>
+"""
+import contextvars
+import json
+import re
+import secrets
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from src.utils.config import Config
+
+TRACEPARENT = "traceparent"
+_TRACEPARENT_RE = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+_current: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+
+
+@dataclass(frozen=True)
+class SpanContext:
+    trace_id: str
+    span_id: str
+    sampled: bool = True
+
+    @classmethod
+    def from_traceparent(cls, header: Optional[str]) -> Optional["SpanContext"]:
+        """Parse a version-00 ``traceparent``; None when absent or malformed."""
+        match = _TRACEPARENT_RE.match((header or "").strip().lower())
+        if match is None:
+            return None
+        trace_id, span_id, flags = match.groups()
+        if trace_id == "0" * 32 or span_id == "0" * 16:
+            return None
+        return cls(trace_id, span_id, bool(int(flags, 16) & 1))
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+
+class Span:
+    def __init__(self, tracer: "Tracer", name: str, parent: Optional[SpanContext], kind: str, attributes: Dict):
+        self.tracer = tracer
+        self.name = name
+        self.kind = kind
+        self.parent_id = parent.span_id if parent else None
+        self.context = SpanContext(
+            trace_id=parent.trace_id if parent else secrets.token_hex(16),
+            span_id=secrets.token_hex(8),
+            sampled=parent.sampled if parent else True
+        )
+        self.attributes = dict(attributes)
+        self.status = "ok"
+        self.start = time.time()
+        self._t0 = time.monotonic()
+        self.duration: Optional[float] = None
+
+    @property
+    def trace_id(self) -> str:
+        return self.context.trace_id
+
+    @property
+    def traceparent(self) -> str:
+        return self.context.traceparent
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def record_error(self, error: BaseException):
+        self.status = "error"
+        self.attributes["error"] = f"{type(error).__name__}: {error}"
+
+    def end(self):
+        if self.duration is None:
+            self.duration = time.monotonic() - self._t0
+            self.tracer.export(self)
+
+    def to_dict(self) -> Dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.context.span_id,
+            "parent_span_id": self.parent_id,
+            "name": self.name,
+            "service": self.tracer.service,
+            "kind": self.kind,
+            "start": round(self.start, 6),
+            "duration": round(self.duration, 6) if self.duration is not None else None,
+            "status": self.status,
+            "attributes": self.attributes
+        }
+
+
+class Tracer:
+    """Create spans for one service and export the sampled ones.
+
+    The active span is tracked in a context variable, so spans opened with
+    ``span()`` nest across awaits and tasks started inside them. With no
+    ``path`` spans are still created and propagated, just not written.
+    """
+
+    def __init__(self, service: str, path: Optional[str] = None):
+        self.service = service
+        self.path = Path(path) if path else None
+        self._file = None
+
+    @classmethod
+    def from_config(cls, service: str) -> "Tracer":
+        return cls(service, Config.TRACE_FILE or None)
+
+    def start_span(
+        self,
+        name: str,
+        parent: Optional[SpanContext] = None,
+        kind: str = "internal",
+        attributes: Optional[Dict] = None
+    ) -> Span:
+        """Start (but do not activate) a span; defaults to a child of the active one."""
+        if parent is None and _current.get() is not None:
+            parent = _current.get().context
+        return Span(self, name, parent, kind, attributes or {})
+
+    @contextmanager
+    def span(
+        self,
+        name: str,
+        parent: Optional[SpanContext] = None,
+        kind: str = "internal",
+        attributes: Optional[Dict] = None
+    ) -> Iterator[Span]:
+        span = self.start_span(name, parent, kind, attributes)
+        with self.activate(span):
+            try:
+                yield span
+            except BaseException as e:
+                span.record_error(e)
+                raise
+            finally:
+                span.end()
+
+    @contextmanager
+    def activate(self, span: Span) -> Iterator[Span]:
+        token = _current.set(span)
+        try:
+            yield span
+        finally:
+            _current.reset(token)
+
+    def export(self, span: Span):
+        if self.path is None or not span.context.sampled:
+            return
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8", buffering=1)
+        self._file.write(json.dumps(span.to_dict()) + "\n")
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+def inject(headers: Optional[Dict] = None) -> Dict:
+    """Headers with the active span's ``traceparent`` added (if there is one)."""
+    headers = dict(headers or {})
+    span = current_span()
+    if span is not None:
+        headers[TRACEPARENT] = span.traceparent
+    return headers
+
+
+def instrument_tracing(app, tracer: Tracer):
+    """Open a server span per request, continuing the caller's ``traceparent``.
+
+    The span stays active while the app handles the request and ends once it
+    is done with it (streamed bodies included), also when the handler raises
+    or the client disconnects. The response echoes the trace in ``traceparent``.
+    """
+    from starlette.datastructures import Headers, MutableHeaders
+
+    def tracing_middleware(app):
+        async def trace_request(scope, receive, send):
+            if scope["type"] != "http":
+                return await app(scope, receive, send)
+            span = tracer.start_span(
+                f"{scope['method']} {scope['path']}",
+                parent=SpanContext.from_traceparent(Headers(scope=scope).get(TRACEPARENT)),
+                kind="server"
+            )
+
+            async def send_traced(message):
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.status_code", message["status"])
+                    if message["status"] >= 500:
+                        span.status = "error"
+                    MutableHeaders(scope=message)[TRACEPARENT] = span.traceparent
+                await send(message)
+
+            try:
+                with tracer.activate(span):
+                    await app(scope, receive, send_traced)
+            except BaseException as e:
+                span.record_error(e)
+                raise
+            finally:
+                span.end()
+
+        return trace_request
+
+    app.add_middleware(tracing_middleware)
+
+
+def load_spans(paths: List[str]) -> List[Dict]:
+    spans = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            spans.extend(json.loads(line) for line in f if line.strip())
+    return spans
+
+
+def format_trace(spans: List[Dict], trace_id: str) -> str:
+    """Indented span tree for one trace, offsets relative to its first span."""
+    spans = sorted((s for s in spans if s["trace_id"] == trace_id), key=lambda s: s["start"])
+    if not spans:
+        return f"No spans for trace {trace_id}"
+    t0 = spans[0]["start"]
+    ids = {s["span_id"] for s in spans}
+    children: Dict[Optional[str], List[Dict]] = {}
+    for s in spans:
+        parent = s["parent_span_id"] if s["parent_span_id"] in ids else None
+        children.setdefault(parent, []).append(s)
+
+    lines = []
+
+    def walk(parent: Optional[str], depth: int):
+        for s in children.get(parent, []):
+            lines.append(
+                f"{'  ' * depth}{s['name']} [{s['service']}] "
+                f"+{s['start'] - t0:.3f}s {s['duration']:.3f}s {s['status']}"
+            )
+            walk(s["span_id"], depth + 1)
+
+    walk(None, 0)
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Print a trace from span files")
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("--trace", help="trace_id (default: the most recent trace)")
+    args = parser.parse_args()
+
+    all_spans = load_spans(args.files)
+    if not all_spans:
+        sys.exit("No spans found")
+    trace_id = args.trace or max(all_spans, key=lambda s: s["start"])["trace_id"]
+    print(format_trace(all_spans, trace_id))
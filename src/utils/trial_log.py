@@ -0,0 +1,150 @@
+"""Append-only JSONL storage for evaluation trial records."""
+import gzip
+import json
+import os
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+TRIAL_LOG_NAMES = ("trials.jsonl", "trials.jsonl.gz")
+
+
+class TrialLogWriter:
+    """Append trial records to a JSONL file, one JSON object per line.
+
+    Paths ending in ``.gz`` are gzip-compressed; each record is sync-flushed
+    so everything written before a crash stays readable. The Python buffer is
+    flushed on every append and ``os.fsync`` runs every ``fsync_every``
+    records, trading a bounded window of OS-level durability for throughput.
+    """
+
+    def __init__(self, path: Path, fsync_every: int = 10, truncate: bool = False):
+        self.path = Path(path)
+        self.fsync_every = max(1, fsync_every)
+        self.compressed = self.path.suffix == ".gz"
+        if not truncate:
+            self._repair_tail()
+        self._raw = open(self.path, "wb" if truncate else "ab")
+        self._stream = gzip.GzipFile(fileobj=self._raw, mode="ab") if self.compressed else self._raw
+        self._pending = 0
+
+    def _repair_tail(self):
+        """Make a log left behind by an interrupted run safe to append to."""
+        if not self.path.exists() or self.path.stat().st_size == 0:
+            return
+        if not self.compressed:
+            with open(self.path, "rb+") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    f.write(b"\n")
+            return
+        try:
+            with gzip.open(self.path, "rb") as f:
+                while f.read(1 << 20):
+                    pass
+        except (EOFError, gzip.BadGzipFile):
+            # A cut-off gzip member would hide everything appended after it,
+            # so rewrite the readable records into a fresh file first.
+            records = list(iter_trials(self.path))
+            tmp_path = self.path.with_name(self.path.name + ".tmp")
+            with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+                for record in records:
+                    f.write(json.dumps(record) + "\n")
+            os.replace(tmp_path, self.path)
+
+    def append(self, trial: Dict):
+        self._stream.write((json.dumps(trial) + "\n").encode("utf-8"))
+        if self.compressed:
+            self._stream.flush()
+        self._raw.flush()
+        self._pending += 1
+        if self._pending >= self.fsync_every:
+            self.sync()
+
+    def sync(self):
+        os.fsync(self._raw.fileno())
+        self._pending = 0
+
+    def close(self):
+        if self._raw.closed:
+            return
+        if self.compressed:
+            self._stream.close()  # writes the gzip trailer, leaves _raw open
+        self._raw.flush()
+        self.sync()
+        self._raw.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def find_trial_log(results_dir: Path) -> Optional[Path]:
+    """Return the trial log inside results_dir, if one exists."""
+    for name in TRIAL_LOG_NAMES:
+        path = Path(results_dir) / name
+        if path.exists():
+            return path
+    return None
+
+
+def iter_trials(path: Path) -> Iterator[Dict]:
+    """Stream trial records from a JSONL (or .jsonl.gz) trial log.
+
+    Malformed lines, such as a truncated final record left by an
+    interrupted run, are skipped.
+    """
+    path = Path(path)
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        try:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+        except (EOFError, gzip.BadGzipFile):
+            # Compressed stream cut off mid-member; earlier records are intact
+            return
+
+
+def iter_results(results_dir: Path) -> Iterator[Dict]:
+    """Stream trials from a results directory in any supported layout.
+
+    Prefers the JSONL trial log, then falls back to a legacy all_trials.json
+    and finally to per-trial ``trials/trial_*.json`` files.
+    """
+    results_dir = Path(results_dir)
+
+    log_path = find_trial_log(results_dir)
+    if log_path is not None:
+        yield from iter_trials(log_path)
+        return
+
+    all_trials = results_dir / "all_trials.json"
+    if all_trials.exists():
+        with open(all_trials, "r", encoding="utf-8") as f:
+            yield from json.load(f)["trials"]
+        return
+
+    trials_dir = results_dir / "trials" if (results_dir / "trials").is_dir() else results_dir
+    for trial_file in sorted(trials_dir.glob("trial_*.json")):
+        with open(trial_file, "r", encoding="utf-8") as f:
+            yield json.load(f)
+
+
+def collect_columns(trials: Iterable[Dict],
+                    columns: Dict[str, Callable[[Dict], Any]]) -> Dict[str, List]:
+    """Gather the given fields from a stream of trials in a single pass.
+
+    Only the extracted values are kept, so a long trial log can be turned into
+    a DataFrame without holding every full record in memory at once.
+    """
+    collected: Dict[str, List] = {name: [] for name in columns}
+    for trial in trials:
+        for name, extract in columns.items():
+            collected[name].append(extract(trial))
+    return collected
@@ -0,0 +1,143 @@
+import asyncio
+from datetime import datetime, timezone
+
+import httpx
+
+
+def test_admission_queues_then_sheds_with_retry_after():
+    from fastapi import FastAPI
+    from src.utils.admission import AdmissionController, instrument_admission
+    from src.utils.metrics import MetricsRegistry
+
+    app = FastAPI()
+    metrics = MetricsRegistry()
+    admission = AdmissionController(max_concurrent=1, max_queue=1, queue_timeout=5.0)
+    instrument_admission(app, admission, metrics, "copilot", ["/analyze"])
+    release = asyncio.Event()
+
+    @app.post("/analyze")
+    async def analyze():
+        await release.wait()
+        return {"ok": True}
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://copilot") as client:
+            first = asyncio.create_task(client.post("/analyze"))
+            second = asyncio.create_task(client.post("/analyze"))
+            while admission.queue_depth < 1:
+                await asyncio.sleep(0.01)
+            shed = await client.post("/analyze")
+            release.set()
+            return shed, await first, await second
+
+    shed, first, second = asyncio.run(run())
+    assert shed.status_code == 429
+    assert int(shed.headers["retry-after"]) >= 1
+    assert first.status_code == second.status_code == 200
+    stats = admission.stats()
+    assert stats["active"] == 0 and stats["queue_depth"] == 0
+    assert stats["admitted"] == 2 and stats["rejected"]["queue_full"] == 1
+    assert 'myantfarm_admission_rejected_total{service="copilot",reason="queue_full"} 1' in metrics.render()
+
+
+def test_slot_released_when_client_disconnects():
+    from fastapi import FastAPI
+    from fastapi.responses import StreamingResponse
+    from src.utils.admission import AdmissionController, instrument_admission
+    from src.utils.metrics import MetricsRegistry, instrument_app
+    from src.utils.tracing import Tracer, instrument_tracing
+
+    app = FastAPI()
+    admission = AdmissionController(max_concurrent=1, max_queue=0)
+    metrics = MetricsRegistry()
+    # Wired like the services, under the request metrics and tracing middleware
+    instrument_admission(app, admission, metrics, "multiagent", ["/orchestrate"])
+    instrument_app(app, metrics, "multiagent")
+    instrument_tracing(app, Tracer("multiagent"))
+
+    @app.post("/orchestrate")
+    async def orchestrate():
+        async def events():
+            yield b'{"event": "agent_start"}\n'
+            await asyncio.Event().wait()
+
+        return StreamingResponse(events(), media_type="application/x-ndjson")
+
+    async def request(disconnect_on):
+        # None: the client is gone before the response starts
+        disconnected = asyncio.Event()
+        if disconnect_on is None:
+            disconnected.set()
+        messages = [{"type": "http.request", "body": b"", "more_body": False}]
+
+        async def receive():
+            if messages:
+                return messages.pop(0)
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == disconnect_on:
+                # The client goes away while this message is on the wire
+                disconnected.set()
+                await asyncio.sleep(0.05)
+
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+            "scheme": "http", "path": "/orchestrate", "raw_path": b"/orchestrate", "root_path": "",
+            "query_string": b"", "headers": [], "client": ("127.0.0.1", 1234), "server": ("multiagent", 8002)
+        }
+        await asyncio.wait_for(app(scope, receive, send), timeout=5)
+        await asyncio.sleep(0.05)
+        return admission.active
+
+    for disconnect_on in (None, "http.response.start", "http.response.body"):
+        assert asyncio.run(request(disconnect_on)) == 0
+    assert admission.admitted == 3
+
+
+def test_queue_timeout_and_retry_after_parsing():
+    from src.utils.admission import AdmissionController, OverloadedError, parse_retry_after
+
+    async def run():
+        admission = AdmissionController(max_concurrent=1, max_queue=4, queue_timeout=0.05)
+        await admission.acquire()
+        try:
+            await admission.acquire()
+        except OverloadedError as e:
+            return admission, e
+
+    admission, error = asyncio.run(run())
+    assert (error.status_code, error.reason) == (503, "queue_timeout")
+    assert admission.queue_depth == 0 and admission.active == 1
+
+    now = datetime(2026, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+    assert parse_retry_after("7") == 7.0
+    assert parse_retry_after("Thu, 01 Jan 2026 12:00:30 GMT", now=now) == 30.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def test_slot_handed_over_as_the_wait_times_out_is_passed_on(monkeypatch):
+    from src.utils import admission as admission_module
+    from src.utils.admission import AdmissionController, OverloadedError
+
+    admission = AdmissionController(max_concurrent=1, max_queue=4, queue_timeout=5.0)
+
+    async def timed_out_after_handover(waiter, timeout):
+        admission.release()  # the holder finishes and hands its slot to this waiter...
+        assert waiter.done()
+        raise asyncio.TimeoutError  # ...but the timeout fires first
+
+    async def run():
+        await admission.acquire()
+        monkeypatch.setattr(admission_module.asyncio, "wait_for", timed_out_after_handover)
+        try:
+            await admission.acquire()
+        except OverloadedError as e:
+            return e
+
+    error = asyncio.run(run())
+    assert error.reason == "queue_timeout"
+    assert admission.active == 0 and admission.queue_depth == 0
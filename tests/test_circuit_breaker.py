@@ -0,0 +1,137 @@
+import asyncio
+
+import httpx
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_breaker_opens_on_failure_rate_and_limits_half_open_probes():
+    from src.utils.circuit_breaker import CircuitBreaker
+
+    clock = FakeClock()
+    breaker = CircuitBreaker("ollama|tinyllama", window=10, min_calls=4, failure_rate=0.5,
+                             open_seconds=30, half_open_calls=2, clock=clock)
+    for success in (True, False, True, False):
+        assert breaker.allow()
+        breaker.record(success, 1.0)
+    assert breaker.state == "OPEN"
+    assert not breaker.allow()
+
+    clock.now = 31
+    assert breaker.state == "HALF_OPEN"
+    probes = [breaker.allow(), breaker.allow()]
+    assert all(probes)
+    assert not breaker.allow()  # probe limit reached
+    for probe in probes:
+        breaker.record(True, 1.0, probe)
+    assert breaker.state == "CLOSED"
+    assert breaker.stats()["rejected"] == 2
+
+
+def test_breaker_trips_on_slow_calls_and_reopens_on_failed_probe():
+    from src.utils.circuit_breaker import CircuitBreaker
+
+    clock = FakeClock()
+    breaker = CircuitBreaker("ollama|tinyllama", window=5, min_calls=3, slow_call_seconds=2.0,
+                             slow_call_rate=0.6, open_seconds=10, clock=clock)
+    for duration in (5.0, 5.0, 1.0):
+        breaker.allow()
+        breaker.record(True, duration)
+    assert breaker.state == "OPEN"
+
+    clock.now = 11
+    probe = breaker.allow()
+    assert probe
+    breaker.record(False, permit=probe)
+    assert breaker.state == "OPEN"
+
+
+def test_calls_admitted_while_closed_do_not_close_a_half_open_breaker():
+    from src.utils.circuit_breaker import CircuitBreaker
+
+    clock = FakeClock()
+    breaker = CircuitBreaker("ollama|tinyllama", window=4, min_calls=2, failure_rate=0.5,
+                             open_seconds=10, half_open_calls=1, clock=clock)
+    stragglers = [breaker.allow() for _ in range(3)]
+    for _ in range(2):
+        breaker.record(False, 1.0, breaker.allow())
+    assert breaker.state == "OPEN"
+
+    clock.now = 11
+    probe = breaker.allow()
+    assert breaker.state == "HALF_OPEN" and probe
+    # Calls from before the breaker opened finish now: they are not probes
+    breaker.record(True, 1.0, stragglers[0])
+    breaker.release(stragglers[1])
+    breaker.record(False, 1.0, stragglers[2])
+    assert breaker.state == "HALF_OPEN"
+    assert breaker.stats()["half_open_probes"] == 1
+    assert not breaker.allow()
+
+    breaker.record(True, 1.0, probe)
+    assert breaker.state == "CLOSED"
+
+
+def test_open_backend_is_skipped():
+    from src.utils.circuit_breaker import CircuitBreakerRegistry
+    from src.utils.llm_interface import LLMInterface
+
+    def handler(request):
+        if request.url.host == "down":
+            return httpx.Response(500)
+        return httpx.Response(200, json={"response": request.url.host, "done": True})
+
+    async def run():
+        llm = LLMInterface(
+            base_url="http://down:11434,http://up:11434",
+            transport=httpx.MockTransport(handler),
+            coalesce="off",
+            breakers=CircuitBreakerRegistry(min_calls=1, failure_rate=0.5)
+        )
+        hosts = []
+        for i in range(4):
+            try:
+                hosts.append((await llm.generate("tinyllama", f"p{i}"))["response"])
+            except httpx.HTTPStatusError:
+                hosts.append("error")
+        await llm.aclose()
+        return hosts, llm.stats()["circuit_breakers"]
+
+    hosts, breakers = asyncio.run(run())
+    assert hosts.count("error") == 1
+    assert hosts.count("up") == 3
+    down = breakers["http://down:11434|tinyllama"]
+    assert down["state"] == "OPEN"
+    # Served by the other backend, so passed over rather than rejected
+    assert down["skipped"] >= 1 and down["rejected"] == 0
+
+
+def test_call_is_rejected_only_when_no_backend_admits_it():
+    from src.utils.circuit_breaker import CircuitBreakerRegistry, CircuitOpenError
+    from src.utils.llm_interface import LLMInterface
+
+    async def run():
+        llm = LLMInterface(
+            base_url="http://down:11434",
+            transport=httpx.MockTransport(lambda request: httpx.Response(500)),
+            coalesce="off",
+            breakers=CircuitBreakerRegistry(min_calls=1, failure_rate=0.5)
+        )
+        errors = []
+        for i in range(3):
+            try:
+                await llm.generate("tinyllama", f"p{i}")
+            except (httpx.HTTPStatusError, CircuitOpenError) as e:
+                errors.append(type(e).__name__)
+        await llm.aclose()
+        return errors, llm.stats()["circuit_breakers"]["http://down:11434|tinyllama"]
+
+    errors, breaker = asyncio.run(run())
+    assert errors == ["HTTPStatusError", "CircuitOpenError", "CircuitOpenError"]
+    assert breaker["rejected"] == 2 and breaker["skipped"] == 0
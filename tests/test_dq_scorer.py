@@ -4,3 +4,29 @@
     result = scorer.score_trial(["test action"])
     assert 'dq' in result
     assert 0 <= result['dq'] <= 1
+
+
+def test_score_batch_matches_score_trial():
+    from src.scoring.dq_scorer_v2 import DQScorer
+    scorer = DQScorer("rollback auth-service deployment to v2.3.0 verify database connection pool")
+    trials = [
+        {"actions": ["Rollback auth-service deployment to v2.3.0", "Verify database connection pool configuration", "Monitor error rates for 5 minutes"]},
+        {"actions": ["Investigate recent changes", "Review system metrics"]},
+        {"actions": []},
+        {"actions": ["Rollback recent deployment", "Rollback recent deployment", "Check service version"]},
+    ]
+    batch = scorer.score_batch(trials)
+    assert batch.to_dict('records') == [scorer.score_trial(t["actions"]) for t in trials]
+
+
+def test_specificity_matcher_spec_tiers_and_keywords():
+    from src.scoring.specificity import SPEC_TIERS, SpecificityMatcher
+    matcher = SpecificityMatcher(SPEC_TIERS)
+    assert matcher.score("Rollback auth-service to v2.3.0 using kubectl") == 1.0
+    assert matcher.score("Rollback the authentication service") == 0.67
+    assert matcher.score("Rollback recent deployment") == 0.33
+    assert matcher.score("Investigate the issue") == 0.0
+
+    extended = SpecificityMatcher().with_keywords(0.67, ["ledger-{}".format(i) for i in range(20)])
+    assert extended.score("Restart ledger-17 workers") == 0.67
+    assert extended.score("Check auth-service version") == 1.0
@@ -0,0 +1,138 @@
+import asyncio
+
+
+def test_token_bucket_bursts_then_spaces_calls_in_fifo_order():
+    from services.evaluator.run_evaluation import TokenBucketLimiter
+
+    now = [0.0]
+    sleeps = []
+
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+        await asyncio.sleep(0)
+
+    # 30/min: one token every 2s after a burst of 3
+    limiter = TokenBucketLimiter(calls_per_minute=30, burst=3, clock=lambda: now[0], sleep=fake_sleep)
+    admitted = []
+
+    async def trial(i):
+        await limiter.wait()
+        admitted.append((i, now[0]))
+
+    async def run():
+        await asyncio.gather(*(trial(i) for i in range(6)))
+
+    asyncio.run(run())
+    assert [i for i, _ in admitted] == list(range(6))
+    assert [t for _, t in admitted] == [0.0, 0.0, 0.0, 2.0, 4.0, 6.0]
+    assert sleeps == [2.0, 2.0, 2.0]
+    assert limiter.stats()["calls"] == 6
+
+
+def test_token_bucket_disabled_never_sleeps():
+    from services.evaluator.run_evaluation import TokenBucketLimiter
+
+    async def fail_sleep(seconds):
+        raise AssertionError("disabled limiter slept")
+
+    limiter = TokenBucketLimiter(calls_per_minute=0, clock=lambda: 0.0, sleep=fail_sleep)
+
+    async def run():
+        return await asyncio.gather(*(limiter.wait() for _ in range(20)))
+
+    assert asyncio.run(run()) == [0.0] * 20
+    assert limiter.calls == 20
+
+
+def make_evaluator(monkeypatch, results_dir, **env):
+    """Evaluator over ``results_dir`` with stubbed services and trial runners.
+
+    Returns the evaluator, the ``trial_id``s in dispatch order and the most
+    trials each condition had in flight at once.
+    """
+    from services.evaluator.run_evaluation import Evaluator
+
+    settings = {"RESULTS_DIR": str(results_dir), "TRIALS_PER_CONDITION": "6", "TRACE_FILE": ""}
+    settings.update(env)
+    for name, value in settings.items():
+        monkeypatch.setenv(name, value)
+
+    evaluator = Evaluator()
+    dispatched = []
+    in_flight = {"C1": 0, "C2": 0, "C3": 0}
+    max_in_flight = dict(in_flight)
+
+    async def ready():
+        pass
+
+    def stub(condition):
+        async def run_trial(scenario, trial_id):
+            dispatched.append(f"{condition}_{trial_id:03d}")
+            in_flight[condition] += 1
+            max_in_flight[condition] = max(max_in_flight[condition], in_flight[condition])
+            await asyncio.sleep(0.001)
+            in_flight[condition] -= 1
+            return {"trial_id": f"{condition}_{trial_id:03d}", "condition": condition, "scenario": scenario.name}
+
+        return run_trial
+
+    evaluator.wait_for_services = ready
+    evaluator.run_c1_baseline = stub("C1")
+    evaluator.run_c2_single_agent = stub("C2")
+    evaluator.run_c3_multi_agent = stub("C3")
+    return evaluator, dispatched, max_in_flight
+
+
+def test_scheduler_bounds_workers_and_interleaves_by_seed(monkeypatch, tmp_path):
+    env = {"INTERLEAVE_CONDITIONS": "1", "C1_WORKERS": "1", "C2_WORKERS": "3", "C3_WORKERS": "2"}
+    orders = []
+    for run, seed in enumerate(("7", "7", "8")):
+        evaluator, dispatched, max_in_flight = make_evaluator(monkeypatch, tmp_path / str(run), RANDOM_SEED=seed, **env)
+        asyncio.run(evaluator.run_all_trials())
+        assert max_in_flight == {"C1": 1, "C2": 3, "C3": 2}
+        assert sorted(dispatched) == sorted(f"{c}_{i:03d}" for c in ("C1", "C2", "C3") for i in range(6))
+        orders.append(dispatched)
+
+    assert orders[0] == orders[1]
+    assert orders[0] != orders[2]
+    # Interleaved, not one condition after another
+    assert [trial[:2] for trial in orders[0]] != sorted(trial[:2] for trial in orders[0])
+
+
+def test_resume_reruns_only_missing_trials(monkeypatch, tmp_path):
+    import json
+
+    from src.evaluation.scenarios import load_registry
+    from src.utils.trial_log import iter_trials
+
+    scenario = load_registry().default.name
+    done = ["C1_000", "C1_001", "C1_002", "C2_000", "C3_001"]
+    with open(tmp_path / "trials.jsonl", "w") as f:
+        for trial_id in done:
+            f.write(json.dumps({"trial_id": trial_id, "condition": trial_id[:2], "scenario": scenario}) + "\n")
+        # Interrupted mid-write
+        f.write('{"trial_id": "C2_001", "condition": "C2", "scen')
+
+    evaluator, dispatched, _ = make_evaluator(monkeypatch, tmp_path, TRIALS_PER_CONDITION="3", RESUME="1")
+    asyncio.run(evaluator.run_all_trials())
+
+    everything = [f"{c}_{i:03d}" for c in ("C1", "C2", "C3") for i in range(3)]
+    assert sorted(dispatched) == [trial_id for trial_id in everything if trial_id not in done]
+    assert sorted(trial["trial_id"] for trial in iter_trials(tmp_path / "trials.jsonl")) == everything
+
+
+def test_resume_refuses_a_different_run(monkeypatch, tmp_path):
+    import pytest
+
+    run = {"MODEL_NAME": "tinyllama", "RANDOM_SEED": "42", "TRIALS_PER_CONDITION": "6"}
+    evaluator, _, _ = make_evaluator(monkeypatch, tmp_path, **run)
+    evaluator.check_run_manifest()
+
+    for setting, value in (("MODEL_NAME", "llama3"), ("RANDOM_SEED", "7"), ("TRIALS_PER_CONDITION", "3")):
+        evaluator, _, _ = make_evaluator(monkeypatch, tmp_path, RESUME="1", **{**run, setting: value})
+        with pytest.raises(SystemExit, match="Cannot resume"):
+            asyncio.run(evaluator.run_all_trials())
+
+    evaluator, _, _ = make_evaluator(monkeypatch, tmp_path, RESUME="1", **run)
+    evaluator.check_run_manifest()
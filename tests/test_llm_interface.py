@@ -0,0 +1,145 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+
+def test_generate_reuses_pooled_client():
+    from src.utils.llm_interface import LLMInterface
+
+    seen = []
+
+    def handler(request):
+        seen.append(request)
+        return httpx.Response(200, json={"response": "ok", "done": True})
+
+    async def run():
+        llm = LLMInterface(base_url="http://ollama:11434", transport=httpx.MockTransport(handler))
+        await llm.start()
+        client = llm._client
+        first = await llm.generate("tinyllama", "hello", options={"num_predict": 8})
+        second = await llm.generate("tinyllama", "hello again")
+        assert llm._client is client
+        await llm.aclose()
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first["response"] == "ok"
+    assert second["response"] == "ok"
+    assert len(seen) == 2
+    assert str(seen[0].url) == "http://ollama:11434/api/generate"
+
+
+def test_identical_concurrent_requests_share_one_generation():
+    from src.utils.llm_interface import LLMInterface
+
+    seen = []
+
+    async def handler(request):
+        seen.append(request)
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json={"response": "ok", "done": True})
+
+    async def run():
+        llm = LLMInterface(transport=httpx.MockTransport(handler), coalesce="all")
+        results = await asyncio.gather(*(llm.generate("tinyllama", "same") for _ in range(5)))
+        await llm.generate("tinyllama", "other")
+        await llm.aclose()
+        return results
+
+    results = asyncio.run(run())
+    assert len(seen) == 2
+    assert [r.get("coalesced", False) for r in results].count(True) == 4
+    assert all(r["response"] == "ok" for r in results)
+
+
+def test_slow_backend_is_hedged_to_another():
+    from src.utils.llm_interface import LLMInterface
+
+    async def handler(request):
+        if request.url.host == "slow":
+            await asyncio.sleep(1.0)
+        return httpx.Response(200, json={"response": request.url.host, "done": True})
+
+    async def run():
+        llm = LLMInterface(
+            base_url="http://slow:11434,http://fast:11434",
+            transport=httpx.MockTransport(handler),
+            coalesce="off",
+            hedge=True,
+            hedge_delay=0.05
+        )
+        results = [await llm.generate("tinyllama", f"prompt {i}") for i in range(2)]
+        stats = llm.stats()
+        await llm.aclose()
+        return results, stats
+
+    results, stats = asyncio.run(run())
+    # Both calls land on "slow" first (the losing request is cancelled, so it
+    # frees its slot) and are hedged to "fast"
+    assert [r["response"] for r in results] == ["fast", "fast"]
+    assert stats["hedging"] == {"enabled": True, "delay": 0.05, "fired": 2, "won": 2}
+    assert [b["outstanding"] for b in stats["backends"]] == [0, 0]
+
+
+def test_cancelling_a_hedged_call_cancels_its_requests():
+    from src.utils.llm_interface import LLMInterface
+
+    cancelled = []
+
+    async def handler(request):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(request.url.host)
+            raise
+        return httpx.Response(200, json={"response": "late", "done": True})
+
+    async def run():
+        llm = LLMInterface(
+            base_url="http://slow:11434,http://slower:11434",
+            transport=httpx.MockTransport(handler),
+            coalesce="off",
+            hedge=True,
+            hedge_delay=0.05
+        )
+        stats = []
+        for wait in (0.02, 0.1):  # cancelled during the hedge delay, then while racing
+            call = asyncio.create_task(llm.generate("tinyllama", "prompt"))
+            await asyncio.sleep(wait)
+            call.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await call
+            stats.append([b["outstanding"] for b in llm.stats()["backends"]])
+        await llm.aclose()
+        return stats
+
+    assert asyncio.run(run()) == [[0, 0], [0, 0]]
+    assert len(cancelled) == 3
+
+
+def test_warmup_retries_until_model_is_loaded():
+    from src.utils.llm_interface import LLMInterface
+    from src.utils.readiness import Warmup
+
+    seen = []
+
+    def handler(request):
+        seen.append(json.loads(request.content))
+        if len(seen) == 1:
+            return httpx.Response(503)
+        return httpx.Response(200, json={"response": "", "done": True, "load_duration": 2_000_000_000, "total_duration": 2_000_000_000})
+
+    async def run():
+        llm = LLMInterface(transport=httpx.MockTransport(handler), keep_alive="-1")
+        warmup = Warmup(llm, "tinyllama", enabled=True, retry_seconds=0.01)
+        assert not warmup.ready
+        await warmup.run()
+        await llm.aclose()
+        return warmup.status()
+
+    status = asyncio.run(run())
+    assert status["ready"] and status["attempts"] == 2
+    assert seen[-1] == {"model": "tinyllama", "prompt": "", "stream": False, "keep_alive": -1}
+    assert status["backends"]["http://ollama:11434"]["load_seconds"] == 2.0
@@ -0,0 +1,66 @@
+import asyncio
+
+import httpx
+
+
+def test_arrival_schedules():
+    from src.evaluation.load_generator import arrival_times
+
+    assert arrival_times(2.0, 3.0, "constant") == [0.0, 0.5, 1.0, 1.5, 2.0, 2.5]
+    poisson = arrival_times(20.0, 50.0, "poisson", seed=1)
+    assert poisson == arrival_times(20.0, 50.0, "poisson", seed=1)
+    assert poisson == sorted(poisson) and poisson[-1] < 50.0
+    assert 900 < len(poisson) < 1100
+
+
+def test_stage_summary_and_baseline_comparison():
+    from src.evaluation.load_generator import compare, run_stage, summarize
+
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if len(calls) == 2:
+            return httpx.Response(503, json={"detail": "overloaded"})
+        return httpx.Response(200, json={"summary": "ok", "fallbacks": ["summary"] if len(calls) == 3 else []})
+
+    results = asyncio.run(run_stage(
+        "http://copilot:8000", "/analyze", {"context": "ctx", "stream": False},
+        rate=100.0, duration=0.05, transport=httpx.MockTransport(handler)
+    ))
+    stage = summarize(results, 100.0, 0.05)
+
+    assert stage["requests"] == 5 and stage["completed"] == 4
+    assert stage["error_rate"] == 0.2
+    assert stage["errors"] == {"HTTP 503": 1}
+    assert stage["fallback_rate"] == 0.25
+    assert stage["p50"] <= stage["p99"] <= stage["max"]
+
+    run = {"stages": [{**stage, "p95": 2.0}]}
+    baseline = {"stages": [{**stage, "p95": 1.0, "error_rate": 0.0}]}
+    regressions = compare(run, baseline, max_regression=0.1)
+    assert [r.split(": ")[0] for r in regressions] == ["100.0/s p95", "100.0/s error_rate"]
+
+
+def test_run_load_test_end_to_end():
+    from src.evaluation.load_generator import run_load_test
+    from src.evaluation.scenarios import load_registry
+
+    payloads = []
+
+    def handler(request):
+        payloads.append(request)
+        return httpx.Response(200, json={"brief": "ok", "fallbacks": []})
+
+    report = asyncio.run(run_load_test(
+        "multiagent", [50.0, 100.0], duration=0.05, arrivals="constant",
+        base_url="http://multiagent:8000", transport=httpx.MockTransport(handler)
+    ))
+
+    assert report["url"] == "http://multiagent:8000/orchestrate"
+    assert report["config"]["scenario"] == load_registry().default.scenario_id
+    assert [stage["requests"] for stage in report["stages"]] == [3, 5]
+    assert all(stage["error_rate"] == 0.0 and stage["fallback_rate"] == 0.0 for stage in report["stages"])
+    assert report["saturation_rate"] in (50.0, 100.0)
+    assert str(payloads[0].url) == "http://multiagent:8000/orchestrate"
+    assert b"Incident:" in payloads[0].content
@@ -0,0 +1,79 @@
+def test_registry_renders_prometheus_text():
+    from src.utils.metrics import MetricsRegistry
+
+    metrics = MetricsRegistry()
+    calls = metrics.counter("calls_total", "Calls", ["outcome"])
+    latency = metrics.histogram("latency_seconds", "Latency", ["endpoint"], buckets=(0.5, 1.0))
+    in_flight = metrics.gauge("in_flight", "In flight")
+    metrics.add_collector(lambda: in_flight.set(3))
+
+    calls.inc(outcome="ok")
+    calls.inc(2, outcome="ok")
+    for value in (0.2, 0.5, 4.0):
+        latency.observe(value, endpoint='/a"b')
+
+    assert metrics.counter("calls_total", "Calls", ["outcome"]) is calls
+    lines = metrics.render().splitlines()
+    assert "# TYPE calls_total counter" in lines
+    assert 'calls_total{outcome="ok"} 3' in lines
+    assert 'latency_seconds_bucket{endpoint="/a\\"b",le="0.5"} 2' in lines
+    assert 'latency_seconds_bucket{endpoint="/a\\"b",le="+Inf"} 3' in lines
+    assert 'latency_seconds_sum{endpoint="/a\\"b"} 4.7' in lines
+    assert 'latency_seconds_count{endpoint="/a\\"b"} 3' in lines
+    assert "in_flight 3" in lines
+
+
+
+def test_instrument_app_settles_in_flight_on_every_exit():
+    import asyncio
+
+    import httpx
+    import pytest
+    from fastapi import FastAPI
+    from fastapi.responses import StreamingResponse
+    from src.utils.metrics import MetricsRegistry, instrument_app
+
+    app = FastAPI()
+    metrics = MetricsRegistry()
+    instrument_app(app, metrics, "copilot")
+
+    @app.post("/analyze")
+    async def analyze():
+        async def body():
+            yield b"{}"
+            await asyncio.Event().wait()
+
+        return StreamingResponse(body())
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://copilot") as client:
+            await client.get("/health")
+            await client.get("/nope")
+
+        messages = [{"type": "http.request", "body": b"", "more_body": False}]
+
+        async def receive():
+            return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+        async def send(message):
+            raise ConnectionResetError("client went away")
+
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+            "scheme": "http", "path": "/analyze", "raw_path": b"/analyze", "root_path": "",
+            "query_string": b"", "headers": [], "client": ("127.0.0.1", 1234), "server": ("copilot", 8001)
+        }
+        with pytest.raises(ConnectionResetError):
+            await asyncio.wait_for(app(scope, receive, send), timeout=5)
+
+    asyncio.run(run())
+    lines = metrics.render().splitlines()
+    assert 'myantfarm_http_request_duration_seconds_count{service="copilot",endpoint="/health",status="200"} 1' in lines
+    assert 'myantfarm_http_request_duration_seconds_count{service="copilot",endpoint="other",status="404"} 1' in lines
+    assert 'myantfarm_http_request_duration_seconds_count{service="copilot",endpoint="/analyze",status="200"} 1' in lines
+    assert 'myantfarm_http_requests_in_flight{service="copilot",endpoint="/analyze"} 0' in lines
@@ -0,0 +1,71 @@
+import json
+
+import pytest
+
+FAST = {
+    "seed": 42,
+    "latency": {"dist": "uniform", "low": 0.0, "high": 0.01},
+    "tokens_per_second": {"dist": "constant", "value": 100000.0},
+    "responses": [{"match": "database", "response": "SUMMARY: Connection pool exhausted.\nACTIONS:\n- Restart the database proxy"}]
+}
+
+
+@pytest.fixture
+def mock_ollama():
+    from fastapi.testclient import TestClient
+    from services.mock_ollama import main
+
+    def client(**overrides):
+        main.mock.load({**FAST, **overrides})
+        return TestClient(main.app)
+
+    yield client
+    main.mock.load(main.load_profile(main.PROFILE_PATH))
+
+
+def test_streaming_and_single_response_carry_the_same_text(mock_ollama):
+    client = mock_ollama()
+    request = {"model": "tinyllama", "prompt": "The database is down"}
+
+    streamed = client.post("/api/generate", json=request)
+    assert streamed.headers["content-type"] == "application/x-ndjson"
+    chunks = [json.loads(line) for line in streamed.text.splitlines()]
+    assert all(not chunk["done"] for chunk in chunks[:-1]) and chunks[-1]["done"]
+    text = "".join(chunk["response"] for chunk in chunks)
+    assert text == "SUMMARY: Connection pool exhausted.\nACTIONS:\n- Restart the database proxy"
+
+    single = client.post("/api/generate", json={**request, "stream": False}).json()
+    assert single["done"] and single["response"] == text
+    for field in ("total_duration", "load_duration", "prompt_eval_count", "prompt_eval_duration", "eval_count", "eval_duration"):
+        assert isinstance(single[field], int) and single[field] >= 0
+    assert chunks[-1]["eval_count"] == single["eval_count"] == len(chunks) - 1
+
+
+def test_num_predict_truncates_and_seed_repeats_draws(mock_ollama):
+    request = {"model": "tinyllama", "prompt": "The database is down", "stream": False}
+
+    client = mock_ollama()
+    short = client.post("/api/generate", json={**request, "options": {"num_predict": 3}}).json()
+    assert short["eval_count"] == 3 and short["response"] == "SUMMARY: Connection pool "
+
+    # Draws are seeded per prompt and occurrence: a fresh profile replays them
+    first = [client.post("/api/generate", json=request).json() for _ in range(3)]
+    client = mock_ollama()
+    client.post("/api/generate", json={**request, "options": {"num_predict": 3}})
+    second = [client.post("/api/generate", json=request).json() for _ in range(3)]
+    assert [r["prompt_eval_duration"] for r in first] == [r["prompt_eval_duration"] for r in second]
+    assert len({r["prompt_eval_duration"] for r in first}) == 3
+    assert {r["response"] for r in first + second} == {first[0]["response"]}
+
+
+def test_injected_errors_use_the_profile_status(mock_ollama):
+    client = mock_ollama(errors={"rate": 1.0, "status": 503})
+    errors = client.get("/mock/stats").json()["errors"]
+    for stream in (True, False):
+        response = client.post("/api/generate", json={"model": "tinyllama", "prompt": "anything", "stream": stream})
+        assert response.status_code == 503
+        assert response.json() == {"error": "injected failure"}
+    assert client.get("/mock/stats").json()["errors"] == errors + 2
+
+    client = mock_ollama(models=["tinyllama"])
+    assert client.post("/api/generate", json={"model": "llama3", "prompt": "x"}).status_code == 404
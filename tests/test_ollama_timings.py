@@ -0,0 +1,26 @@
+def test_timings_convert_nanoseconds_and_derive_rates():
+    from src.utils.ollama_timings import combine_timings, ollama_timings, overhead_seconds
+
+    response = {
+        "response": "ok",
+        "total_duration": 4_000_000_000,
+        "load_duration": 500_000_000,
+        "prompt_eval_count": 30,
+        "prompt_eval_duration": 1_000_000_000,
+        "eval_count": 50,
+        "eval_duration": 2_500_000_000
+    }
+    timings = ollama_timings(response, call_seconds=4.25)
+    assert timings["total_seconds"] == 4.0
+    assert timings["tokens_per_second"] == 20.0
+    assert timings["prompt_tokens_per_second"] == 30.0
+    assert timings["overhead_seconds"] == 0.25
+    assert ollama_timings({"response": "mocked"}) is None
+
+    cached = ollama_timings({**response, "cached": True}, call_seconds=0.01)
+    assert cached["model_seconds"] == 0.0 and cached["overhead_seconds"] is None
+
+    combined = combine_timings({"a": timings, "b": timings, "c": None}, critical_path=["a"])
+    assert combined["eval_count"] == 100
+    assert combined["model_seconds"] == 4.0
+    assert overhead_seconds(5.5, combined) == 1.5
@@ -0,0 +1,127 @@
+import asyncio
+
+import pytest
+
+
+def test_executor_runs_independent_agents_concurrently():
+    from src.orchestration.executor import DAGExecutor
+    from src.orchestration.graph import AgentGraph
+
+    graph = AgentGraph.from_dicts([
+        {"name": "diagnosis", "prompt": "cause of {context}"},
+        {"name": "risk", "prompt": "impact of {context}"},
+        {"name": "remediation", "prompt": "fix {diagnosis} / {risk}", "depends_on": ["diagnosis", "risk"]},
+        {"name": "slow", "prompt": "{context}", "timeout": 0.05},
+    ])
+    prompts = {}
+
+    async def run_agent(node, prompt, emit):
+        prompts[node.name] = prompt
+        await asyncio.sleep(0.2 if node.name == "slow" else 0.05)
+        return f"{node.name} output"
+
+    result = asyncio.run(DAGExecutor(graph, deadline=5).run("outage", run_agent))
+    nodes = result.nodes
+
+    assert prompts["remediation"] == "fix diagnosis output / risk output"
+    assert nodes["remediation"].started >= max(nodes["diagnosis"].finished, nodes["risk"].finished)
+    # diagnosis and risk overlapped instead of running back to back
+    assert result.elapsed < 0.15 + 0.05
+    assert nodes["slow"].status == "timeout" and nodes["slow"].output is None
+    assert result.critical_path[-1] == "remediation"
+
+
+def test_outputs_are_cut_to_each_nodes_max_chars():
+    from src.orchestration.executor import DAGExecutor
+    from src.orchestration.graph import AgentGraph
+
+    graph = AgentGraph.from_dicts([
+        {"name": "diagnosis", "prompt": "{context}", "max_chars": 10},
+        {"name": "remediation", "prompt": "{diagnosis}", "depends_on": ["diagnosis"], "max_chars": 1000},
+    ])
+    text = "x" * 800
+
+    async def run_agent(node, prompt, emit):
+        return text
+
+    async def stream_agent(node, prompt, emit):
+        for i in range(0, len(text), 100):
+            emit({"event": "token", "agent": node.name, "text": text[i:i + 100]})
+        return text
+
+    for agent in (run_agent, stream_agent):
+        nodes = asyncio.run(DAGExecutor(graph, deadline=5).run("outage", agent)).nodes
+        assert nodes["diagnosis"].output == "x" * 10
+        assert nodes["remediation"].output == text
+
+
+def test_cancelling_run_cancels_running_agents():
+    from src.orchestration.executor import DAGExecutor
+    from src.orchestration.graph import AgentGraph
+
+    graph = AgentGraph.from_dicts([
+        {"name": "diagnosis", "prompt": "{context}"},
+        {"name": "risk", "prompt": "{context}"},
+        {"name": "remediation", "prompt": "{diagnosis}", "depends_on": ["diagnosis"]},
+    ])
+    running = set()
+
+    async def run_agent(node, prompt, emit):
+        running.add(node.name)
+        try:
+            await asyncio.sleep(10)
+        finally:
+            running.discard(node.name)
+
+    async def run():
+        task = asyncio.create_task(DAGExecutor(graph, deadline=30).run("outage", run_agent))
+        while len(running) < 2:
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        others = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        return others
+
+    assert asyncio.run(run()) == []
+    assert running == set()
+
+
+def test_graph_rejects_cycles_and_unknown_dependencies():
+    from src.orchestration.graph import AgentGraph
+
+    with pytest.raises(ValueError, match="cycle"):
+        AgentGraph.from_dicts([
+            {"name": "a", "prompt": "{b}", "depends_on": ["b"]},
+            {"name": "b", "prompt": "{a}", "depends_on": ["a"]},
+        ])
+    with pytest.raises(ValueError, match="unknown"):
+        AgentGraph.from_dicts([{"name": "a", "prompt": "{c}", "depends_on": ["c"]}])
+
+
+def test_early_return_cancels_stragglers_and_keeps_partial_text():
+    from src.orchestration.executor import DAGExecutor
+    from src.orchestration.graph import AgentGraph
+
+    graph = AgentGraph.from_dicts([
+        {"name": "diagnosis", "prompt": "{context}", "required": True},
+        {"name": "risk", "prompt": "{context}"},
+        {"name": "slow", "prompt": "{context}"},
+    ])
+    events = []
+
+    async def run_agent(node, prompt, emit):
+        if node.name == "slow":
+            emit({"event": "token", "agent": "slow", "text": "half an ans"})
+            await asyncio.sleep(10)
+        await asyncio.sleep(0.01 if node.name == "diagnosis" else 0.03)
+        return f"{node.name} output"
+
+    result = asyncio.run(DAGExecutor(graph, deadline=5, quorum=2).run("ctx", run_agent, events.append))
+
+    assert result.early_return and result.elapsed < 1
+    assert result.nodes["slow"].status == "partial"
+    assert result.nodes["slow"].output == "half an ans"
+    assert result.partial_agents == ["slow"]
+    done = [e for e in events if e["event"] == "agent_done" and e["agent"] == "slow"]
+    assert done[0]["partial"] is True
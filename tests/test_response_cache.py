@@ -0,0 +1,49 @@
+import asyncio
+
+import httpx
+
+
+def test_cache_tiers_and_ttl(tmp_path, monkeypatch):
+    from src.utils import response_cache
+    from src.utils.response_cache import ResponseCache
+
+    cache = ResponseCache(directory=tmp_path, max_entries=1, ttl=60)
+    first = cache.key("tinyllama", "a", {"temperature": 0})
+    second = cache.key("tinyllama", "b", {"temperature": 0})
+    cache.put(first, {"response": "A"})
+    cache.put(second, {"response": "B"})  # evicts "a" from memory
+
+    assert cache.get(first) == {"response": "A"}
+    assert cache.stats()["disk_hits"] == 1
+
+    # A fresh process sees the disk tier; expired entries are dropped
+    reopened = ResponseCache(directory=tmp_path, ttl=60)
+    assert reopened.get(second) == {"response": "B"}
+    now = response_cache.time.time()
+    monkeypatch.setattr(response_cache.time, "time", lambda: now + 120)
+    assert reopened.get(first) is None
+    assert not (tmp_path / first[:2] / f"{first}.json").exists()
+
+
+def test_generate_serves_deterministic_calls_from_cache():
+    from src.utils.llm_interface import LLMInterface
+    from src.utils.response_cache import ResponseCache
+
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(200, json={"response": "ok", "done": True})
+
+    async def run():
+        llm = LLMInterface(transport=httpx.MockTransport(handler), cache=ResponseCache())
+        await llm.generate("tinyllama", "hello", temperature=0)
+        cached = await llm.generate("tinyllama", "hello", temperature=0)
+        await llm.generate("tinyllama", "hello", temperature=0.7)
+        await llm.generate("tinyllama", "hello", temperature=0.7)
+        await llm.aclose()
+        return cached
+
+    cached = asyncio.run(run())
+    assert cached == {"response": "ok", "done": True, "cached": True}
+    assert len(calls) == 3
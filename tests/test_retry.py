@@ -0,0 +1,59 @@
+import asyncio
+import random
+
+import pytest
+
+
+def test_retry_backoff_retry_after_and_budget():
+    from src.utils.retry import RetryableError, RetryBudget, RetryError, RetryPolicy
+
+    sleeps = []
+
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+
+    policy = RetryPolicy(
+        max_attempts=4, base_delay=1.0, max_delay=3.0, budget=RetryBudget(ratio=0.5, min_retries=3),
+        rng=random.Random(7), sleep=fake_sleep
+    )
+    failures = [RetryableError("HTTP 503", 503, retry_after=12.0), ConnectionError("reset"), RetryableError("HTTP 502", 502)]
+
+    async def flaky():
+        if failures:
+            raise failures.pop(0)
+        return "ok"
+
+    result, state = asyncio.run(policy.run(flaky))
+    assert result == "ok"
+    assert state.attempts == 4
+    assert sleeps[0] == 12.0
+    assert 0 <= sleeps[1] <= 2.0 and 0 <= sleeps[2] <= 3.0
+    assert state.backoff_seconds == pytest.approx(sum(sleeps))
+    assert state.to_dict()["retry_errors"][0] == "RetryableError: HTTP 503"
+    assert state.to_dict()["retry_budget_exhausted"] is False
+
+    # 3 + 0.5 + 0.5 deposited and 3 spent leaves one retry, then the budget is empty
+    async def down():
+        raise RetryableError("HTTP 503", 503)
+
+    with pytest.raises(RetryError) as excinfo:
+        asyncio.run(policy.run(down))
+    assert excinfo.value.state.budget_exhausted
+    assert excinfo.value.state.to_dict()["retry_budget_exhausted"] is True
+    assert excinfo.value.state.attempts == 2
+    assert policy.budget.stats()["denied"] == 1
+
+
+def test_non_retryable_failures_stop_immediately():
+    from src.utils.retry import RetryableError, RetryError, RetryPolicy
+
+    policy = RetryPolicy(max_attempts=3, sleep=lambda seconds: asyncio.sleep(0))
+
+    for error in (RetryableError("HTTP 422", 422), KeyError("event")):
+        async def broken():
+            raise error
+
+        with pytest.raises(RetryError) as excinfo:
+            asyncio.run(policy.run(broken))
+        assert excinfo.value.state.attempts == 1
+        assert excinfo.value.__cause__ is error
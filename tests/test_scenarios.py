@@ -0,0 +1,64 @@
+import pandas as pd
+
+from src.evaluation.scenarios import Scenario, ScenarioRegistry, load_registry
+from src.scoring.dq_scorer_v2 import DQScorer
+
+
+LEGACY_CONTEXT = '''Incident: Authentication service experiencing 500 errors after deployment
+
+Telemetry:
+- Error rate: 45%
+- Affected endpoints: /api/v1/login, /api/v1/token/refresh
+- Current deployment: v2.4.0
+- Previous stable version: v2.3.0
+- Database connections: 340/400 (85% utilization)
+- Response time (p95): 2400ms (baseline: 180ms)
+
+What is the root cause and what actions should be taken?'''
+
+
+def test_default_scenario_matches_published_prompt():
+    scenario = load_registry().default
+    assert scenario.name == "auth_service_regression"
+    assert scenario.context == LEGACY_CONTEXT
+    assert scenario.ground_truth_resolution == (
+        "rollback auth-service deployment to v2.3.0 verify database connection pool"
+    )
+    assert load_registry()["auth-service-001"] is scenario
+
+
+def test_score_batch_uses_each_trials_scenario():
+    payment = Scenario.from_dict({
+        "scenario_id": "payment-001",
+        "name": "payment_latency",
+        "description": "Payment API latency spike",
+        "telemetry": {"p95": "3s"},
+        "ground_truth": {"resolution": "scale payment-api replicas"}
+    })
+    registry = ScenarioRegistry([load_registry().default, payment])
+    actions = ["scale payment-api replicas to 6", "rollback auth-service to v2.3.0"]
+    trials = [
+        {"actions": actions},
+        {"actions": actions, "scenario": "payment_latency"},
+    ]
+
+    scores = registry.score_batch(trials)
+
+    assert scores["dq"].tolist() == [
+        registry.default.scorer.score_trial(actions)["dq"],
+        DQScorer("scale payment-api replicas").score_trial(actions)["dq"],
+    ]
+    assert [s.name for s in registry.select("all")] == ["auth_service_regression", "payment_latency"]
+
+
+def test_score_batch_streams_trials_and_accepts_a_frame():
+    registry = load_registry()
+    actions = ["rollback auth-service to v2.3.0", "check logs"]
+    expected = registry.default.scorer.score_trial(actions)["dq"]
+
+    streamed = registry.score_batch({"actions": actions} for _ in range(2))
+    # Index labels need not be positional; rows still come back in input order
+    framed = registry.score_batch(pd.DataFrame({"actions": [actions, []]}, index=[7, 3]))
+
+    assert streamed["dq"].tolist() == [expected, expected]
+    assert framed["dq"].tolist() == [expected, 0.0]
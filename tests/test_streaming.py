@@ -0,0 +1,18 @@
+def test_brief_parser_emits_summary_and_actions_incrementally():
+    from src.utils.streaming import BriefStreamParser
+
+    parser = BriefStreamParser()
+    text = "SUMMARY: Auth errors after deploy.\nACTIONS:\n- Rollback auth-service to v2.3.0\n* Check pool\n- Verify database connection pool"
+
+    events = []
+    for i in range(0, len(text), 4):
+        events.extend(parser.feed(text[i:i + 4]))
+    events.extend(parser.close())
+
+    assert events[0] == {"event": "summary", "summary": "Auth errors after deploy."}
+    assert [e["action"] for e in events[1:]] == [
+        "Rollback auth-service to v2.3.0",
+        "Check pool",
+        "Verify database connection pool",
+    ]
+    assert parser.text == text
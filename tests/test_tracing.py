@@ -0,0 +1,90 @@
+import asyncio
+
+
+def test_traceparent_round_trip_and_nested_spans(tmp_path):
+    from src.utils.tracing import SpanContext, Tracer, inject, load_spans
+
+    parent = SpanContext.from_traceparent("00-" + "a" * 32 + "-" + "b" * 16 + "-01")
+    assert parent.traceparent == "00-" + "a" * 32 + "-" + "b" * 16 + "-01"
+    assert SpanContext.from_traceparent("00-" + "0" * 32 + "-" + "b" * 16 + "-01") is None
+    assert SpanContext.from_traceparent("garbage") is None
+
+    tracer = Tracer("test", str(tmp_path / "spans.jsonl"))
+
+    async def child():
+        with tracer.span("child") as span:
+            return inject(), span
+
+    async def run():
+        with tracer.span("root", parent=parent) as root:
+            headers, child_span = await asyncio.create_task(child())
+        return root, headers, child_span
+
+    root, headers, child_span = asyncio.run(run())
+    tracer.close()
+
+    assert headers["traceparent"] == child_span.traceparent
+    spans = {s["name"]: s for s in load_spans([str(tmp_path / "spans.jsonl")])}
+    assert spans["root"]["trace_id"] == "a" * 32
+    assert spans["root"]["parent_span_id"] == "b" * 16
+    assert spans["child"]["parent_span_id"] == root.context.span_id
+
+
+def test_server_span_ends_on_every_exit(tmp_path):
+    import httpx
+    import pytest
+    from fastapi import FastAPI
+    from fastapi.responses import StreamingResponse
+    from src.utils.tracing import Tracer, current_span, instrument_tracing, load_spans
+
+    app = FastAPI()
+    tracer = Tracer("copilot", str(tmp_path / "spans.jsonl"))
+    instrument_tracing(app, tracer)
+
+    @app.post("/analyze")
+    async def analyze():
+        span = current_span()
+
+        async def body():
+            yield span.traceparent.encode()
+            await asyncio.Event().wait()
+
+        return StreamingResponse(body())
+
+    @app.get("/health")
+    async def health():
+        return {"traceparent": current_span().traceparent}
+
+    caller = "00-" + "a" * 32 + "-" + "b" * 16 + "-01"
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://copilot") as client:
+            health = await client.get("/health", headers={"traceparent": caller})
+
+        messages = [{"type": "http.request", "body": b"", "more_body": False}]
+
+        async def receive():
+            return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+        async def send(message):
+            raise ConnectionResetError("client went away")
+
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+            "scheme": "http", "path": "/analyze", "raw_path": b"/analyze", "root_path": "",
+            "query_string": b"", "headers": [], "client": ("127.0.0.1", 1234), "server": ("copilot", 8001)
+        }
+        with pytest.raises(ConnectionResetError):
+            await asyncio.wait_for(app(scope, receive, send), timeout=5)
+        return health
+
+    health = asyncio.run(run())
+    tracer.close()
+
+    assert health.headers["traceparent"] == health.json()["traceparent"]
+    spans = {s["name"]: s for s in load_spans([str(tmp_path / "spans.jsonl")])}
+    assert spans["GET /health"]["trace_id"] == "a" * 32
+    assert spans["GET /health"]["attributes"]["http.status_code"] == 200
+    assert spans["POST /analyze"]["status"] == "error"
+    assert spans["POST /analyze"]["duration"] is not None
@@ -0,0 +1,27 @@
+def test_trial_log_round_trip_and_truncated_tail(tmp_path):
+    from src.utils.trial_log import TrialLogWriter, iter_results
+
+    log_path = tmp_path / "trials.jsonl"
+    with TrialLogWriter(log_path, fsync_every=2) as log:
+        for i in range(3):
+            log.append({"trial_id": f"C2_{i:03d}", "condition": "C2", "t2u": float(i)})
+
+    # Simulate a crash halfway through writing a record, then resume
+    with open(log_path, "a") as f:
+        f.write('{"trial_id": "C2_0')
+    with TrialLogWriter(log_path) as log:
+        log.append({"trial_id": "C2_003", "condition": "C2", "t2u": 3.0})
+
+    assert [t["trial_id"] for t in iter_results(tmp_path)] == ["C2_000", "C2_001", "C2_002", "C2_003"]
+
+
+def test_compressed_trial_log(tmp_path):
+    from src.utils.trial_log import TrialLogWriter, iter_trials
+
+    log_path = tmp_path / "trials.jsonl.gz"
+    for batch in (range(0, 2), range(2, 4)):
+        with TrialLogWriter(log_path) as log:
+            for i in batch:
+                log.append({"trial_id": f"C3_{i:03d}"})
+
+    assert [t["trial_id"] for t in iter_trials(log_path)] == ["C3_000", "C3_001", "C3_002", "C3_003"]